@@ -0,0 +1,124 @@
+"""Packed answers and URL-safe resume codes.
+
+Each answer is one of 7 states: unanswered, or A/B with intensity 1-3.
+PackedAnswers keeps one state byte per question and reads like the usual
+answer dict ({q_id: {"choice", "intensity"}}), so scoring and the prompt
+builders take it unchanged. It is immutable: with_answer() returns a new
+value. to_code() packs all 43 states as one base-7 number (16 bytes) behind
+a small header and encodes it as base64url; from_code() restores answers
+and language in a single decode. The header carries a tag of the question
+bank, so a code made for a different question set is rejected instead of
+silently mapping answers onto the wrong questions.
+"""
+
+import base64
+import binascii
+import hashlib
+from collections.abc import Mapping
+
+from question_bank import BANK_VERSION, LANGUAGES, QUESTION_IDS
+from scoring import DEFAULT_INTENSITY, STATES, UNANSWERED, answer_state
+
+FORMAT_VERSION = 1
+BANK_TAG = hashlib.sha256(f"{BANK_VERSION}:{QUESTION_IDS}".encode("ascii")).digest()[:2]
+
+_INDEX = {q_id: i for i, q_id in enumerate(QUESTION_IDS)}
+# Bytes needed for any base-7 number of 43 digits
+_PAYLOAD_BYTES = ((STATES ** len(QUESTION_IDS) - 1).bit_length() + 7) // 8
+_HEADER_BYTES = 4
+
+
+class InvalidAnswerCode(ValueError):
+    """A resume code is malformed or belongs to another version of the question bank."""
+
+
+class PackedAnswers(Mapping):
+    """All answers of one session as a read-only {q_id: {"choice", "intensity"}} mapping."""
+
+    __slots__ = ("_states",)
+
+    def __init__(self, states=None):
+        states = bytes(len(QUESTION_IDS)) if states is None else bytes(states)
+        if len(states) != len(QUESTION_IDS) or max(states, default=0) >= STATES:
+            raise ValueError(f"expected {len(QUESTION_IDS)} states in 0-{STATES - 1}")
+        self._states = states
+
+    @classmethod
+    def from_dict(cls, answers):
+        """Pack an answer dict; unknown question ids are ignored."""
+        states = bytearray(len(QUESTION_IDS))
+        for q_id, a in answers.items():
+            i = _INDEX.get(int(q_id))
+            if i is not None and a:
+                states[i] = answer_state(a.get("choice"), a.get("intensity", DEFAULT_INTENSITY))
+        return cls(states)
+
+    @classmethod
+    def from_code(cls, code):
+        """Decode a resume code into (answers, language or None)."""
+        try:
+            raw = base64.urlsafe_b64decode(code.strip() + "=" * (-len(code.strip()) % 4))
+        except (binascii.Error, ValueError) as e:
+            raise InvalidAnswerCode("not a resume code") from e
+        if len(raw) != _HEADER_BYTES + _PAYLOAD_BYTES or raw[0] != FORMAT_VERSION:
+            raise InvalidAnswerCode("not a resume code")
+        if raw[1:3] != BANK_TAG:
+            raise InvalidAnswerCode("resume code is from a different version of the questions")
+        lang = LANGUAGES[raw[3] - 1] if 0 < raw[3] <= len(LANGUAGES) else None
+
+        number = int.from_bytes(raw[_HEADER_BYTES:], "big")
+        states = bytearray(len(QUESTION_IDS))
+        for i in range(len(QUESTION_IDS) - 1, -1, -1):
+            number, states[i] = divmod(number, STATES)
+        if number:
+            raise InvalidAnswerCode("resume code is out of range")
+        return cls(states), lang
+
+    def to_code(self, lang=None):
+        """URL-safe code of these answers (and the language, if given)."""
+        number = 0
+        for state in self._states:
+            number = number * STATES + state
+        lang_byte = LANGUAGES.index(lang) + 1 if lang in LANGUAGES else 0
+        raw = bytes([FORMAT_VERSION]) + BANK_TAG + bytes([lang_byte]) + number.to_bytes(_PAYLOAD_BYTES, "big")
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    def with_answer(self, q_id, choice, intensity=DEFAULT_INTENSITY):
+        """A copy with the answer to q_id set (choice None clears it)."""
+        states = bytearray(self._states)
+        states[_INDEX[q_id]] = answer_state(choice, intensity)
+        return PackedAnswers(states)
+
+    @property
+    def states(self):
+        """One 0-6 state per question, in QUESTION_IDS order."""
+        return self._states
+
+    def first_unanswered(self):
+        """Index of the first unanswered question, or None when all are answered."""
+        i = self._states.find(UNANSWERED)
+        return None if i < 0 else i
+
+    def __getitem__(self, q_id):
+        i = _INDEX.get(q_id)
+        state = self._states[i] if i is not None else UNANSWERED
+        if state == UNANSWERED:
+            raise KeyError(q_id)
+        return {"choice": "A" if state <= 3 else "B", "intensity": (state - 1) % 3 + 1}
+
+    def __iter__(self):
+        return (q_id for q_id, state in zip(QUESTION_IDS, self._states) if state != UNANSWERED)
+
+    def __len__(self):
+        return len(self._states) - self._states.count(UNANSWERED)
+
+    def __eq__(self, other):
+        if isinstance(other, PackedAnswers):
+            return self._states == other._states
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return hash(self._states)
+
+    def __repr__(self):
+        return f"PackedAnswers({self.to_code()!r})"
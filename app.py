@@ -1,11 +1,37 @@
+import startup
 import streamlit as st
 import streamlit.components.v1 as components
-import google.generativeai as genai
+import hmac
 import json
-import math
 import time
+import uuid
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 
+from answer_code import InvalidAnswerCode, PackedAnswers
+from followup_json import FOLLOWUP_GENERATION_CONFIG, FollowupParseError, parse_followup_questions, parse_stats
+from llm import (EXPECTED_OUTPUT_TOKENS, MODEL_NAME, ProfileContext, configure, estimate_tokens, generate_limited,
+                 warm_up_client)
+from memo import ANSWERS, SESSION, ArtifactMemo, content_hash, fingerprint
+from pdf_pool import PdfPool, render_pdf
+from population import PopulationStats
+from prefetch import Prefetcher
+from prompts import (CHAPTER_PRIORITY, CHAPTER_PROMPTS, build_chapter_prompts, build_compact_profile_block,
+                     build_followup_block, build_followup_prompt, build_profile_block, chapter_title)
+from question_bank import get_translations, load_bank
+from rate_limit import RateLimiter
+from resilience import ResiliencePolicy
+from report import (CONTRAST_QUESTIONS, assemble_deep_text, contrast_rows, environment_rows, format_date, get_pdf,
+                    get_summary_markdown, pdf_key, pdf_styles)
+from response_cache import ResponseCache
+from scoring import analyze, pattern_keys
+from session_store import SessionStore, new_token
+from telemetry import MetricsServer, SpanLog, Telemetry
+from token_budget import TokenBudget, TokenLedger
+
+RERUN_STARTED = time.perf_counter()
+
 # ============================================================
 # PAGE CONFIG
 # ============================================================
@@ -19,8 +45,7 @@ st.set_page_config(
 # ============================================================
 # CUSTOM CSS
 # ============================================================
-st.markdown("""
-<style>
+CUSTOM_CSS = """<style>
     /* Hide Streamlit branding */
     #MainMenu {visibility: hidden;}
     footer {visibility: hidden;}
@@ -58,6 +83,12 @@ st.markdown("""
         font-size: 14px;
         color: #f1f5f9;
     }
+    .trait-percentile {
+        width: 44px;
+        text-align: right;
+        font-size: 12px;
+        color: #94a3b8;
+    }
     
     /* Mobile responsive trait bars */
     @media (max-width: 640px) {
@@ -73,6 +104,10 @@ st.markdown("""
             width: 24px;
             font-size: 12px;
         }
+        .trait-percentile {
+            width: 36px;
+            font-size: 11px;
+        }
     }
     
     /* Option buttons */
@@ -201,23 +236,15 @@ st.markdown("""
         50% { opacity: 0.5; }
     }
 </style>
-""", unsafe_allow_html=True)
-
-# Scroll to top helper - use session state to create unique key
-if "scroll_key" not in st.session_state:
-    st.session_state.scroll_key = 0
+"""
 
-# Increment on each rerun to force script re-execution
-st.session_state.scroll_key += 1
-
-# Use components.html for reliable script execution
-# Random string ensures no caching
-unique_id = f"{st.session_state.scroll_key}_{int(time.time() * 1000)}"
-components.html(f"""
-<div id="scroll-trigger-{unique_id}"></div>
+# ============================================================
+# SCROLL TO TOP
+# ============================================================
+SCROLL_TO_TOP_SCRIPT = """
 <script>
-    (function() {{
-        function scrollToTop() {{
+    (function() {
+        function scrollToTop() {
             // Try all possible scroll containers
             var targets = [
                 window.parent.document.querySelector('section.main'),
@@ -227,14 +254,14 @@ components.html(f"""
                 window.parent.document.body,
                 window.parent.document.documentElement
             ];
-            targets.forEach(function(el) {{
-                if (el) {{
+            targets.forEach(function(el) {
+                if (el) {
                     el.scrollTop = 0;
-                    if (el.scrollTo) el.scrollTo({{top: 0, left: 0, behavior: 'instant'}});
-                }}
-            }});
+                    if (el.scrollTo) el.scrollTo({top: 0, left: 0, behavior: 'instant'});
+                }
+            });
             window.parent.scrollTo(0, 0);
-        }}
+        }
         // Multiple attempts with delays for mobile
         scrollToTop();
         setTimeout(scrollToTop, 100);
@@ -242,329 +269,162 @@ components.html(f"""
         setTimeout(scrollToTop, 500);
         
         // Focus trick: find first header and scroll into view
-        setTimeout(function() {{
+        setTimeout(function() {
             var header = window.parent.document.querySelector('h1, h2, h3, .stMarkdown');
-            if (header) header.scrollIntoView({{behavior: 'instant', block: 'start'}});
-        }}, 200);
-    }})();
+            if (header) header.scrollIntoView({behavior: 'instant', block: 'start'});
+        }, 200);
+    })();
 </script>
-""", height=0)
-
-# ============================================================
-# TRANSLATIONS
-# ============================================================
-TRANSLATIONS = {
-    "en": {
-        "title": "Psychometric User Manual",
-        "subtitle": "Build a high-resolution profile of your personality architecture",
-        "phase1Title": "Phase 1: Discovery",
-        "phase1Desc": "20 questions mapping your baseline traits and drivers",
-        "phase2Title": "Phase 2: Stress Testing",
-        "phase2Desc": '15 high-pressure scenarios to reveal your "Dark Side"',
-        "phase3Title": "Phase 3: Solution Design",
-        "phase3Desc": "8 questions to co-create operational rules for blind spots",
-        "formatNote": "Format:",
-        "formatDesc": "You'll see two options (A vs B) for each question. Choose the one that resonates more strongly—even if neither is perfect. Then rate how strongly it fits. There are no right answers.",
-        "beginBtn": "Begin Assessment",
-        "choosePrompt": "Choose A or B",
-        "slightly": "Slightly",
-        "clearly": "Clearly",
-        "strongly": "Strongly",
-        "howStrongly": "How strongly?",
-        "back": "← Back",
-        "next": "Next →",
-        "pdfTitle": "Psychometric User Manual",
-        "pdfGenerated": "Generated on",
-        "architecture": "1. The Architecture",
-        "hardwareTitle": "Hardware (Temperament) — Big Five Profile",
-        "osTitle": "Operating System — Action Mode Profile",
-        "driversTitle": "Drivers (Motivation)",
-        "openness": "Openness to Experience",
-        "conscientiousness": "Conscientiousness",
-        "extraversion": "Extraversion",
-        "agreeableness": "Agreeableness",
-        "stability": "Emotional Stability",
-        "factFinder": "Research Drive",
-        "followThru": "Systems Drive",
-        "quickStart": "Launch Drive",
-        "implementor": "Build Drive",
-        "autonomy": "Autonomy",
-        "mastery": "Mastery",
-        "power": "Power",
-        "affiliation": "Affiliation",
-        "contextualContrasts": "2. Contextual Contrasts",
-        "trait": "Trait",
-        "closeButNot": "Close But Not You",
-        "clearlyNot": "Clearly Not You",
-        "decisionSpeed": "Decision Speed",
-        "riskProfile": "Risk Profile",
-        "conflictStyle": "Conflict Style",
-        "learningMode": "Learning Mode",
-        "darkSide": "3. Dark Side — Stress Patterns",
-        "identifiedDerailers": "Identified Derailers:",
-        "environmentFit": "4. Environment Fit",
-        "thrivesIn": "Thrives In",
-        "failsIn": "Fails In",
-        "operationalRules": "5. Operational Rules",
-        "rulesIntro": "Self-imposed rules to manage identified friction points:",
-        "disclaimer": "This assessment is for self-reflection purposes. For clinical or hiring decisions, consult validated instruments administered by qualified professionals.",
-        "impulsive": "Impulsive without data", "methodical": "Methodical planner",
-        "paralysis": "Analysis paralysis", "gambler": "Shoot-from-hip gambler",
-        "calcRisk": "Calculated risk-taker", "steadyOpt": "Steady optimizer",
-        "riskAverse": "Risk-averse preserver", "thrillSeek": "Thrill-seeking gambler",
-        "diplomatic": "Diplomatic challenger", "harmonious": "Harmonious mediator",
-        "avoider": "Conflict avoider", "aggressive": "Aggressive confronter",
-        "experimental": "Experimental learner", "studious": "Studious observer",
-        "theoretical": "Theoretical academic", "trialByFire": "Trial-by-fire improviser",
-        "highAutonomy": "High autonomy environments", "structured": "Structured team environments",
-        "micromanaged": "Micromanaged bureaucracies", "unstructured": "Unstructured chaos",
-        "fastMoving": "Fast-moving startups", "methodicalOrg": "Methodical organizations",
-        "slowMoving": "Slow-moving institutions", "moveFast": "Move-fast-break-things cultures",
-        "collaborative": "Collaborative, social settings", "deepWork": "Deep work, focus-driven cultures",
-        "isolated": "Isolated individual work", "constantMeetings": "Constant meetings and interruptions",
-        "learningFocused": "Learning-focused organizations", "executionFocused": "Execution-focused organizations",
-        "stagnant": "Stagnant, no-growth environments", "constantReinvention": "Constant reinvention chaos",
-        "confrontational": "Confrontational under pressure", "withdrawing": "Withdrawing under pressure",
-        "taskFocused": "Task-focused in emotional situations", "ruleBending": "Rule-bending when stakes are high",
-        "perfectionism": "Perfectionism under deadline", "selfSacrifice": "Self-sacrifice pattern",
-        "spreadingThin": "Spreading thin under chaos",
-        "rule1a": "Implement non-negotiable calendar blocks for recovery and deep work",
-        "rule1b": "Designate a trusted advisor with veto power over new commitments",
-        "rule2a": "Set 48-hour decision deadlines to prevent analysis paralysis",
-        "rule2b": "Institute 24-hour cooling-off periods for major decisions",
-        "rule3a": "Schedule monthly structured feedback sessions with key stakeholders",
-        "rule4a": "Apply 1.5x multiplier to all time estimates",
-        "rule4b": "Challenge yourself to act before feeling 'ready'",
-        "summaryTab": "📊 Summary",
-        "deepTab": "📖 Deep Analysis",
-        "generateBtn": "Generate Deep Analysis",
-        "generating": "Generating deep analysis...",
-        "downloadMd": "Download .md",
-        "downloadHtml": "Download .html (for PDF print)",
-        "startOver": "Start Over",
-        "completeForAnalysis": "Complete the full assessment for detailed analysis",
-        "completePhase3": "Complete Phase 3 for personalized rules.",
-    },
-    "de": {
-        "title": "Psychometrisches Benutzerhandbuch",
-        "subtitle": "Erstellen Sie ein hochauflösendes Profil Ihrer Persönlichkeitsarchitektur",
-        "phase1Title": "Phase 1: Entdeckung",
-        "phase1Desc": "20 Fragen zur Erfassung Ihrer grundlegenden Eigenschaften und Antriebe",
-        "phase2Title": "Phase 2: Stresstest",
-        "phase2Desc": '15 Hochdruckszenarien zur Enthüllung Ihrer "Schattenseite"',
-        "phase3Title": "Phase 3: Lösungsdesign",
-        "phase3Desc": "8 Fragen zur gemeinsamen Erstellung von Regeln für blinde Flecken",
-        "formatNote": "Format:",
-        "formatDesc": "Sie sehen zwei Optionen (A vs B) für jede Frage. Wählen Sie die, die stärker resoniert—auch wenn keine perfekt ist. Dann bewerten Sie, wie stark sie passt. Es gibt keine richtigen Antworten.",
-        "beginBtn": "Assessment Starten",
-        "choosePrompt": "Wählen Sie A oder B",
-        "slightly": "Leicht",
-        "clearly": "Klar",
-        "strongly": "Stark",
-        "howStrongly": "Wie stark?",
-        "back": "← Zurück",
-        "next": "Weiter →",
-        "pdfTitle": "Psychometrisches Benutzerhandbuch",
-        "pdfGenerated": "Erstellt am",
-        "architecture": "1. Die Architektur",
-        "hardwareTitle": "Hardware (Temperament) — Big Five Profil",
-        "osTitle": "Betriebssystem — Handlungsmodus-Profil",
-        "driversTitle": "Antriebe (Motivation)",
-        "openness": "Offenheit für Erfahrungen",
-        "conscientiousness": "Gewissenhaftigkeit",
-        "extraversion": "Extraversion",
-        "agreeableness": "Verträglichkeit",
-        "stability": "Emotionale Stabilität",
-        "factFinder": "Recherche-Antrieb",
-        "followThru": "System-Antrieb",
-        "quickStart": "Start-Antrieb",
-        "implementor": "Bau-Antrieb",
-        "autonomy": "Autonomie",
-        "mastery": "Meisterschaft",
-        "power": "Macht",
-        "affiliation": "Zugehörigkeit",
-        "contextualContrasts": "2. Kontextuelle Kontraste",
-        "trait": "Eigenschaft",
-        "closeButNot": "Ähnlich aber nicht Sie",
-        "clearlyNot": "Eindeutig nicht Sie",
-        "decisionSpeed": "Entscheidungsgeschwindigkeit",
-        "riskProfile": "Risikoprofil",
-        "conflictStyle": "Konfliktstil",
-        "learningMode": "Lernmodus",
-        "darkSide": "3. Schattenseite — Stressmuster",
-        "identifiedDerailers": "Identifizierte Entgleiser:",
-        "environmentFit": "4. Umgebungspassung",
-        "thrivesIn": "Blüht auf in",
-        "failsIn": "Scheitert in",
-        "operationalRules": "5. Operationelle Regeln",
-        "rulesIntro": "Selbstauferlegte Regeln zur Bewältigung identifizierter Reibungspunkte:",
-        "disclaimer": "Dieses Assessment dient der Selbstreflexion. Für klinische oder Personalentscheidungen konsultieren Sie validierte Instrumente von qualifizierten Fachleuten.",
-        "impulsive": "Impulsiv ohne Daten", "methodical": "Methodischer Planer",
-        "paralysis": "Analyse-Paralyse", "gambler": "Bauchentscheider",
-        "calcRisk": "Kalkulierter Risikoträger", "steadyOpt": "Stetiger Optimierer",
-        "riskAverse": "Risikoaverser Bewahrer", "thrillSeek": "Nervenkitzel-Sucher",
-        "diplomatic": "Diplomatischer Herausforderer", "harmonious": "Harmonischer Vermittler",
-        "avoider": "Konfliktvermeider", "aggressive": "Aggressiver Konfrontierer",
-        "experimental": "Experimenteller Lerner", "studious": "Fleißiger Beobachter",
-        "theoretical": "Theoretischer Akademiker", "trialByFire": "Feuertaufe-Improvisator",
-        "highAutonomy": "Hohe Autonomie-Umgebungen", "structured": "Strukturierte Team-Umgebungen",
-        "micromanaged": "Mikromanagte Bürokratien", "unstructured": "Unstrukturiertes Chaos",
-        "fastMoving": "Schnelllebige Startups", "methodicalOrg": "Methodische Organisationen",
-        "slowMoving": "Langsame Institutionen", "moveFast": "Schnell-handeln-Kulturen",
-        "collaborative": "Kollaborative, soziale Umgebungen", "deepWork": "Deep-Work, fokusgetriebene Kulturen",
-        "isolated": "Isolierte Einzelarbeit", "constantMeetings": "Ständige Meetings und Unterbrechungen",
-        "learningFocused": "Lernorientierte Organisationen", "executionFocused": "Umsetzungsorientierte Organisationen",
-        "stagnant": "Stagnierende Umgebungen ohne Wachstum", "constantReinvention": "Ständiges Neuerfindungs-Chaos",
-        "confrontational": "Konfrontativ unter Druck", "withdrawing": "Rückzug unter Druck",
-        "taskFocused": "Aufgabenorientiert in emotionalen Situationen",
-        "ruleBending": "Regelbeugung bei hohen Einsätzen",
-        "perfectionism": "Perfektionismus unter Zeitdruck", "selfSacrifice": "Selbstaufopferungsmuster",
-        "spreadingThin": "Verzetteln im Chaos",
-        "rule1a": "Implementieren Sie nicht verhandelbare Kalenderblöcke für Erholung und Deep Work",
-        "rule1b": "Bestimmen Sie einen vertrauenswürdigen Berater mit Vetorecht über neue Verpflichtungen",
-        "rule2a": "Setzen Sie 48-Stunden-Entscheidungsfristen gegen Analyse-Paralyse",
-        "rule2b": "Führen Sie 24-Stunden-Abkühlungsperioden für wichtige Entscheidungen ein",
-        "rule3a": "Planen Sie monatliche strukturierte Feedback-Sitzungen mit wichtigen Stakeholdern",
-        "rule4a": "Wenden Sie einen 1,5x Multiplikator auf alle Zeitschätzungen an",
-        "rule4b": "Fordern Sie sich heraus zu handeln, bevor Sie sich 'bereit' fühlen",
-        "summaryTab": "📊 Kurzübersicht",
-        "deepTab": "📖 Tiefenanalyse",
-        "generateBtn": "Tiefenanalyse generieren",
-        "generating": "Tiefenanalyse wird erstellt...",
-        "downloadMd": "Herunterladen .md",
-        "downloadHtml": "Herunterladen .html (für PDF-Druck)",
-        "startOver": "Neu Starten",
-        "completeForAnalysis": "Vervollständigen Sie das Assessment für detaillierte Analyse",
-        "completePhase3": "Vervollständigen Sie Phase 3 für personalisierte Regeln.",
-    }
-}
+"""
 
-# ============================================================
-# QUESTION BANKS
-# ============================================================
-QUESTIONS = {
-    "en": {
-        "discovery": [
-            {"id": 1, "category": "Big Five - Openness", "questionA": "You'd rather know everything about one topic", "questionB": "You'd rather know a bit about many topics"},
-            {"id": 2, "category": "Big Five - Conscientiousness", "questionA": "You finish things, even when they get boring", "questionB": "You move on when something better comes along"},
-            {"id": 3, "category": "Big Five - Extraversion", "questionA": "You think better when you talk to others", "questionB": "You think better when you're alone"},
-            {"id": 4, "category": "Big Five - Agreeableness", "questionA": "You say hard things, even if people don't like it", "questionB": "You keep the peace, even if it costs you"},
-            {"id": 5, "category": "Big Five - Neuroticism", "questionA": "A bit of stress helps you focus", "questionB": "You work best when you feel relaxed"},
-            {"id": 6, "category": "Action Mode - Research", "questionA": "You need data before you decide", "questionB": "You go with your gut and look things up later"},
-            {"id": 7, "category": "Action Mode - Systems", "questionA": "You like making lists and processes", "questionB": "Lists and processes slow you down"},
-            {"id": 8, "category": "Action Mode - Launch", "questionA": "You'd rather start now and fix later", "questionB": "You'd rather wait until it's ready"},
-            {"id": 9, "category": "Action Mode - Build", "questionA": "You understand things by building them", "questionB": "You understand things by thinking them through"},
-            {"id": 10, "category": "Core Driver - Autonomy", "questionA": "Freedom at work matters more than money", "questionB": "You'd give up some freedom for better pay"},
-            {"id": 11, "category": "Core Driver - Mastery", "questionA": "You want to be the best at one thing", "questionB": "You want to be good at many things"},
-            {"id": 12, "category": "Core Driver - Power", "questionA": "You like being in charge", "questionB": "You'd rather influence from the side"},
-            {"id": 13, "category": "Core Driver - Affiliation", "questionA": "Who you work with matters more than what you do", "questionB": "What you do matters more than who you work with"},
-            {"id": 14, "category": "Decision Making", "questionA": "You decide quickly and adjust if needed", "questionB": "You take your time to get it right the first time"},
-            {"id": 15, "category": "Risk Orientation", "questionA": "Big risks excite you", "questionB": "You prefer steady progress"},
-            {"id": 16, "category": "Conflict Style", "questionA": "You address problems directly", "questionB": "You find ways around confrontation"},
-            {"id": 17, "category": "Time Orientation", "questionA": "You plan for the future", "questionB": "You focus on today"},
-            {"id": 18, "category": "Learning Style", "questionA": "You learn by trying", "questionB": "You learn by watching first"},
-            {"id": 19, "category": "Success Definition", "questionA": "Success means building something that lasts", "questionB": "Success means living how you want"},
-            {"id": 20, "category": "Feedback Response", "questionA": "Criticism motivates you right away", "questionB": "Criticism needs time to sink in"},
-        ],
-        "stressTesting": [
-            {"id": 21, "category": "Stress - Volatility", "scenario": "Someone made an important decision without asking you.", "questionA": "You confront them right away", "questionB": "You step back and think before reacting"},
-            {"id": 22, "category": "Stress - Skepticism", "scenario": "A new colleague wants to change something you built.", "questionA": "You question their idea openly", "questionB": "You first check if they know what they're talking about"},
-            {"id": 23, "category": "Stress - Caution", "scenario": "A competitor just launched what you're working on.", "questionA": "You rush to launch, even if it's not perfect", "questionB": "You slow down to do it differently"},
-            {"id": 24, "category": "Stress - Detachment", "scenario": "Your team got bad news and people are upset.", "questionA": "You focus on fixing the problem", "questionB": "You first take care of how people feel"},
-            {"id": 25, "category": "Stress - Passive Resistance", "scenario": "Your boss wants you to do something you think is wrong.", "questionA": "You do it, but slowly", "questionB": "You say openly that you disagree"},
-            {"id": 26, "category": "Stress - Overconfidence", "scenario": "You present right after someone who did really well.", "questionA": "You try harder to match them", "questionB": "You stay calm and do your thing"},
-            {"id": 27, "category": "Stress - Risk-Taking", "scenario": "A shortcut would help your numbers but breaks the rules a bit.", "questionA": "You take it — results count", "questionB": "You skip it and miss the target"},
-            {"id": 28, "category": "Stress - Attention-Seeking", "scenario": "In a meeting, you should stay quiet and let others talk.", "questionA": "That's hard for you", "questionB": "That's easy for you"},
-            {"id": 29, "category": "Stress - Eccentricity", "scenario": "Someone calls your idea unrealistic.", "questionA": "You stick with it — they don't get it yet", "questionB": "You adjust to something more normal"},
-            {"id": 30, "category": "Stress - Perfectionism", "scenario": "80% done today or 100% in three weeks?", "questionA": "You wait for 100%", "questionB": "You go with 80%"},
-            {"id": 31, "category": "Stress - Compliance", "scenario": "Someone you trust gives you advice you don't agree with.", "questionA": "You follow it — they've earned your trust", "questionB": "You thank them and do your own thing"},
-            {"id": 32, "category": "Burnout Pattern", "scenario": "You're exhausted. Vacation is booked. A crisis comes up.", "questionA": "You cancel the vacation", "questionB": "You go anyway"},
-            {"id": 33, "category": "Failure Response", "scenario": "Your project just failed publicly.", "questionA": "You analyze what went wrong right away", "questionB": "You need distance first"},
-            {"id": 34, "category": "Trust Repair", "scenario": "Someone took credit for your work.", "questionA": "You talk to them directly first", "questionB": "You make sure others know the truth first"},
-            {"id": 35, "category": "Control Under Chaos", "scenario": "Everything goes wrong at once — people, money, product.", "questionA": "You pick what matters most and let the rest burn", "questionB": "You try to fix everything"},
-        ],
-        "solutionDesign": [
-            {"id": 36, "category": "Rule Design - Boundaries", "context": "You tend to take on too much when stressed.", "questionA": "You need blocked time that nobody can touch", "questionB": "You need someone who can say no for you"},
-            {"id": 37, "category": "Rule Design - Decision Making", "context": "You either think too much or too little before deciding.", "questionA": "You need deadlines to stop overthinking", "questionB": "You need waiting time to stop rushing"},
-            {"id": 38, "category": "Rule Design - Feedback", "context": "How you get feedback affects what you do with it.", "questionA": "You need scheduled feedback meetings", "questionB": "You need feedback right when things happen"},
-            {"id": 39, "category": "Rule Design - Energy Management", "context": "Your energy level affects your work quality.", "questionA": "You do hard things first, when you're fresh", "questionB": "You start with easy things to get going"},
-            {"id": 40, "category": "Rule Design - Relationships", "context": "Your style creates friction with certain people.", "questionA": "You need more patience with slower people", "questionB": "You need to push back more against loud people"},
-            {"id": 41, "category": "Rule Design - Blind Spots", "context": "Everyone has patterns they don't see.", "questionA": "You take on too much and underestimate time", "questionB": "You underestimate yourself and prepare too much"},
-            {"id": 42, "category": "Rule Design - Recovery", "context": "How you recover from setbacks matters.", "questionA": "You recover by doing something", "questionB": "You recover by resting"},
-            {"id": 43, "category": "Rule Design - Accountability", "context": "How you stay on track affects what you finish.", "questionA": "You need someone checking on you", "questionB": "Outside pressure makes it worse — you need your own system"},
-        ],
-    },
-    "de": {
-        "discovery": [
-            {"id": 1, "category": "Big Five - Offenheit", "questionA": "Du willst ein Thema richtig durchdringen", "questionB": "Du willst überall mitreden können"},
-            {"id": 2, "category": "Big Five - Gewissenhaftigkeit", "questionA": "Was du anfängst, machst du fertig", "questionB": "Wenn was Besseres kommt, wechselst du"},
-            {"id": 3, "category": "Big Five - Extraversion", "questionA": "Im Gespräch kommen dir die besten Ideen", "questionB": "Alleine denkst du am klarsten"},
-            {"id": 4, "category": "Big Five - Verträglichkeit", "questionA": "Du sagst, was Sache ist, auch wenn's unbequem ist", "questionB": "Du hältst die Gruppe zusammen, auch wenn du dafür zurücksteckst"},
-            {"id": 5, "category": "Big Five - Neurotizismus", "questionA": "Mit etwas Druck läufst du besser", "questionB": "Ohne Stress arbeitest du besser"},
-            {"id": 6, "category": "Handlungsmodus - Recherche", "questionA": "Ohne Fakten entscheidest du nicht", "questionB": "Du entscheidest aus dem Bauch"},
-            {"id": 7, "category": "Handlungsmodus - Systeme", "questionA": "Du machst dir gerne Systeme und Abläufe", "questionB": "Zu viel Struktur nervt dich"},
-            {"id": 8, "category": "Handlungsmodus - Umsetzung", "questionA": "Du legst einfach los und schaust, was passiert", "questionB": "Du planst erstmal gründlich durch"},
-            {"id": 9, "category": "Handlungsmodus - Bau", "questionA": "Du verstehst was, indem du es anfasst oder baust", "questionB": "Du verstehst was, indem du es im Kopf durchgehst"},
-            {"id": 10, "category": "Kernantrieb - Autonomie", "questionA": "Hauptsache selbstbestimmt arbeiten", "questionB": "Für gutes Geld nimmst du auch Vorgaben in Kauf"},
-            {"id": 11, "category": "Kernantrieb - Meisterschaft", "questionA": "In einer Sache richtig gut sein", "questionB": "In vielen Sachen brauchbar sein"},
-            {"id": 12, "category": "Kernantrieb - Macht", "questionA": "Du übernimmst gerne das Ruder", "questionB": "Du ziehst lieber im Hintergrund die Fäden"},
-            {"id": 13, "category": "Kernantrieb - Zugehörigkeit", "questionA": "Das Team ist wichtiger als die Aufgabe", "questionB": "Die Aufgabe ist wichtiger als das Team"},
-            {"id": 14, "category": "Entscheidungsfindung", "questionA": "Schnell entscheiden, notfalls korrigieren", "questionB": "Lieber einmal richtig entscheiden"},
-            {"id": 15, "category": "Risikoorientierung", "questionA": "Hohe Einsätze machen dir Spaß", "questionB": "Lieber stetig vorankommen"},
-            {"id": 16, "category": "Konfliktstil", "questionA": "Probleme sprichst du direkt an", "questionB": "Du suchst den Weg ohne Konfrontation"},
-            {"id": 17, "category": "Zeitorientierung", "questionA": "Du denkst an morgen", "questionB": "Du lebst im Jetzt"},
-            {"id": 18, "category": "Lernstil", "questionA": "Ausprobieren ist dein Weg zu lernen", "questionB": "Erstmal zugucken, dann selber machen"},
-            {"id": 19, "category": "Erfolgsdefinition", "questionA": "Erfolg heißt: was aufbauen, das bleibt", "questionB": "Erfolg heißt: leben wie du willst"},
-            {"id": 20, "category": "Feedback-Reaktion", "questionA": "Kritik bringt dich sofort in Bewegung", "questionB": "Kritik muss erstmal sacken"},
-        ],
-        "stressTesting": [
-            {"id": 21, "category": "Stress - Volatilität", "scenario": "Jemand hat über deinen Kopf hinweg entschieden.", "questionA": "Du gehst ihn sofort an", "questionB": "Du wartest ab und überlegst erstmal"},
-            {"id": 22, "category": "Stress - Skepsis", "scenario": "Der Neue will was ändern, das du aufgebaut hast.", "questionA": "Du stellst seine Idee vor allen in Frage", "questionB": "Du schaust dir erstmal an, was er drauf hat"},
-            {"id": 23, "category": "Stress - Vorsicht", "scenario": "Die Konkurrenz hat euch überholt.", "questionA": "Ihr haut schnell was raus, auch wenn's wackelt", "questionB": "Ihr macht es anders statt nur schneller"},
-            {"id": 24, "category": "Stress - Distanzierung", "scenario": "Im Team ist dicke Luft nach schlechten Nachrichten.", "questionA": "Du kümmerst dich ums Problem", "questionB": "Du kümmerst dich um die Leute"},
-            {"id": 25, "category": "Stress - Passiver Widerstand", "scenario": "Der Chef will was von dir, das du falsch findest.", "questionA": "Du machst mit, aber ohne Elan", "questionB": "Du sagst ihm, dass du das anders siehst"},
-            {"id": 26, "category": "Stress - Überschätzung", "scenario": "Vor dir hat jemand richtig abgeliefert.", "questionA": "Du legst noch eine Schippe drauf", "questionB": "Du machst einfach dein Ding"},
-            {"id": 27, "category": "Stress - Risikobereitschaft", "scenario": "Eine Abkürzung würde die Zahlen retten, ist aber grenzwertig.", "questionA": "Du nimmst sie — am Ende zählt das Ergebnis", "questionB": "Du lässt es und nimmst die schlechten Zahlen"},
-            {"id": 28, "category": "Stress - Aufmerksamkeit", "scenario": "Du sollst zuhören und dich zurückhalten.", "questionA": "Das fällt dir schwer", "questionB": "Das ist kein Problem"},
-            {"id": 29, "category": "Stress - Exzentrizität", "scenario": "Deine Idee wird als unrealistisch abgetan.", "questionA": "Du bleibst dabei — die anderen kapieren es noch nicht", "questionB": "Du schwenkst auf was Machbareres um"},
-            {"id": 30, "category": "Stress - Perfektionismus", "scenario": "80% jetzt oder 100% in drei Wochen?", "questionA": "Du wartest auf die 100%", "questionB": "Du nimmst die 80%"},
-            {"id": 31, "category": "Stress - Konformität", "scenario": "Jemand, dem du vertraust, rät dir was, das du falsch findest.", "questionA": "Du machst es trotzdem — er hat sich das Vertrauen verdient", "questionB": "Du gehst deinen eigenen Weg"},
-            {"id": 32, "category": "Burnout-Muster", "scenario": "Du bist platt. Urlaub steht an. Eine Krise kommt dazwischen.", "questionA": "Du bleibst und sagst den Urlaub ab", "questionB": "Du fährst trotzdem"},
-            {"id": 33, "category": "Misserfolgsreaktion", "scenario": "Dein Projekt ist gerade vor allen gescheitert.", "questionA": "Du gehst sofort in die Analyse", "questionB": "Du brauchst erstmal Abstand"},
-            {"id": 34, "category": "Vertrauensreparatur", "scenario": "Jemand hat sich mit deiner Arbeit geschmückt.", "questionA": "Du klärst das erstmal unter vier Augen", "questionB": "Du sorgst erstmal dafür, dass andere Bescheid wissen"},
-            {"id": 35, "category": "Kontrolle im Chaos", "scenario": "Alles brennt gleichzeitig — Team, Geld, Produkt.", "questionA": "Du konzentrierst dich auf das Wichtigste und lässt anderes liegen", "questionB": "Du versuchst, alles gleichzeitig zu retten"},
-        ],
-        "solutionDesign": [
-            {"id": 36, "category": "Regeldesign - Grenzen", "context": "Unter Druck nimmst du zu viel auf dich.", "questionA": "Du brauchst feste Zeiten, die keiner antastet", "questionB": "Du brauchst jemanden, der für dich bremst"},
-            {"id": 37, "category": "Regeldesign - Entscheidungsfindung", "context": "Du grübelst entweder zu lang oder entscheidest zu schnell.", "questionA": "Du brauchst Fristen, die dich zum Entscheiden zwingen", "questionB": "Du brauchst Pausen, die dich vom Schnellschuss abhalten"},
-            {"id": 38, "category": "Regeldesign - Feedback", "context": "Wie Feedback bei dir ankommt, entscheidet, was du damit machst.", "questionA": "Du brauchst feste Termine dafür", "questionB": "Du brauchst es sofort, wenn was ist"},
-            {"id": 39, "category": "Regeldesign - Energiemanagement", "context": "Deine Energie über den Tag beeinflusst deine Arbeit.", "questionA": "Das Schwere machst du morgens", "questionB": "Du brauchst Anlauf mit kleinen Sachen"},
-            {"id": 40, "category": "Regeldesign - Beziehungen", "context": "Mit bestimmten Leuten hakt es bei dir.", "questionA": "Du musst geduldiger mit den Langsamen sein", "questionB": "Du musst mehr Kontra geben bei den Lauten"},
-            {"id": 41, "category": "Regeldesign - Blinde Flecken", "context": "Jeder hat Muster, die er selbst nicht sieht.", "questionA": "Du unterschätzt, wie lang Dinge dauern", "questionB": "Du unterschätzt, was du kannst"},
-            {"id": 42, "category": "Regeldesign - Erholung", "context": "Wie du dich von Rückschlägen erholst.", "questionA": "Indem du was tust", "questionB": "Indem du Ruhe findest"},
-            {"id": 43, "category": "Regeldesign - Verantwortlichkeit", "context": "Wie du dich selbst bei der Stange hältst.", "questionA": "Jemand muss nachhaken", "questionB": "Druck von außen macht es schlimmer — du brauchst dein eigenes System"},
-        ],
-    }
-}
+# Injects CUSTOM_CSS into the parent page once; the style tag outlives the iframe
+CSS_INJECT_SCRIPT = """
+<script>
+    (function() {
+        var doc = window.parent.document;
+        if (doc.getElementById('pm-custom-css')) return;
+        var holder = doc.createElement('div');
+        holder.innerHTML = %s;
+        var style = holder.querySelector('style');
+        style.id = 'pm-custom-css';
+        doc.head.appendChild(style);
+    })();
+</script>
+""" % json.dumps(CUSTOM_CSS)
+
+def render_static_assets():
+    """Send styling and the scroll-to-top script, returning the bytes sent this rerun.
+    
+    With RENDER_ASSETS_ONCE (default) the stylesheet is injected into the page head
+    when a session starts or changes page, and scroll-to-top runs only when the
+    page or question changes. Otherwise both are re-sent on every rerun.
+    """
+    if "scroll_key" not in st.session_state:
+        st.session_state.scroll_key = 0
+    
+    if not get_setting("RENDER_ASSETS_ONCE", True):
+        st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+        # Increment on each rerun to force script re-execution
+        st.session_state.scroll_key += 1
+        unique_id = f"{st.session_state.scroll_key}_{int(time.time() * 1000)}"
+        html = f'<div id="scroll-trigger-{unique_id}"></div>{SCROLL_TO_TOP_SCRIPT}'
+        components.html(html, height=0)
+        return len(CUSTOM_CSS.encode()) + len(html.encode())
+    
+    # Always occupy the same slot so later elements keep their positions
+    slot = st.empty()
+    page = st.session_state.get("page", "language")
+    nav_state = (page, st.session_state.get("current_index", 0), st.session_state.get("followup_index", 0))
+    previous = st.session_state.get("asset_nav_state")
+    if previous == nav_state:
+        return 0
+    
+    st.session_state.asset_nav_state = nav_state
+    st.session_state.scroll_key += 1
+    html = f'<div id="scroll-trigger-{st.session_state.scroll_key}"></div>'
+    if previous is None or previous[0] != page:
+        html += CSS_INJECT_SCRIPT
+    html += SCROLL_TO_TOP_SCRIPT
+    with slot:
+        components.html(html, height=0)
+    return len(html.encode())
+
+def is_operator():
+    """Whether this visitor may see process-wide stats.
+
+    True with SHOW_RERUN_STATS on (every visitor, meant for local use) or
+    when ?perf= matches the ADMIN_TOKEN secret.
+    """
+    if get_setting("SHOW_RERUN_STATS", False):
+        return True
+    token = str(get_setting("ADMIN_TOKEN", "") or "")
+    given = st.query_params.get("perf", "")
+    return bool(token) and hmac.compare_digest(given.encode("utf-8"), token.encode("utf-8"))
+
+def render_token_usage():
+    """Token use and cost of all profiles over the last 7 days (operators only)."""
+    budget = get_token_budget()
+    if budget is None or not is_operator():
+        return
+    with st.expander("Token usage (last 7 days)"):
+        left = budget.remaining(st.session_state.profile_id)
+        st.caption(f"this profile: {budget.ledger.profile_tokens(st.session_state.profile_id):,} tokens"
+                   + ("" if left is None else f" · {left:,} left in budget"))
+        st.table(budget.ledger.daily_summary(days=7, prices=token_prices()))
+
+def record_rerun_stats(asset_bytes):
+    """Keep per-rerun script time and fixed-overhead bytes; show them when enabled."""
+    seconds = time.perf_counter() - RERUN_STARTED
+    stats = st.session_state.setdefault("rerun_stats", [])
+    stats.append({
+        "page": st.session_state.get("page"),
+        "ms": round(seconds * 1000, 1),
+        "asset_bytes": asset_bytes,
+    })
+    del stats[:-100]
+    telemetry = get_telemetry()
+    if telemetry is not None:
+        telemetry.record("rerun", seconds, {"page": stats[-1]["page"]})
+    
+    if is_operator():
+        sent = sum(s["asset_bytes"] for s in stats)
+        legacy = len(stats) * (len(CUSTOM_CSS.encode()) + len(SCROLL_TO_TOP_SCRIPT.encode()))
+        st.caption(
+            f"⏱ Rerun {len(stats)}: {stats[-1]['ms']} ms script · {asset_bytes:,} B styling/scroll "
+            f"· session total {sent:,} B (per-rerun resend: {legacy:,} B)"
+        )
+        with st.expander("Startup timings"):
+            for label, seconds in startup.report():
+                st.caption(f"{label}: {seconds * 1000:,.0f} ms")
+        with st.expander("Model call resilience"):
+            policy_stats = get_resilience_policy().stats()
+            st.caption(" · ".join(f"{k}: {v}" for k, v in policy_stats.items() if not isinstance(v, dict)) or "no calls yet")
+            for name in ("calls", "reports"):
+                latency = policy_stats[name]
+                if latency["count"]:
+                    st.caption(f"{name}: n={latency['count']} · p50 {latency['p50']:.1f} s · p95 {latency['p95']:.1f} s · p99 {latency['p99']:.1f} s")
+            followup_parsing = parse_stats()
+            if followup_parsing:
+                st.caption("follow-up parsing: " + " · ".join(f"{k}: {v}" for k, v in followup_parsing.items()))
+            st.caption("answer memo: " + " · ".join(f"{k}: {v}" for k, v in st.session_state.artifact_memo.stats().items()))
+            prefetch_stats = get_prefetcher().stats()
+            if prefetch_stats:
+                st.caption("follow-up prefetch: " + " · ".join(f"{k}: {v}" for k, v in prefetch_stats.items()))
+        render_token_usage()
+        if telemetry is not None:
+            with st.expander("Spans (all sessions)"):
+                st.table([
+                    {"span": name, "labels": ", ".join(f"{k}={v}" for k, v in labels.items()), "n": latency["count"],
+                     "p50 ms": round(latency["p50"] * 1000, 1), "p95 ms": round(latency["p95"] * 1000, 1)}
+                    for name, labels, latency in telemetry.summary()
+                ])
 
 # ============================================================
 # HELPER FUNCTIONS
 # ============================================================
 
-def format_date(lang):
-    """Format current date properly for German/English."""
-    now = datetime.now()
-    if lang == "de":
-        months_de = ["Januar", "Februar", "März", "April", "Mai", "Juni", 
-                     "Juli", "August", "September", "Oktober", "November", "Dezember"]
-        return f"{now.day}. {months_de[now.month - 1]} {now.year}"
-    else:
-        return now.strftime("%B %d, %Y")
+def get_setting(name, default):
+    """Read an optional setting from secrets, falling back to a default."""
+    try:
+        return st.secrets.get(name, default)
+    except Exception:
+        return default
+
+# Phase key -> (title translation key, accent color)
+PHASE_STYLES = {
+    "discovery": ("phase1Title", "#3b82f6"),
+    "stressTesting": ("phase2Title", "#f59e0b"),
+    "solutionDesign": ("phase3Title", "#10b981"),
+}
+
+@st.cache_resource
+def get_question_bank(lang):
+    """Compiled question bank for a language, built once per process and shared by all sessions."""
+    return load_bank(lang)
 
 def get_all_questions(lang):
-    """Get all questions as a flat list."""
-    qs = QUESTIONS[lang]
-    return qs["discovery"] + qs["stressTesting"] + qs["solutionDesign"]
+    """Get all questions as a flat tuple."""
+    return get_question_bank(lang).questions
 
 def get_choice(q_id):
     """Get the choice (A or B) for a question."""
@@ -573,654 +433,734 @@ def get_choice(q_id):
         return None
     return a.get("choice")
 
-def get_intensity(q_id):
-    """Get the intensity (1-3) for a question."""
-    a = st.session_state.answers.get(q_id)
-    if a is None:
-        return 0
-    return a.get("intensity", 2)
+def get_memo():
+    """The session's artifact memo: ANSWERS artifacts follow the answers and language, SESSION ones also the follow-ups."""
+    state = st.session_state
+    return state.artifact_memo.sync({
+        ANSWERS: fingerprint(state.answers, state.language),
+        SESSION: fingerprint(state.answers, state.language, state.followup_questions, state.followup_answers),
+    })
 
 def analyze_results():
-    """Compute trait scores, stress patterns, and operational rules."""
-    lang = st.session_state.language
-    t = TRANSLATIONS[lang]
-    
-    raw = {
-        "openness": 5, "conscientiousness": 5, "extraversion": 5,
-        "agreeableness": 5, "stability": 5,
-        "factFinder": 5, "followThru": 5, "quickStart": 5, "implementor": 5,
-        "autonomy": 5, "mastery": 5, "power": 5, "affiliation": 5,
-    }
-    
-    def pri(q_id, trait, a_dir, b_dir):
-        c = get_choice(q_id)
-        if not c:
-            return
-        w = get_intensity(q_id)
-        raw[trait] += a_dir * w if c == "A" else b_dir * w
-    
-    def sec(q_id, trait, a_dir, b_dir=0):
-        c = get_choice(q_id)
-        if not c:
-            return
-        w = math.ceil(get_intensity(q_id) / 2)
-        raw[trait] += a_dir * w if c == "A" else b_dir * w
-    
-    # Phase 1: Primary
-    pri(1, "openness", -1, 1)
-    pri(2, "conscientiousness", 1, -1)
-    pri(3, "extraversion", 1, -1)
-    pri(4, "agreeableness", -1, 1)
-    pri(5, "stability", -1, 1)
-    pri(6, "factFinder", 1, -1)
-    pri(7, "followThru", 1, -1)
-    pri(8, "quickStart", 1, -1)
-    pri(9, "implementor", 1, -1)
-    pri(10, "autonomy", 1, -1)
-    pri(11, "mastery", 1, -1)
-    pri(12, "power", 1, -1)
-    pri(13, "affiliation", 1, -1)
-    
-    # Phase 1: Secondary
-    sec(14, "quickStart", 1, -1)
-    sec(15, "quickStart", 1, 0)
-    sec(15, "stability", -1, 1)
-    sec(16, "extraversion", 1, -1)
-    sec(16, "agreeableness", -1, 1)
-    sec(17, "openness", 1, -1)
-    sec(18, "quickStart", 1, 0)
-    sec(18, "implementor", 1, -1)
-    sec(19, "power", 1, -1)
-    sec(19, "mastery", 1, 0)
-    sec(20, "stability", 1, -1)
-    sec(20, "conscientiousness", 1, 0)
-    
-    # Phase 2: Secondary
-    sec(21, "extraversion", 1, -1)
-    sec(22, "agreeableness", -1, 0)
-    sec(23, "quickStart", 1, -1)
-    sec(24, "agreeableness", -1, 1)
-    sec(26, "extraversion", 1, 0)
-    sec(29, "openness", 1, -1)
-    sec(30, "conscientiousness", 1, -1)
-    sec(30, "followThru", 1, 0)
-    sec(31, "autonomy", -1, 1)
-    sec(31, "affiliation", 1, 0)
-    
-    # Clamp
-    traits = {}
-    for key, val in raw.items():
-        traits[key] = max(1, min(10, round(val)))
-    
-    # Stress patterns
-    stress = []
-    if get_choice(21) == "A": stress.append(t["confrontational"])
-    if get_choice(21) == "B": stress.append(t["withdrawing"])
-    if get_choice(24) == "A": stress.append(t["taskFocused"])
-    if get_choice(27) == "A": stress.append(t["ruleBending"])
-    if get_choice(30) == "A": stress.append(t["perfectionism"])
-    if get_choice(32) == "A": stress.append(t["selfSacrifice"])
-    if get_choice(35) == "B": stress.append(t["spreadingThin"])
-    
-    # Rules
-    rules = []
-    if get_choice(36) == "A": rules.append(t["rule1a"])
-    if get_choice(36) == "B": rules.append(t["rule1b"])
-    if get_choice(37) == "A": rules.append(t["rule2a"])
-    if get_choice(37) == "B": rules.append(t["rule2b"])
-    if get_choice(38) == "A": rules.append(t["rule3a"])
-    if get_choice(41) == "A": rules.append(t["rule4a"])
-    if get_choice(41) == "B": rules.append(t["rule4b"])
-    
-    return {"traits": traits, "stressPatterns": stress, "operationalRules": rules}
-
-def render_trait_bar(label, value, color="#3b82f6"):
-    """Render a colored progress bar for a trait."""
+    """Compute trait scores, stress patterns, and operational rules (once per answer state)."""
+    def build():
+        with span("analyze", page=st.session_state.page):
+            return analyze(st.session_state.answers, get_translations(st.session_state.language))
+    return get_memo().get("analysis", build, scope=ANSWERS)
+
+def get_profile_block(analysis, compact=False):
+    """The profile prompt block (or its compact form) of the current answers."""
+    build = build_compact_profile_block if compact else build_profile_block
+    return get_memo().get(
+        ("profile_block", compact),
+        lambda: build(get_all_questions(st.session_state.language), st.session_state.answers, analysis),
+        scope=ANSWERS,
+    )
+
+def get_population_context(analysis):
+    """How the current traits and stress patterns compare with earlier respondents, or None.
+
+    None when POPULATION_STATS is off or fewer than POPULATION_MIN_PROFILES
+    profiles were counted. Built once per answer state, so the results page
+    and the exports show the same numbers.
+    """
+    population = get_population()
+    if population is None:
+        return None
+    return get_memo().get("population", lambda: population.compare(
+        analysis["traits"], pattern_keys(st.session_state.answers)[0],
+        min_profiles=int(get_setting("POPULATION_MIN_PROFILES", 30)),
+    ), scope=ANSWERS)
+
+def record_population(analysis):
+    """Count the current profile in the population statistics once, when all questions are answered.
+
+    Keyed on the packed answers, so a profile resumed via ?r= or ?s= in a
+    new browser session is not counted again.
+    """
+    population = get_population()
+    answers = st.session_state.answers
+    if population is None or st.session_state.population_counted == answers.states:
+        return
+    if answers.first_unanswered() is not None:
+        return
+    stress_keys, rule_keys = pattern_keys(answers)
+    population.add(analysis["traits"], stress_keys, rule_keys, identity=answers.states)
+    st.session_state.population_counted = answers.states
+
+def get_chapter_prompts():
+    """Per-chapter instructions for the current language and follow-up answers."""
+    def build():
+        lang_name = "German" if st.session_state.language == "de" else "English"
+        followup_block = build_followup_block(st.session_state.followup_questions, st.session_state.followup_answers)
+        return build_chapter_prompts(lang_name, followup_block)
+    return get_memo().get("chapter_prompts", build, scope=SESSION)
+
+def render_trait_bar(label, value, color="#3b82f6", percentile=None, percentile_text=""):
+    """Render a colored progress bar for a trait, with its percentile rank if known."""
     pct = value * 10
+    rank = ""
+    if percentile is not None:
+        rank = f'<span class="trait-percentile" title="{percentile_text.format(pct=percentile)}">P{percentile}</span>'
     st.markdown(f"""
     <div class="trait-bar-container">
         <span class="trait-label">{label}</span>
         <div class="trait-bar-bg">
             <div class="trait-bar-fill" style="width:{pct}%;background:{color};"></div>
         </div>
-        <span class="trait-score">{value}</span>
+        <span class="trait-score">{value}</span>{rank}
     </div>
     """, unsafe_allow_html=True)
 
-def get_summary_markdown(analysis, t, lang):
-    """Build the summary as a markdown string."""
-    date_str = format_date(lang)
-    
-    def bar(v):
-        filled = round(v)
-        return "█" * filled + "░" * (10 - filled) + f" **{v}/10**"
-    
-    tr = analysis["traits"]
-    md = f"# {t['pdfTitle']}\n\n*{t['pdfGenerated']} {date_str}*\n\n---\n\n"
-    md += f"## {t['architecture']}\n\n### {t['hardwareTitle']}\n\n"
-    for key, label in [("openness", t["openness"]), ("conscientiousness", t["conscientiousness"]),
-                       ("extraversion", t["extraversion"]), ("agreeableness", t["agreeableness"]),
-                       ("stability", t["stability"])]:
-        md += f"- {label}: {bar(tr[key])}\n"
-    
-    md += f"\n### {t['osTitle']}\n\n"
-    for key, label in [("factFinder", t["factFinder"]), ("followThru", t["followThru"]),
-                       ("quickStart", t["quickStart"]), ("implementor", t["implementor"])]:
-        md += f"- {label}: {bar(tr[key])}\n"
-    
-    md += f"\n### {t['driversTitle']}\n\n"
-    for key, label in [("autonomy", t["autonomy"]), ("mastery", t["mastery"]),
-                       ("power", t["power"]), ("affiliation", t["affiliation"])]:
-        md += f"- {label}: {bar(tr[key])}\n"
-    
-    md += f"\n---\n\n## {t['darkSide']}\n\n"
-    if analysis["stressPatterns"]:
-        for p in analysis["stressPatterns"]:
-            md += f"- ⚠️ {p}\n"
-    
-    md += f"\n---\n\n## {t['operationalRules']}\n\n{t['rulesIntro']}\n\n"
-    for i, r in enumerate(analysis["operationalRules"]):
-        md += f"### Rule {i+1}\n\n{r}\n\n"
-    
-    md += f"\n---\n\n*{t['disclaimer']}*"
-    return md
+STREAM_REFRESH_SECONDS = 0.15
 
-def get_summary_html(analysis, t, lang):
-    """Build a print-ready HTML document for the summary."""
-    date_str = format_date(lang)
-    tr = analysis["traits"]
-    
-    def bar_html(label, value, color):
-        pct = value * 10
-        return f'''<div style="display:flex;align-items:center;gap:12px;padding:5px 0;">
-            <span style="width:180px;font-size:10pt;font-weight:500;color:#374151;">{label}</span>
-            <div style="flex:1;height:10px;background:#e5e7eb;border-radius:5px;overflow:hidden;">
-                <div style="height:100%;width:{pct}%;background:{color};border-radius:5px;"></div>
-            </div>
-            <span style="width:24px;text-align:right;font-weight:700;font-size:10pt;color:#111827;">{value}</span>
-        </div>'''
-    
-    big5 = "".join([bar_html(t[k], tr[k], "#3b82f6") for k in ["openness","conscientiousness","extraversion","agreeableness","stability"]])
-    modes = "".join([bar_html(t[k], tr[k], "#a855f7") for k in ["factFinder","followThru","quickStart","implementor"]])
-    drivers = "".join([bar_html(t[k], tr[k], "#ec4899") for k in ["autonomy","mastery","power","affiliation"]])
+@st.cache_resource
+def get_response_cache():
+    """Process-wide LLM response cache shared by all sessions (None unless RESPONSE_CACHE opts in).
     
-    stress_html = ""
-    if analysis["stressPatterns"]:
-        stress_html = "<ul>" + "".join([f"<li style='margin:4px 0;'>⚠️ {p}</li>" for p in analysis["stressPatterns"]]) + "</ul>"
-    else:
-        stress_html = f"<p>{t['completeForAnalysis']}</p>"
-    
-    env_rows = ""
-    pairs = [
-        (tr["autonomy"] >= 6, t["highAutonomy"], t["structured"], t["micromanaged"], t["unstructured"]),
-        (tr["quickStart"] >= 6, t["fastMoving"], t["methodicalOrg"], t["slowMoving"], t["moveFast"]),
-        (tr["extraversion"] >= 6, t["collaborative"], t["deepWork"], t["isolated"], t["constantMeetings"]),
-        (tr["mastery"] >= 6, t["learningFocused"], t["executionFocused"], t["stagnant"], t["constantReinvention"]),
-    ]
-    for cond, thrive_hi, thrive_lo, fail_hi, fail_lo in pairs:
-        thrive = thrive_hi if cond else thrive_lo
-        fail = fail_hi if cond else fail_lo
-        env_rows += f'<tr><td style="padding:6px 12px;border:1px solid #e5e7eb;color:#059669;">✅ {thrive}</td><td style="padding:6px 12px;border:1px solid #e5e7eb;color:#dc2626;">❌ {fail}</td></tr>'
-    
-    rules_html = ""
-    if analysis["operationalRules"]:
-        rules_html = "".join([f"<p><strong>Rule {i+1}:</strong> {r}</p>" for i, r in enumerate(analysis["operationalRules"])])
-    else:
-        rules_html = f'<p style="color:#9ca3af;font-style:italic;">{t["completePhase3"]}</p>'
-    
-    return f'''<!DOCTYPE html><html><head><meta charset="UTF-8"><title>{t["pdfTitle"]}</title>
-    <style>
-        @page {{ margin: 20mm 18mm; size: A4; }}
-        body {{ font-family: 'Helvetica Neue','Arial',sans-serif; font-size: 10pt; color: #1a1a1a; line-height: 1.5; max-width: 700px; margin: 0 auto; padding: 20px; }}
-        @media print {{ body {{ -webkit-print-color-adjust: exact; print-color-adjust: exact; }} }}
-    </style></head><body>
-    <h1 style="font-size:22pt;color:#111827;margin:0 0 4px;">{t["pdfTitle"]}</h1>
-    <p style="color:#6b7280;margin:0 0 24px;">{t["pdfGenerated"]} {date_str}</p>
-    <h2 style="font-size:14pt;border-bottom:2px solid #e5e7eb;padding-bottom:6px;">{t["architecture"]}</h2>
-    <h3 style="font-size:11pt;color:#374151;margin-top:16px;">{t["hardwareTitle"]}</h3>{big5}
-    <h3 style="font-size:11pt;color:#374151;margin-top:16px;">{t["osTitle"]}</h3>{modes}
-    <h3 style="font-size:11pt;color:#374151;margin-top:16px;">{t["driversTitle"]}</h3>{drivers}
-    <h2 style="font-size:14pt;border-bottom:2px solid #e5e7eb;padding-bottom:6px;margin-top:28px;">{t["darkSide"]}</h2>
-    <p style="font-weight:600;">{t["identifiedDerailers"]}</p>{stress_html}
-    <h2 style="font-size:14pt;border-bottom:2px solid #e5e7eb;padding-bottom:6px;margin-top:28px;">{t["environmentFit"]}</h2>
-    <table style="border-collapse:collapse;width:100%;margin:8px 0;">
-    <tr style="background:#f9fafb;"><th style="padding:8px 12px;border:1px solid #e5e7eb;text-align:left;">{t["thrivesIn"]}</th><th style="padding:8px 12px;border:1px solid #e5e7eb;text-align:left;">{t["failsIn"]}</th></tr>
-    {env_rows}</table>
-    <h2 style="font-size:14pt;border-bottom:2px solid #e5e7eb;padding-bottom:6px;margin-top:28px;">{t["operationalRules"]}</h2>
-    <p style="color:#6b7280;">{t["rulesIntro"]}</p>{rules_html}
-    <div style="margin-top:32px;padding-top:12px;border-top:1px solid #e5e7eb;">
-    <p style="font-size:8pt;color:#9ca3af;font-style:italic;">{t["disclaimer"]}</p>
-    </div></body></html>'''
-
-def generate_deep_analysis(analysis):
-    """Call Gemini API to generate the deep analysis."""
-    lang_name = "German" if st.session_state.language == "de" else "English"
-    lang = st.session_state.language
-    t = TRANSLATIONS[lang]
-    
-    # Build answer summary
-    all_qs = get_all_questions(lang)
-    lines = []
-    for q in all_qs:
-        c = get_choice(q["id"])
-        if not c:
-            continue
-        intensity = get_intensity(q["id"])
-        i_label = "slightly" if intensity == 1 else ("clearly" if intensity == 2 else "strongly")
-        scenario = f'Scenario: {q["scenario"]} | ' if q.get("scenario") else ""
-        context = f'Context: {q["context"]} | ' if q.get("context") else ""
-        lines.append(f'Q{q["id"]} [{q["category"]}]: {scenario}{context}A: "{q["questionA"]}" | B: "{q["questionB"]}" | CHOSE: {c} ({i_label})')
-    answer_summary = "\n".join(lines)
-    
-    tr = analysis["traits"]
-    trait_summary = f"""Big Five (1-10): Openness={tr["openness"]}, Conscientiousness={tr["conscientiousness"]}, Extraversion={tr["extraversion"]}, Agreeableness={tr["agreeableness"]}, Stability={tr["stability"]}
-Action Modes (1-10): ResearchDrive={tr["factFinder"]}, SystemsDrive={tr["followThru"]}, LaunchDrive={tr["quickStart"]}, BuildDrive={tr["implementor"]}
-Drivers (1-10): Autonomy={tr["autonomy"]}, Mastery={tr["mastery"]}, Power={tr["power"]}, Affiliation={tr["affiliation"]}
-Stress Patterns: {', '.join(analysis['stressPatterns']) or 'None'}
-Rules: {' | '.join(analysis['operationalRules']) or 'None'}"""
-
-    base_context = f"""You are a world-class Psychometric Analyst. Write in {lang_name}. Be personal, reference specific answers. No filler, no generic advice. Direct style like a trusted advisor. HARD LIMIT: Stay under 300 words. Complete every sentence.
-
-IMPORTANT: Never use trademarked assessment names. Never write "Kolbe", "Hogan", "HDS", "NEO-PI-R", "MBTI", "Myers-Briggs", "DISC", "StrengthsFinder", "CliftonStrengths", or "Enneagram" as product names. Use our own terms: "Research Drive", "Systems Drive", "Launch Drive", "Build Drive" for action modes. Say "Big Five" or "Five Factor" for temperament (these are academic, not trademarked). Say "action modes" not "Kolbe modes". Say "stress derailers" not "HDS scales".
-
-DATA:
-{answer_summary}
-
-SCORES:
-{trait_summary}{get_followup_data_for_prompt()}"""
-
-    chapters = [
-        f"""{base_context}
-
-Write ONLY (max 300 words):
-
-# Deep Psychometric Analysis
-
-## 1. Executive Summary
-2 paragraphs: who this person is, their central paradox, what makes their combination unique. Bold and specific.""",
-
-        f"""{base_context}
-
-Write ONLY (max 300 words). No title/summary.
-
-## 2. Temperament: Openness & Conscientiousness
-
-1 focused paragraph per trait: score meaning, how they interact, "close but not you". No fluff.""",
-
-        f"""{base_context}
-
-Write ONLY (max 300 words). No prior sections.
-
-## (continued) Extraversion, Agreeableness & Stability
-
-1 focused paragraph per trait: score meaning, interactions, "close but not you".""",
-
-        f"""{base_context}
-
-Write ONLY (max 300 words). No prior sections.
-
-## 3. Operating System: Action Modes
-
-1 paragraph covering all four action mode dimensions (Research Drive, Systems Drive, Launch Drive, Build Drive): their instinctive approach, what happens when forced against it, how it connects to temperament.""",
-
-        f"""{base_context}
-
-Write ONLY (max 300 words). No prior sections.
-
-## 4. The Drivers: What Fuels and What Drains
-
-Dominant driver, key tension between drivers, what happens when starved. Concrete, no theory.""",
-
-        f"""{base_context}
-
-Write ONLY (max 300 words). No prior sections.
-
-## 5. The Dark Side: Derailers Under Pressure
-
-Name the pattern, trigger sequence, how it manifests, the cost, one early warning sign.""",
-
-        f"""{base_context}
-
-Write ONLY (max 300 words). No prior sections.
-
-## 6. Core Paradoxes
-
-2 paradoxes max. Name each, explain friction, show superpower vs liability. Brief.""",
-
-        f"""{base_context}
-
-Write ONLY (max 300 words). No prior sections.
-
-## 7. Environment Fit
-
-Ideal org/role, 3 red flags, boss type, team dynamics. Bullet-style density, no padding.""",
-
-        f"""{base_context}
-
-Write ONLY (max 300 words). No prior sections.
-
-## 8. Operational Rules
-
-3 rules. Each: bold name, one sentence why, one sentence implementation, circuit breaker phrase. Tight.""",
-
-        f"""{base_context}
-
-Write ONLY (max 250 words). No prior sections.
+    Chapters and follow-up questions are personal and may quote a user's
+    follow-up answers, so they are written to disk only on request.
+    """
+    if not get_setting("RESPONSE_CACHE", False):
+        return None
+    return ResponseCache(
+        get_setting("RESPONSE_CACHE_PATH", ".cache/responses.sqlite3"),
+        ttl_seconds=float(get_setting("RESPONSE_CACHE_TTL_HOURS", 168)) * 3600,
+        max_bytes=int(float(get_setting("RESPONSE_CACHE_MAX_MB", 50)) * 1024 * 1024),
+    )
+
+@st.cache_resource
+def get_telemetry():
+    """Process-wide span recorder with a rotating JSONL log (None when TELEMETRY is off).
+    
+    With METRICS_PORT set, the aggregates are also served at /metrics in the
+    Prometheus text format.
+    """
+    if not get_setting("TELEMETRY", True):
+        return None
+    path = get_setting("TELEMETRY_PATH", ".cache/spans.jsonl")
+    log = SpanLog(
+        path,
+        max_bytes=int(float(get_setting("TELEMETRY_MAX_MB", 10)) * 1024 * 1024),
+        backups=int(get_setting("TELEMETRY_BACKUPS", 3)),
+    ) if path else None
+    telemetry = Telemetry(log)
+    port = int(get_setting("METRICS_PORT", 0))
+    if port:
+        try:
+            MetricsServer(telemetry, host=get_setting("METRICS_HOST", "127.0.0.1"), port=port).start()
+        except OSError:
+            pass
+    return telemetry
+
+def span(name, **labels):
+    """A telemetry span for the block (a no-op when TELEMETRY is off)."""
+    telemetry = get_telemetry()
+    if telemetry is None:
+        return nullcontext({})
+    return telemetry.span(name, **labels)
+
+@st.cache_resource
+def get_token_budget():
+    """Token ledger plus per-profile / per-day limits (0 = unlimited), or None when TOKEN_ACCOUNTING is off."""
+    if not get_setting("TOKEN_ACCOUNTING", True):
+        return None
+    ledger = TokenLedger(get_setting("TOKEN_LEDGER_PATH", ".cache/usage.sqlite3"))
+    return TokenBudget(
+        ledger,
+        per_profile=int(get_setting("TOKEN_BUDGET_PER_PROFILE", 0)),
+        per_day=int(get_setting("TOKEN_BUDGET_PER_DAY", 0)),
+    )
+
+def token_prices():
+    """USD per million input, cached input and output tokens, for the usage summary."""
+    return {
+        "input": float(get_setting("TOKEN_PRICE_INPUT_PER_M", 0.30)),
+        "cached": float(get_setting("TOKEN_PRICE_CACHED_PER_M", 0.075)),
+        "output": float(get_setting("TOKEN_PRICE_OUTPUT_PER_M", 2.50)),
+    }
 
-## 9. Who You Are at Your Best
+@st.cache_resource
+def get_population():
+    """Trait histograms and pattern counts of completed profiles, or None when POPULATION_STATS is off."""
+    if not get_setting("POPULATION_STATS", False):
+        return None
+    return PopulationStats(
+        get_setting("POPULATION_STATS_PATH", ".cache/population.sqlite3"),
+        dedup_days=float(get_setting("POPULATION_DEDUP_DAYS", 90)),
+    )
+
+@st.cache_resource
+def get_session_store():
+    """Local store for session progress and finished chapters, or None unless PERSIST_SESSIONS is on."""
+    if not get_setting("PERSIST_SESSIONS", False):
+        return None
+    return SessionStore(
+        get_setting("SESSION_STORE_PATH", ".cache/sessions.sqlite3"),
+        retention_seconds=float(get_setting("SESSION_RETENTION_DAYS", 7)) * 24 * 3600,
+    )
+
+@st.cache_resource
+def get_pdf_pool():
+    """Shared PDF worker processes, or None to render in the server process (PDF_WORKERS = 0)."""
+    workers = int(get_setting("PDF_WORKERS", 2))
+    if workers <= 0:
+        return None
+    return PdfPool(
+        workers=workers,
+        queue_depth=int(get_setting("PDF_QUEUE_DEPTH", 8)),
+        timeout=float(get_setting("PDF_TIMEOUT_SECONDS", 30)),
+    )
+
+def warm_up_tasks():
+    """Background work that makes the first Gemini call and PDF export fast."""
+    pool = get_pdf_pool()
+    tasks = [("PDF worker pool", pool.warm_up) if pool is not None else ("PDF styles and fonts", pdf_styles)]
+    api_keys = get_api_keys()
+    if api_keys:
+        endpoint = get_api_endpoint()
+        tasks.insert(0, ("Gemini client", lambda: warm_up_client(api_keys[0], endpoint)))
+    return tasks
+
+def get_api_keys():
+    """GEMINI_API_KEYS (a list of keys to rotate across) if set, else GEMINI_API_KEY."""
+    keys = get_setting("GEMINI_API_KEYS", None) or []
+    if isinstance(keys, str):
+        keys = [keys]
+    if not keys and get_setting("GEMINI_API_KEY", ""):
+        keys = [get_setting("GEMINI_API_KEY", "")]
+    return list(dict.fromkeys(keys))
+
+def get_api_endpoint():
+    """GEMINI_API_ENDPOINT, e.g. a local mock_gemini server for load tests, or None for the real API."""
+    return get_setting("GEMINI_API_ENDPOINT", "") or None
+
+@st.cache_resource
+def get_rate_limiter():
+    """Requests/tokens-per-minute limits shared by all sessions, or None when RATE_LIMIT is off."""
+    keys = get_api_keys()
+    if not keys or not get_setting("RATE_LIMIT", True):
+        return None
+    return RateLimiter(
+        keys,
+        rpm=int(get_setting("RATE_LIMIT_RPM", 60)),
+        tpm=int(get_setting("RATE_LIMIT_TPM", 1_000_000)),
+        max_wait=float(get_setting("RATE_LIMIT_MAX_WAIT_SECONDS", 120)),
+    )
+
+@st.cache_resource
+def get_resilience_policy():
+    """Timeouts, retries and hedging for all model calls, with process-wide counters."""
+    return ResiliencePolicy(
+        timeout=float(get_setting("LLM_TIMEOUT_SECONDS", 120)),
+        max_attempts=int(get_setting("LLM_MAX_ATTEMPTS", 3)),
+        base_delay=float(get_setting("LLM_BACKOFF_BASE_SECONDS", 1.0)),
+        max_delay=float(get_setting("LLM_BACKOFF_MAX_SECONDS", 20.0)),
+        hedge=bool(get_setting("LLM_HEDGE", False)),
+        hedge_quantile=float(get_setting("LLM_HEDGE_QUANTILE", 0.95)),
+    )
+
+def format_queue_position(position, seconds, lang):
+    """Status line for a call waiting for API quota."""
+    if lang == "de":
+        return f"⏳ Warte auf API-Kontingent · Position {position + 1} · ca. {seconds:.0f} s"
+    return f"⏳ Waiting for API quota · position {position + 1} · ~{seconds:.0f} s"
+
+def take_cache_bypass():
+    """Consume the one-shot "skip the response cache" flag set by Redo/Retry."""
+    bypass = st.session_state.bypass_response_cache
+    st.session_state.bypass_response_cache = False
+    return bypass
+
+def get_profile_context(analysis, compact=False):
+    """Return the session's shared profile context, rebuilding it when answers change.
+    
+    compact switches to the shorter block used when the token budget is nearly spent.
+    """
+    block = get_profile_block(analysis, compact)
+    ctx = st.session_state.profile_context
+    if ctx is None or not ctx.matches(block):
+        if ctx is not None:
+            ctx.close()
+        # A provider-side cache belongs to the key that created it, so rotating keys use prefix reuse
+        use_explicit_cache = bool(get_setting("CONTEXT_CACHING", True)) and len(get_api_keys()) <= 1
+        ctx = ProfileContext(block, use_explicit_cache=use_explicit_cache)
+        st.session_state.profile_context = ctx
+    return ctx
+
+def chapter_record(index, prompt_hash, text=None, error=None, source="api", seconds=0.0, context="full"):
+    """One chapter of the deep analysis as stored in session state."""
+    return {
+        "index": index,
+        "prompt_hash": prompt_hash,
+        "status": "ok" if error is None else "error",
+        "text": text or "",
+        "error": None if error is None else str(error),
+        "source": source,
+        "context": context,
+        "seconds": round(seconds, 3),
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+    }
 
-1-2 paragraphs: peak performance portrait. What it looks like when all systems align. End strong. FINISH the final sentence completely.""",
-    ]
+def generate_deep_analysis(analysis, targets=None, fresh=False):
+    """Call Gemini API to generate the deep analysis as a list of chapter records.
+    
+    targets limits generation to those chapter indices and keeps the other
+    existing records; fresh skips the response cache for the targets. When
+    the token budget cannot cover the chapters, they are written from the
+    compact profile context and, if that is still too much, the lowest
+    priority chapters are skipped before any call is made.
+    """
+    lang = st.session_state.language
+    existing = {record["index"]: record for record in st.session_state.deep_chapters}
     
     # Configure Gemini
     try:
-        genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
+        configure(get_api_keys()[0], get_api_endpoint())
+        with span("prompt", page="results", kind="profile"):
+            ctx = get_profile_context(analysis)
     except Exception as e:
-        return f"Error: Could not configure API. Make sure GEMINI_API_KEY is set in secrets. ({e})"
-    
-    model = genai.GenerativeModel("gemini-2.5-flash")
-    full_report = ""
+        error = f"Could not configure API. Make sure GEMINI_API_KEY is set in secrets. ({e})"
+        return [chapter_record(i, None, error=error) for i in range(len(CHAPTER_PROMPTS))]
+    
+    with span("prompt", page="results", kind="chapters"):
+        chapters = get_chapter_prompts()
+    concurrency = max(1, min(len(chapters), int(get_setting("CHAPTER_CONCURRENCY", 4))))
+    stream = bool(get_setting("STREAM_RESPONSES", True))
+    chapter_label = "Kapitel" if lang == "de" else "Chapter"
+    cache_keys = [ResponseCache.make_key(MODEL_NAME, {}, ctx.full_prompt(p)) for p in chapters]
+    # Not uploaded: only used for estimates and to recognize chapters written from it
+    compact_ctx = ProfileContext(get_profile_block(analysis, compact=True), use_explicit_cache=False)
+    compact_keys = [ResponseCache.make_key(MODEL_NAME, {}, compact_ctx.full_prompt(p)) for p in chapters]
+    if targets is None:
+        targets = range(len(chapters))
+    targets = set(targets)
+    
+    # Chapters that are not regenerated keep their record if it still matches the prompt
+    records = [None] * len(chapters)
+    for i in range(len(chapters)):
+        record = existing.get(i)
+        if i not in targets and record is not None and record["prompt_hash"] in (cache_keys[i], compact_keys[i]):
+            records[i] = record
+    
+    # Identical prompts are answered from the shared response cache unless fresh text was asked for
+    cache = get_response_cache()
+    if cache is not None and not fresh:
+        for i, key in enumerate(cache_keys):
+            if records[i] is None:
+                cached_text = cache.get(key)
+                if cached_text is not None:
+                    records[i] = chapter_record(i, key, cached_text, source="cache")
+                    persist_chapter(records[i])
+                    ctx.record_cached_response()
+    
+    # Shorten the context, then drop low-priority chapters, until the estimate fits the budget
+    budget = get_token_budget()
+    profile_id = st.session_state.profile_id
+    context = "full"
+    missing = [i for i, record in enumerate(records) if record is None]
+    if budget is not None and missing:
+        order = [i for i in CHAPTER_PRIORITY if i in missing]
+        mode, allowed = budget.plan(
+            profile_id,
+            {i: estimate_tokens(ctx.full_prompt(chapters[i])) + EXPECTED_OUTPUT_TOKENS for i in order},
+            {i: estimate_tokens(compact_ctx.full_prompt(chapters[i])) + EXPECTED_OUTPUT_TOKENS for i in order},
+        )
+        if mode != "full":
+            context = "compact"
+            ctx = get_profile_context(analysis, compact=True)
+            skipped = ("Token-Budget erreicht – Kapitel übersprungen" if lang == "de"
+                       else "Token budget reached – chapter skipped")
+            for i in missing:
+                cache_keys[i] = compact_keys[i]
+                cached_text = cache.get(cache_keys[i]) if cache is not None and not fresh else None
+                if cached_text is not None:
+                    records[i] = chapter_record(i, cache_keys[i], cached_text, source="cache", context=context)
+                    ctx.record_cached_response()
+                elif i not in allowed:
+                    records[i] = chapter_record(i, cache_keys[i], error=skipped, source="budget", context=context)
+                else:
+                    continue
+                persist_chapter(records[i])
     
-    # Create container for live output
+    # One placeholder per chapter so finished chapters land in reading order
     output_container = st.container()
+    with output_container:
+        placeholders = [st.empty() for _ in chapters]
+    for i, placeholder in enumerate(placeholders):
+        placeholder.caption(f"⏳ {chapter_label} {i+1}/{len(chapters)}")
     status_text = st.empty()
     
-    for i, prompt in enumerate(chapters):
-        status_text.markdown(f"**{'Generiere Kapitel' if lang == 'de' else 'Generating chapter'} {i+1}/{len(chapters)}...**")
-        
-        try:
-            response = model.generate_content(prompt)
-            chapter_text = response.text
-            full_report += ("\n\n" if full_report else "") + chapter_text
+    # Chapters are independent, so fan them out and render in order as they complete.
+    # While streaming, the first unfinished chapter shows its text as it arrives.
+    buffers = [[] for _ in chapters]
+    usages = [{} for _ in chapters]
+    next_to_show = 0
+    missing = [i for i, record in enumerate(records) if record is None]
+    limiter = get_rate_limiter()
+    policy = get_resilience_policy()
+    telemetry = get_telemetry()
+    session_id = st.session_state.session_id
+    started = time.perf_counter()
+    
+    def run_chapter(i):
+        chapter_started = time.perf_counter()
+        if budget is not None:
+            # The estimates were checked up front; this catches calls that used more than estimated
+            budget.check(profile_id, estimate_tokens(ctx.full_prompt(chapters[i])) + EXPECTED_OUTPUT_TOKENS)
+        text = generate_limited(ctx, chapters[i], limiter=limiter, session_id=session_id, policy=policy,
+                                buffer=buffers[i], stream=stream, usage=usages[i],
+                                telemetry=telemetry, labels={"kind": "chapter", "chapter": i + 1})
+        return text, time.perf_counter() - chapter_started
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(run_chapter, i): i for i in missing}
+        submitted = {i: time.perf_counter() for i in missing}
+        pending = set(futures)
+        done = set()
+        while True:
+            for future in done:
+                i = futures[future]
+                if budget is not None and usages[i]:
+                    budget.ledger.record(profile_id, "chapter", usages[i])
+                try:
+                    text, seconds = future.result()
+                    records[i] = chapter_record(i, cache_keys[i], text, seconds=seconds, context=context)
+                    persist_chapter(records[i])
+                    if cache is not None:
+                        cache.put(cache_keys[i], text)
+                except Exception as e:
+                    records[i] = chapter_record(i, cache_keys[i], error=e, seconds=time.perf_counter() - submitted[i],
+                                                context=context)
+                    persist_chapter(records[i])
             
-            # Show chapter immediately as it's ready
-            with output_container:
-                st.markdown(chapter_text)
-                
-        except Exception as e:
-            error_msg = f"\n\n> ⚠️ Error in chapter {i+1}: {e}"
-            full_report += error_msg
-            with output_container:
-                st.warning(f"Chapter {i+1} error: {e}")
+            while next_to_show < len(chapters) and records[next_to_show] is not None:
+                with placeholders[next_to_show].container():
+                    render_chapter(records[next_to_show])
+                next_to_show += 1
+            
+            if stream and next_to_show < len(chapters) and buffers[next_to_show]:
+                placeholders[next_to_show].markdown("".join(buffers[next_to_show]) + " ▌")
+            
+            status = f"**{'Generiere Kapitel' if lang == 'de' else 'Generating chapters'}: {len(chapters) - len(pending)}/{len(chapters)}**"
+            queued = limiter.position(session_id) if limiter is not None else None
+            if queued is not None:
+                status += "  \n" + format_queue_position(*queued, lang)
+            status_text.markdown(status)
+            if not pending:
+                break
+            done, pending = wait(pending, timeout=STREAM_REFRESH_SECONDS, return_when=FIRST_COMPLETED)
     
     status_text.empty()
+    if missing:
+        policy.record_report(time.perf_counter() - started)
+        if telemetry is not None:
+            failed = sum(records[i]["status"] != "ok" for i in missing)
+            telemetry.record("report", time.perf_counter() - started, {"page": "results"},
+                             status="ok" if not failed else "partial", chapters=len(missing), failed=failed)
+    for usage in usages:
+        if usage:
+            ctx.record(usage)
+    if budget is not None and missing and all(record["status"] == "ok" for record in records):
+        budget.ledger.record_report(profile_id)
+    
+    return records
+
+def render_chapter(record):
+    """Show one chapter record: its text, or a warning if it failed."""
+    if record["status"] == "ok":
+        st.markdown(record["text"])
+    else:
+        st.warning(f"Chapter {record['index']+1} error: {record['error']}")
+
+def request_followup_questions(ctx, lang, session_id, cache, limiter, policy, stream, use_cache=True,
+                               on_progress=None, on_wait=None, cancel=None, parse_retries=1, telemetry=None,
+                               kind="followup", budget=None, profile_id=None):
+    """Ask for the follow-up questions on ctx, answering from the response cache when possible.
+    
+    The response is constrained to the follow-up schema and repaired locally
+    if it still does not parse; only then is the call repeated, up to
+    parse_retries times. Reads no session state, so the speculative prefetch
+    can run it off-thread. Model calls are recorded in telemetry as kind and
+    charged to profile_id in budget. Returns (questions, error); API errors
+    and BudgetExceeded are raised.
+    """
+    lang_name = "German" if lang == "de" else "English"
+    instructions = build_followup_prompt(lang_name)
+    cache_key = ResponseCache.make_key(MODEL_NAME, FOLLOWUP_GENERATION_CONFIG, ctx.full_prompt(instructions))
+    text = cache.get(cache_key) if cache is not None and use_cache else None
+    if text is not None:
+        ctx.record_cached_response()
+    
+    for _ in range(max(0, parse_retries) + 1):
+        if text is None:
+            usage = {}
+            if budget is not None:
+                budget.check(profile_id, estimate_tokens(ctx.full_prompt(instructions)) + EXPECTED_OUTPUT_TOKENS)
+            try:
+                text = generate_limited(ctx, instructions, limiter=limiter, session_id=session_id, policy=policy,
+                                        on_wait=on_wait, stream=stream, on_chunk=on_progress, usage=usage,
+                                        cancel=cancel, generation_config=FOLLOWUP_GENERATION_CONFIG,
+                                        telemetry=telemetry, labels={"kind": kind})
+            finally:
+                if budget is not None and usage:
+                    budget.ledger.record(profile_id, kind, usage)
+            ctx.record(usage)
+        try:
+            questions = parse_followup_questions(text)
+        except FollowupParseError as e:
+            error = str(e)
+            text = None
+            continue
+        if cache is not None:
+            # Stored normalized, so a cache hit never needs repairing
+            cache.put(cache_key, json.dumps(questions, ensure_ascii=False))
+        return questions, None
+    return None, error
+
+@st.cache_resource
+def get_prefetcher():
+    """Background threads for speculative follow-up calls, shared by all sessions."""
+    return Prefetcher(workers=int(get_setting("FOLLOWUP_PREFETCH_WORKERS", 4)))
+
+def start_followup_prefetch(lang, answers):
+    """Start generating follow-up questions in the background from the session's complete answers."""
+    # answers are the session's current answers, so the memoized artifacts apply
+    block = get_profile_block(analyze_results())
+    api_key = get_api_keys()[0]
+    endpoint = get_api_endpoint()
+    session_id = st.session_state.session_id
+    cache, limiter, policy = get_response_cache(), get_rate_limiter(), get_resilience_policy()
+    telemetry, budget = get_telemetry(), get_token_budget()
+    profile_id = st.session_state.profile_id
+    stream = bool(get_setting("STREAM_RESPONSES", True))
+    parse_retries = int(get_setting("FOLLOWUP_PARSE_RETRIES", 1))
+    
+    def run(spec):
+        try:
+            configure(api_key, endpoint)
+            # Off-thread, so it never touches the session's shared context: prefix mode, nothing uploaded
+            ctx = ProfileContext(block, use_explicit_cache=False)
+            return request_followup_questions(
+                ctx, lang, session_id, cache, limiter, policy, stream,
+                on_progress=lambda text: spec.publish(("text", text)),
+                on_wait=lambda *pos: spec.publish(("wait", *pos)),
+                cancel=spec.cancelled, parse_retries=parse_retries, telemetry=telemetry, kind="followup_prefetch",
+                budget=budget, profile_id=profile_id,
+            )
+        except Exception as e:
+            return None, str(e)
     
-    return full_report
+    return get_prefetcher().start(lang, answers, run, block=block)
 
-def generate_followup_questions():
-    """Generate 5 personalized follow-up questions based on all 43 answers."""
+def update_followup_prefetch():
+    """Start the follow-up call in the background once the last answer is recorded.
+    
+    The follow-up prompt reads every answer, so the speculation starts only
+    when none is missing and is keyed on that final profile block; the
+    follow-up page then joins the running call instead of starting its own.
+    A speculation whose answers changed since (the user went back) is
+    cancelled and, with all answers still given, started again.
+    FOLLOWUP_PREFETCH = false turns it off.
+    """
+    lang = st.session_state.language
+    answers = st.session_state.answers
+    spec = st.session_state.followup_prefetch
+    if spec is not None:
+        if spec.matches(lang, answers):
+            return
+        get_prefetcher().discard(spec)
+        st.session_state.followup_prefetch = None
+    if (not get_setting("FOLLOWUP_PREFETCH", True) or answers.first_unanswered() is not None
+            or st.session_state.followup_questions or not get_api_keys()):
+        return
+    st.session_state.followup_prefetch = start_followup_prefetch(lang, dict(answers))
+
+def take_followup_prefetch():
+    """Consume the session's speculation if it was built from the final profile block."""
+    spec = st.session_state.followup_prefetch
+    st.session_state.followup_prefetch = None
+    if spec is None:
+        return None
+    return get_prefetcher().claim(spec, st.session_state.language, st.session_state.answers,
+                                  block=get_profile_block(analyze_results()))
+
+def generate_followup_questions(on_progress=None, on_wait=None):
+    """Generate 5 personalized follow-up questions based on all 43 answers.
+    
+    The speculative call started with the last answer is joined if it still
+    fits; otherwise (or if it failed) the call is made here.
+    When streaming is enabled, on_progress receives the text received so far.
+    on_wait(position, seconds) is called while the request waits for API quota.
+    """
     lang = st.session_state.language
-    lang_name = "German" if lang == "de" else "English"
     analysis = analyze_results()
-    tr = analysis["traits"]
+    bypass = take_cache_bypass()
+    spec = take_followup_prefetch()
+    
+    if spec is not None and not bypass:
+        def relay(update):
+            if update[0] == "wait":
+                if on_wait:
+                    on_wait(*update[1:])
+            elif on_progress:
+                on_progress(update[1])
+        
+        questions, _ = spec.wait(relay, poll_seconds=STREAM_REFRESH_SECONDS) or (None, None)
+        if questions:
+            return questions, None
     
-    # Build answer summary from ALL questions
-    all_qs = get_all_questions(lang)
-    lines = []
-    for q in all_qs:
-        c = get_choice(q["id"])
-        if not c:
-            continue
-        intensity = get_intensity(q["id"])
-        i_label = "slightly" if intensity == 1 else ("clearly" if intensity == 2 else "strongly")
-        scenario = f'Scenario: {q["scenario"]} | ' if q.get("scenario") else ""
-        context = f'Context: {q["context"]} | ' if q.get("context") else ""
-        lines.append(f'Q{q["id"]} [{q["category"]}]: {scenario}{context}A: "{q["questionA"]}" | B: "{q["questionB"]}" | CHOSE: {c} ({i_label})')
-    answer_summary = "\n".join(lines)
-    
-    # Stress patterns for prompt
-    stress_patterns = []
-    if get_choice(21) == "A": stress_patterns.append("Confrontational under pressure")
-    if get_choice(21) == "B": stress_patterns.append("Withdrawing under pressure")
-    if get_choice(24) == "A": stress_patterns.append("Task-focused in emotional situations")
-    if get_choice(27) == "A": stress_patterns.append("Rule-bending when stakes are high")
-    if get_choice(30) == "A": stress_patterns.append("Perfectionism under deadline")
-    if get_choice(32) == "A": stress_patterns.append("Self-sacrifice pattern")
-    if get_choice(35) == "B": stress_patterns.append("Spreading thin under chaos")
-    
-    prompt = f"""You are a world-class psychometric analyst. Based on the following COMPLETE assessment data (43 questions including stress scenarios and self-designed rules), identify the 5 most interesting TENSIONS or PARADOXES in this person's profile. For each tension, generate a personalized follow-up question with exactly 3 options (A, B, C).
-
-WRITE IN {lang_name}.
-
-TRAIT SCORES (1-10):
-Big Five: Openness={tr["openness"]}, Conscientiousness={tr["conscientiousness"]}, Extraversion={tr["extraversion"]}, Agreeableness={tr["agreeableness"]}, Stability={tr["stability"]}
-Action Modes: ResearchDrive={tr["factFinder"]}, SystemsDrive={tr["followThru"]}, LaunchDrive={tr["quickStart"]}, BuildDrive={tr["implementor"]}
-Drivers: Autonomy={tr["autonomy"]}, Mastery={tr["mastery"]}, Power={tr["power"]}, Affiliation={tr["affiliation"]}
-Stress Patterns: {', '.join(stress_patterns) or 'None identified'}
-
-ALL 43 ANSWERS:
-{answer_summary}
-
-RULES:
-- Generate EXACTLY 5 questions in this order:
-  1. TRAIT PARADOX: Two personality traits that create unusual tension
-  2. TRAIT PARADOX: A second trait combination that seems contradictory or rare
-  3. STRESS PATTERN: How a specific stress behavior contradicts their baseline personality
-  4. STRESS PATTERN: A second stress reaction that reveals something unexpected
-  5. RULE CONTRADICTION: A mismatch between the rules they chose (Q36-Q43) and their actual behavior in earlier answers
-- Each question should reference the SPECIFIC tension you found
-- Options A, B, C should represent genuinely different ways the person might experience this tension
-- Questions should feel like a coach who just noticed something about you
-- Be concrete: reference their actual scores and answer patterns
-- Never use trademarked assessment names (no Kolbe, Hogan, MBTI, etc.)
-
-Respond with ONLY a JSON array, no markdown fences, no explanation. Format:
-[
-  {{"tension": "Short label", "question": "The question text", "optionA": "First option", "optionB": "Second option", "optionC": "Third option"}}
-]
-
-Return exactly 5 questions."""
-
     try:
-        api_key = st.secrets.get("GEMINI_API_KEY", "")
-        if not api_key:
+        api_keys = get_api_keys()
+        if not api_keys:
             return None, "No API key configured"
         
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        text = response.text.strip()
-        # Clean markdown fences if present
-        text = text.replace("```json", "").replace("```", "").strip()
-        parsed = json.loads(text)
-        if isinstance(parsed, list) and len(parsed) > 0:
-            return parsed, None
-        return None, "Invalid response format"
+        configure(api_keys[0], get_api_endpoint())
+        ctx = get_profile_context(analysis)
+        return request_followup_questions(
+            ctx, lang, st.session_state.session_id, get_response_cache(), get_rate_limiter(),
+            get_resilience_policy(), bool(get_setting("STREAM_RESPONSES", True)), use_cache=not bypass,
+            on_progress=on_progress, on_wait=on_wait, parse_retries=int(get_setting("FOLLOWUP_PARSE_RETRIES", 1)),
+            telemetry=get_telemetry(), budget=get_token_budget(), profile_id=st.session_state.profile_id,
+        )
     except Exception as e:
         return None, str(e)
 
-def get_followup_data_for_prompt():
-    """Build follow-up answer data string for the deep analysis prompt."""
-    fqs = st.session_state.followup_questions
-    fas = st.session_state.followup_answers
-    if not fqs or not fas:
-        return ""
-    
-    lines = []
-    for i, q in enumerate(fqs):
-        a = fas.get(i)
-        if not a or not a.get("choice"):
-            continue
-        chosen = q["optionA"] if a["choice"] == "A" else q["optionB"] if a["choice"] == "B" else q["optionC"]
-        user_text = f' | USER ADDED: "{a["text"]}"' if a.get("text") else ""
-        lines.append(f'TENSION: {q["tension"]}\nQUESTION: {q["question"]}\nCHOSE {a["choice"]}: "{chosen}"{user_text}')
-    
-    if not lines:
-        return ""
-    return "\n\nPERSONALIZED FOLLOW-UP ANSWERS (these reveal how the person experiences their core tensions — reference these heavily in your analysis):\n" + "\n\n".join(lines)
-
-def generate_pdf(analysis, t, lang, deep_text=None):
-    """Generate a real PDF with trait bars, tables, and optional deep analysis."""
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.units import mm
-    from reportlab.lib.colors import HexColor, white, black
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.enums import TA_LEFT
-    from reportlab.graphics.shapes import Drawing, Rect, String
-    from reportlab.graphics import renderPDF
-    import io
-    
-    buf = io.BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=A4, leftMargin=18*mm, rightMargin=18*mm, topMargin=20*mm, bottomMargin=20*mm)
-    
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    style_title = ParagraphStyle('Title2', parent=styles['Title'], fontSize=20, textColor=HexColor('#111827'), spaceAfter=4)
-    style_subtitle = ParagraphStyle('Sub', parent=styles['Normal'], fontSize=10, textColor=HexColor('#6b7280'), spaceAfter=16)
-    style_section = ParagraphStyle('Section', parent=styles['Heading2'], fontSize=13, textColor=HexColor('#111827'), spaceBefore=20, spaceAfter=8, borderWidth=0)
-    style_subsection = ParagraphStyle('SubSec', parent=styles['Heading3'], fontSize=10, textColor=HexColor('#374151'), spaceBefore=12, spaceAfter=6)
-    style_body = ParagraphStyle('Body2', parent=styles['Normal'], fontSize=9, textColor=HexColor('#374151'), leading=14, spaceAfter=4)
-    style_small = ParagraphStyle('Small', parent=styles['Normal'], fontSize=7, textColor=HexColor('#9ca3af'), leading=10)
-    style_rule = ParagraphStyle('Rule', parent=styles['Normal'], fontSize=9, textColor=HexColor('#374151'), leading=13, leftIndent=8)
-    
-    story = []
-    tr = analysis["traits"]
-    date_str = format_date(lang)
-    
-    # Title
-    story.append(Paragraph(t["pdfTitle"], style_title))
-    story.append(Paragraph(f'{t["pdfGenerated"]} {date_str}', style_subtitle))
-    
-    # Helper: draw trait bar as a Drawing
-    def make_bar_drawing(label, value, color_hex):
-        d = Drawing(480, 16)
-        # Label
-        d.add(String(0, 4, label, fontSize=9, fillColor=HexColor('#374151'), fontName='Helvetica'))
-        # Bar background
-        bar_x = 160
-        bar_w = 260
-        d.add(Rect(bar_x, 2, bar_w, 10, fillColor=HexColor('#e5e7eb'), strokeColor=None, rx=4, ry=4))
-        # Bar fill
-        fill_w = max(2, bar_w * value / 10)
-        d.add(Rect(bar_x, 2, fill_w, 10, fillColor=HexColor(color_hex), strokeColor=None, rx=4, ry=4))
-        # Score
-        d.add(String(bar_x + bar_w + 10, 4, str(value), fontSize=9, fillColor=HexColor('#111827'), fontName='Helvetica-Bold'))
-        return d
-    
-    # Architecture section
-    story.append(Paragraph(t["architecture"], style_section))
-    
-    story.append(Paragraph(t["hardwareTitle"], style_subsection))
-    for key, label in [("openness", t["openness"]), ("conscientiousness", t["conscientiousness"]),
-                       ("extraversion", t["extraversion"]), ("agreeableness", t["agreeableness"]),
-                       ("stability", t["stability"])]:
-        story.append(make_bar_drawing(label, tr[key], '#3b82f6'))
-    
-    story.append(Spacer(1, 6))
-    story.append(Paragraph(t["osTitle"], style_subsection))
-    for key, label in [("factFinder", t["factFinder"]), ("followThru", t["followThru"]),
-                       ("quickStart", t["quickStart"]), ("implementor", t["implementor"])]:
-        story.append(make_bar_drawing(label, tr[key], '#a855f7'))
-    
-    story.append(Spacer(1, 6))
-    story.append(Paragraph(t["driversTitle"], style_subsection))
-    for key, label in [("autonomy", t["autonomy"]), ("mastery", t["mastery"]),
-                       ("power", t["power"]), ("affiliation", t["affiliation"])]:
-        story.append(make_bar_drawing(label, tr[key], '#ec4899'))
-    
-    # Contextual Contrasts
-    story.append(Paragraph(t["contextualContrasts"], style_section))
-    contrast_data = [
-        [t["trait"], t["closeButNot"], t["clearlyNot"]],
-        [t["decisionSpeed"], t["impulsive"] if get_choice(14)=="A" else t["methodical"], t["paralysis"] if get_choice(14)=="A" else t["gambler"]],
-        [t["riskProfile"], t["calcRisk"] if get_choice(15)=="A" else t["steadyOpt"], t["riskAverse"] if get_choice(15)=="A" else t["thrillSeek"]],
-        [t["conflictStyle"], t["diplomatic"] if get_choice(16)=="A" else t["harmonious"], t["avoider"] if get_choice(16)=="A" else t["aggressive"]],
-        [t["learningMode"], t["experimental"] if get_choice(18)=="A" else t["studious"], t["theoretical"] if get_choice(18)=="A" else t["trialByFire"]],
-    ]
-    tbl = Table(contrast_data, colWidths=[120, 170, 170])
-    tbl.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#f9fafb')),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#374151')),
-        ('TEXTCOLOR', (2, 1), (2, -1), HexColor('#9ca3af')),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#e5e7eb')),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-    ]))
-    story.append(tbl)
-    
-    # Dark Side
-    story.append(Paragraph(t["darkSide"], style_section))
-    story.append(Paragraph(f'<b>{t["identifiedDerailers"]}</b>', style_body))
-    if analysis["stressPatterns"]:
-        for p in analysis["stressPatterns"]:
-            story.append(Paragraph(f'⚠ {p}', style_rule))
-    
-    # Environment Fit
-    story.append(Paragraph(t["environmentFit"], style_section))
-    env_data = [[t["thrivesIn"], t["failsIn"]]]
-    pairs = [
-        (tr["autonomy"] >= 6, t["highAutonomy"], t["structured"], t["micromanaged"], t["unstructured"]),
-        (tr["quickStart"] >= 6, t["fastMoving"], t["methodicalOrg"], t["slowMoving"], t["moveFast"]),
-        (tr["extraversion"] >= 6, t["collaborative"], t["deepWork"], t["isolated"], t["constantMeetings"]),
-        (tr["mastery"] >= 6, t["learningFocused"], t["executionFocused"], t["stagnant"], t["constantReinvention"]),
-    ]
-    for cond, hi, lo, fail_hi, fail_lo in pairs:
-        env_data.append([f'✓ {hi if cond else lo}', f'✗ {fail_hi if cond else fail_lo}'])
-    
-    env_tbl = Table(env_data, colWidths=[230, 230])
-    env_tbl.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#f9fafb')),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('TEXTCOLOR', (0, 1), (0, -1), HexColor('#059669')),
-        ('TEXTCOLOR', (1, 1), (1, -1), HexColor('#dc2626')),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#e5e7eb')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-    ]))
-    story.append(env_tbl)
-    
-    # Operational Rules
-    story.append(Paragraph(t["operationalRules"], style_section))
-    story.append(Paragraph(f'<i>{t["rulesIntro"]}</i>', style_body))
-    if analysis["operationalRules"]:
-        for i, rule in enumerate(analysis["operationalRules"]):
-            story.append(Paragraph(f'<b>Rule {i+1}:</b> ✓ {rule}', style_rule))
-    
-    # Deep Analysis
-    if deep_text:
-        story.append(PageBreak())
-        for line in deep_text.split('\n'):
-            stripped = line.strip()
-            if not stripped:
-                story.append(Spacer(1, 4))
-            elif stripped.startswith('# ') and not stripped.startswith('## '):
-                story.append(Paragraph(stripped[2:], style_title))
-            elif stripped.startswith('## '):
-                story.append(Paragraph(stripped[3:], style_section))
-            elif stripped.startswith('### '):
-                story.append(Paragraph(stripped[4:], style_subsection))
-            elif stripped.startswith('> '):
-                quote_style = ParagraphStyle('Quote', parent=style_body, leftIndent=12, textColor=HexColor('#374151'), fontName='Helvetica-Oblique', backColor=HexColor('#f5f3ff'))
-                story.append(Paragraph(stripped[2:], quote_style))
-            elif stripped.startswith('- ') or stripped.startswith('* '):
-                story.append(Paragraph(f'• {stripped[2:]}', style_rule))
-            elif stripped == '---':
-                story.append(Spacer(1, 8))
-            else:
-                # Handle inline bold
-                import re
-                cleaned = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', stripped)
-                story.append(Paragraph(cleaned, style_body))
-    
-    # Disclaimer
-    story.append(Spacer(1, 20))
-    story.append(Paragraph(t["disclaimer"], style_small))
+RESUME_PARAM = "r"
+
+def record_answer(q_id, choice, intensity):
+    """Store one answer; keep the resume code in the URL current only if the user asked for one.
     
-    doc.build(story)
-    buf.seek(0)
-    return buf.getvalue()
+    Recording the last missing answer starts the follow-up prefetch.
+    """
+    answers = st.session_state.answers.with_answer(q_id, choice, intensity)
+    st.session_state.answers = answers
+    if RESUME_PARAM in st.query_params:
+        st.query_params[RESUME_PARAM] = answers.to_code(st.session_state.language)
+    update_followup_prefetch()
+
+def share_resume_code(key):
+    """A button that puts the resume code into the page URL on demand and shows it.
+
+    Answers never reach the URL (and so browser history, referrers or proxy
+    logs) unless the user asks for a link here.
+    """
+    lang = st.session_state.language
+    if RESUME_PARAM not in st.query_params:
+        label = "🔗 Link zum Fortsetzen erstellen" if lang == "de" else "🔗 Create a resume/share link"
+        if not st.button(label, key=key, type="secondary"):
+            return
+        st.query_params[RESUME_PARAM] = st.session_state.answers.to_code(lang)
+    st.caption(
+        ("🔗 Diese Seite als Lesezeichen speichern oder den Code aufheben: " if lang == "de"
+         else "🔗 Bookmark this page or keep the code: ")
+        + f"`{st.query_params[RESUME_PARAM]}` (`?{RESUME_PARAM}=…`)"
+    )
+
+def restore_session(code):
+    """Continue where a resume code left off: its answers, language and next question."""
+    if not code:
+        return
+    try:
+        answers, lang = PackedAnswers.from_code(code)
+    except InvalidAnswerCode:
+        st.query_params.pop(RESUME_PARAM, None)
+        return
+    st.session_state.answers = answers
+    if lang is None or not answers:
+        return
+    st.session_state.language = lang
+    next_index = answers.first_unanswered()
+    if next_index is None:
+        st.session_state.page = "followup"
+    else:
+        st.session_state.page = "questions"
+        st.session_state.current_index = next_index
+
+SESSION_PARAM = "s"
+
+def persisted_state():
+    """The saved part of the session's progress, as plain JSON data."""
+    lang = st.session_state.language
+    return {
+        "language": lang,
+        "page": st.session_state.page,
+        "current_index": st.session_state.current_index,
+        "answers": st.session_state.answers.to_code(lang),
+        "followup_questions": st.session_state.followup_questions,
+        "followup_answers": {str(i): a for i, a in st.session_state.followup_answers.items()},
+        "followup_index": st.session_state.followup_index,
+    }
+
+def persist_session():
+    """Save the session's progress when it changed since the last save (PERSIST_SESSIONS only)."""
+    store = get_session_store()
+    if store is None:
+        return
+    state = persisted_state()
+    if state != st.session_state.persisted_state:
+        store.save_state(st.session_state.session_token, state)
+        st.session_state.persisted_state = state
+
+def persist_chapter(record):
+    """Save a finished chapter right away; a failed one replaces nothing and is retried on resume."""
+    store = get_session_store()
+    if store is None:
+        return
+    if record["status"] == "ok":
+        store.save_chapter(st.session_state.session_token, record)
+    else:
+        store.delete_chapter(st.session_state.session_token, record["index"])
+
+def resume_persisted_session():
+    """Attach this browser session to its token from the URL and restore what was saved under it."""
+    store = get_session_store()
+    if store is None:
+        return
+    token = st.query_params.get(SESSION_PARAM)
+    saved = store.load(token) if token else None
+    if saved is not None:
+        state, chapters = saved
+        try:
+            answers, _ = PackedAnswers.from_code(state["answers"])
+        except InvalidAnswerCode:
+            saved = None
+    if saved is None:
+        st.session_state.session_token = new_token()
+        st.query_params[SESSION_PARAM] = st.session_state.session_token
+        return
+    
+    st.session_state.session_token = token
+    st.session_state.language = state["language"]
+    st.session_state.page = state["page"]
+    st.session_state.current_index = state["current_index"]
+    st.session_state.answers = answers
+    st.session_state.followup_questions = state["followup_questions"]
+    st.session_state.followup_answers = {int(i): a for i, a in state["followup_answers"].items()}
+    st.session_state.followup_index = state["followup_index"]
+    st.session_state.deep_chapters = chapters
+    st.session_state.persisted_state = state
+
+def build_pdf_payload(analysis, lang, deep_text=None):
+    """Everything the PDF export depends on, as plain JSON data (also its memo key)."""
+    return {
+        "lang": lang,
+        "date": format_date(lang),
+        "analysis": analysis,
+        "contrasts": {str(q_id): get_choice(q_id) for q_id in CONTRAST_QUESTIONS},
+        "deep_text": deep_text or "",
+    }
 
 # ============================================================
 # INITIALIZE SESSION STATE
 # ============================================================
+asset_bytes = render_static_assets()
+
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if "profile_id" not in st.session_state:
+    # Token usage is charged to this id; Start Over begins a new profile
+    st.session_state.profile_id = uuid.uuid4().hex
 if "language" not in st.session_state:
     st.session_state.language = None
 if "page" not in st.session_state:
@@ -1228,11 +1168,14 @@ if "page" not in st.session_state:
 if "current_index" not in st.session_state:
     st.session_state.current_index = 0
 if "answers" not in st.session_state:
-    st.session_state.answers = {}
+    st.session_state.answers = PackedAnswers()
+    restore_session(st.query_params.get(RESUME_PARAM))
 if "pending_choice" not in st.session_state:
     st.session_state.pending_choice = None
-if "deep_analysis" not in st.session_state:
-    st.session_state.deep_analysis = ""
+if "deep_chapters" not in st.session_state:
+    st.session_state.deep_chapters = []
+if "regenerate_chapters" not in st.session_state:
+    st.session_state.regenerate_chapters = None
 if "followup_questions" not in st.session_state:
     st.session_state.followup_questions = []
 if "followup_answers" not in st.session_state:
@@ -1241,6 +1184,22 @@ if "followup_index" not in st.session_state:
     st.session_state.followup_index = 0
 if "followup_error" not in st.session_state:
     st.session_state.followup_error = None
+if "profile_context" not in st.session_state:
+    st.session_state.profile_context = None
+if "bypass_response_cache" not in st.session_state:
+    st.session_state.bypass_response_cache = False
+if "followup_prefetch" not in st.session_state:
+    st.session_state.followup_prefetch = None
+if "artifact_memo" not in st.session_state:
+    st.session_state.artifact_memo = ArtifactMemo()
+if "population_counted" not in st.session_state:
+    # Answer states last counted in the population statistics
+    st.session_state.population_counted = None
+if "session_token" not in st.session_state:
+    st.session_state.session_token = None
+    st.session_state.persisted_state = None
+    resume_persisted_session()
+persist_session()
 
 # ============================================================
 # PAGE: LANGUAGE SELECTION
@@ -1267,7 +1226,7 @@ if st.session_state.page == "language":
 # PAGE: INTRO
 # ============================================================
 elif st.session_state.page == "intro":
-    t = TRANSLATIONS[st.session_state.language]
+    t = get_translations(st.session_state.language)
     
     st.markdown(f"# 🧠 {t['title']}")
     st.markdown(f"*{t['subtitle']}*")
@@ -1286,7 +1245,7 @@ elif st.session_state.page == "intro":
     if st.button(t['beginBtn'], type="primary", use_container_width=True):
         st.session_state.page = "questions"
         st.session_state.current_index = 0
-        st.session_state.answers = {}
+        st.session_state.answers = PackedAnswers()
         st.rerun()
 
 # ============================================================
@@ -1294,24 +1253,16 @@ elif st.session_state.page == "intro":
 # ============================================================
 elif st.session_state.page == "questions":
     lang = st.session_state.language
-    t = TRANSLATIONS[lang]
-    all_qs = get_all_questions(lang)
-    total = len(all_qs)
+    t = get_translations(lang)
+    bank = get_question_bank(lang)
+    all_qs = bank.questions
+    total = bank.total
     idx = st.session_state.current_index
     q = all_qs[idx]
     
     # Determine phase
-    disc_len = len(QUESTIONS[lang]["discovery"])
-    stress_len = len(QUESTIONS[lang]["stressTesting"])
-    if idx < disc_len:
-        phase_name = t["phase1Title"]
-        phase_color = "#3b82f6"
-    elif idx < disc_len + stress_len:
-        phase_name = t["phase2Title"]
-        phase_color = "#f59e0b"
-    else:
-        phase_name = t["phase3Title"]
-        phase_color = "#10b981"
+    phase_key, phase_color = PHASE_STYLES[bank.phase_by_index[idx]]
+    phase_name = t[phase_key]
     
     # Progress bar
     st.progress((idx + 1) / total)
@@ -1362,7 +1313,7 @@ elif st.session_state.page == "questions":
         col1, col2, col3 = st.columns(3)
         with col1:
             if st.button(f"● {t['slightly']}", use_container_width=True, key="int_1"):
-                st.session_state.answers[q["id"]] = {"choice": pending, "intensity": 1}
+                record_answer(q["id"], pending, 1)
                 st.session_state.pending_choice = None
                 if idx + 1 < total:
                     st.session_state.current_index = idx + 1
@@ -1371,7 +1322,7 @@ elif st.session_state.page == "questions":
                 st.rerun()
         with col2:
             if st.button(f"●● {t['clearly']}", use_container_width=True, key="int_2"):
-                st.session_state.answers[q["id"]] = {"choice": pending, "intensity": 2}
+                record_answer(q["id"], pending, 2)
                 st.session_state.pending_choice = None
                 if idx + 1 < total:
                     st.session_state.current_index = idx + 1
@@ -1380,7 +1331,7 @@ elif st.session_state.page == "questions":
                 st.rerun()
         with col3:
             if st.button(f"●●● {t['strongly']}", use_container_width=True, key="int_3"):
-                st.session_state.answers[q["id"]] = {"choice": pending, "intensity": 3}
+                record_answer(q["id"], pending, 3)
                 st.session_state.pending_choice = None
                 if idx + 1 < total:
                     st.session_state.current_index = idx + 1
@@ -1399,16 +1350,15 @@ elif st.session_state.page == "questions":
             st.session_state.current_index = idx - 1
             st.session_state.pending_choice = None
             st.rerun()
+    if st.session_state.answers:
+        share_resume_code("share_questions")
     
     # Dev skip — almost invisible
     import random
     st.markdown("<br><br>", unsafe_allow_html=True)
     if st.button("skip", key="dev_skip", type="secondary"):
         for qq in all_qs:
-            st.session_state.answers[qq["id"]] = {
-                "choice": random.choice(["A", "B"]),
-                "intensity": random.randint(1, 3)
-            }
+            record_answer(qq["id"], random.choice(["A", "B"]), random.randint(1, 3))
         st.session_state.page = "followup"
         st.session_state.pending_choice = None
         st.rerun()
@@ -1418,7 +1368,7 @@ elif st.session_state.page == "questions":
 # ============================================================
 elif st.session_state.page == "followup":
     lang = st.session_state.language
-    t = TRANSLATIONS[lang]
+    t = get_translations(lang)
     fqs = st.session_state.followup_questions
     fi = st.session_state.followup_index
     
@@ -1428,7 +1378,20 @@ elif st.session_state.page == "followup":
             "Etwas ist mir aufgefallen... Basierend auf Ihren Antworten erstelle ich gezielte Nachfragen." if lang == "de"
             else "Something caught my attention... Crafting targeted follow-up questions based on your answers."
         ):
-            questions, error = generate_followup_questions()
+            progress_text = st.empty()
+            
+            def show_progress(text):
+                drafted = min(5, text.count('"tension"'))
+                if drafted:
+                    progress_text.caption(
+                        f"✍️ {drafted}/5 Nachfragen entworfen" if lang == "de"
+                        else f"✍️ {drafted}/5 follow-up questions drafted"
+                    )
+            
+            def show_queue(position, seconds):
+                progress_text.caption(format_queue_position(position, seconds, lang))
+            
+            questions, error = generate_followup_questions(on_progress=show_progress, on_wait=show_queue)
             if questions:
                 st.session_state.followup_questions = questions
                 st.session_state.followup_index = 0
@@ -1453,6 +1416,7 @@ elif st.session_state.page == "followup":
             if st.button("🔄 " + ("Erneut" if lang == "de" else "Retry"), use_container_width=True, type="primary"):
                 st.session_state.followup_error = None
                 st.session_state.followup_questions = []
+                st.session_state.bypass_response_cache = True
                 st.rerun()
         with col_skip:
             if st.button("→ " + ("Weiter" if lang == "de" else "Skip"), use_container_width=True):
@@ -1559,9 +1523,16 @@ elif st.session_state.page == "followup":
 # ============================================================
 elif st.session_state.page == "results":
     lang = st.session_state.language
-    t = TRANSLATIONS[lang]
+    t = get_translations(lang)
+    memo = get_memo()
     analysis = analyze_results()
+    # Compared before this profile is counted, so a first visit is never ranked against itself
+    population = get_population_context(analysis)
+    record_population(analysis)
+    if population is not None:
+        analysis = {**analysis, "population": population}
     tr = analysis["traits"]
+    ranks = population["traits"] if population is not None else {}
     
     st.markdown(f"# 🧠 {t['pdfTitle']}")
     date_str = format_date(lang)
@@ -1573,63 +1544,45 @@ elif st.session_state.page == "results":
     
     st.markdown(f"**{t['hardwareTitle']}**")
     for key in ["openness", "conscientiousness", "extraversion", "agreeableness", "stability"]:
-        render_trait_bar(t[key], tr[key], "#3b82f6")
+        render_trait_bar(t[key], tr[key], "#3b82f6", ranks.get(key), t["percentileOf"])
     
     st.markdown(f"**{t['osTitle']}**")
     for key in ["factFinder", "followThru", "quickStart", "implementor"]:
-        render_trait_bar(t[key], tr[key], "#a855f7")
+        render_trait_bar(t[key], tr[key], "#a855f7", ranks.get(key), t["percentileOf"])
     
     st.markdown(f"**{t['driversTitle']}**")
     for key in ["autonomy", "mastery", "power", "affiliation"]:
-        render_trait_bar(t[key], tr[key], "#ec4899")
+        render_trait_bar(t[key], tr[key], "#ec4899", ranks.get(key), t["percentileOf"])
+    if population is not None:
+        st.caption(t["percentileNote"].format(count=population["count"]))
     
     # Contextual Contrasts
     st.markdown(f'<div class="section-header">{t["contextualContrasts"]}</div>', unsafe_allow_html=True)
     
-    contrasts = [
-        (t["decisionSpeed"], 
-         t["impulsive"] if get_choice(14) == "A" else t["methodical"],
-         t["paralysis"] if get_choice(14) == "A" else t["gambler"]),
-        (t["riskProfile"],
-         t["calcRisk"] if get_choice(15) == "A" else t["steadyOpt"],
-         t["riskAverse"] if get_choice(15) == "A" else t["thrillSeek"]),
-        (t["conflictStyle"],
-         t["diplomatic"] if get_choice(16) == "A" else t["harmonious"],
-         t["avoider"] if get_choice(16) == "A" else t["aggressive"]),
-        (t["learningMode"],
-         t["experimental"] if get_choice(18) == "A" else t["studious"],
-         t["theoretical"] if get_choice(18) == "A" else t["trialByFire"]),
-    ]
-    
-    contrast_html = f'<table class="styled-table"><tr><th>{t["trait"]}</th><th>{t["closeButNot"]}</th><th>{t["clearlyNot"]}</th></tr>'
-    for trait, close, not_you in contrasts:
-        contrast_html += f"<tr><td style='font-weight:600;'>{trait}</td><td>{close}</td><td style='color:#64748b;'>{not_you}</td></tr>"
-    contrast_html += "</table>"
-    st.markdown(contrast_html, unsafe_allow_html=True)
+    def build_contrast_html():
+        html = f'<table class="styled-table"><tr><th>{t["trait"]}</th><th>{t["closeButNot"]}</th><th>{t["clearlyNot"]}</th></tr>'
+        for trait, close, not_you in contrast_rows(t, {q_id: get_choice(q_id) for q_id in CONTRAST_QUESTIONS}):
+            html += f"<tr><td style='font-weight:600;'>{trait}</td><td>{close}</td><td style='color:#64748b;'>{not_you}</td></tr>"
+        return html + "</table>"
+    st.markdown(memo.get("contrast_html", build_contrast_html, scope=ANSWERS), unsafe_allow_html=True)
     
     # Dark Side
     st.markdown(f'<div class="section-header">{t["darkSide"]}</div>', unsafe_allow_html=True)
     if analysis["stressPatterns"]:
-        for p in analysis["stressPatterns"]:
-            st.markdown(f"⚠️ {p}")
+        shares = population["stressPatterns"] if population is not None else [None] * len(analysis["stressPatterns"])
+        for p, share in zip(analysis["stressPatterns"], shares):
+            st.markdown(f"⚠️ {p}" + (f" · *{t['patternShare'].format(pct=share)}*" if share is not None else ""))
     else:
         st.info(t["completeForAnalysis"])
     
     # Environment Fit
     st.markdown(f'<div class="section-header">{t["environmentFit"]}</div>', unsafe_allow_html=True)
-    env_html = f'<table class="styled-table"><tr><th>{t["thrivesIn"]}</th><th>{t["failsIn"]}</th></tr>'
-    pairs = [
-        (tr["autonomy"] >= 6, t["highAutonomy"], t["structured"], t["micromanaged"], t["unstructured"]),
-        (tr["quickStart"] >= 6, t["fastMoving"], t["methodicalOrg"], t["slowMoving"], t["moveFast"]),
-        (tr["extraversion"] >= 6, t["collaborative"], t["deepWork"], t["isolated"], t["constantMeetings"]),
-        (tr["mastery"] >= 6, t["learningFocused"], t["executionFocused"], t["stagnant"], t["constantReinvention"]),
-    ]
-    for cond, hi, lo, fail_hi, fail_lo in pairs:
-        thrive = hi if cond else lo
-        fail = fail_hi if cond else fail_lo
-        env_html += f'<tr><td style="color:#10b981;">✅ {thrive}</td><td style="color:#ef4444;">❌ {fail}</td></tr>'
-    env_html += "</table>"
-    st.markdown(env_html, unsafe_allow_html=True)
+    def build_env_html():
+        html = f'<table class="styled-table"><tr><th>{t["thrivesIn"]}</th><th>{t["failsIn"]}</th></tr>'
+        for thrive, fail in environment_rows(t, tr):
+            html += f'<tr><td style="color:#10b981;">✅ {thrive}</td><td style="color:#ef4444;">❌ {fail}</td></tr>'
+        return html + "</table>"
+    st.markdown(memo.get("environment_html", build_env_html, scope=ANSWERS), unsafe_allow_html=True)
     
     # Operational Rules
     st.markdown(f'<div class="section-header">{t["operationalRules"]}</div>', unsafe_allow_html=True)
@@ -1645,58 +1598,153 @@ elif st.session_state.page == "results":
     st.markdown("---")
     st.markdown("### 🔮 " + ("KI-gestützte Tiefenanalyse" if lang == "de" else "AI-Powered Deep Analysis"))
     
-    if not st.session_state.deep_analysis:
+    deep_chapters = st.session_state.deep_chapters
+    regenerate = st.session_state.regenerate_chapters
+    # Chapters restored from a saved session are kept; only the missing ones are generated
+    finished = {record["index"] for record in deep_chapters}
+    unfinished = [i for i in range(len(CHAPTER_PROMPTS)) if i not in finished]
+    if unfinished or regenerate is not None:
         # Auto-start generation with loading message
-        st.markdown(
-            "*Generiere Ihre persönliche Tiefenanalyse...*" if lang == "de"
-            else "*Generating your personalized deep analysis...*"
-        )
-        result = generate_deep_analysis(analysis)
-        st.session_state.deep_analysis = result
+        if not deep_chapters:
+            st.markdown(
+                "*Generiere Ihre persönliche Tiefenanalyse...*" if lang == "de"
+                else "*Generating your personalized deep analysis...*"
+            )
+        targets = unfinished if regenerate is None else regenerate
+        st.session_state.deep_chapters = generate_deep_analysis(analysis, targets=targets, fresh=regenerate is not None)
+        st.session_state.regenerate_chapters = None
         st.rerun()
     else:
-        st.markdown(st.session_state.deep_analysis)
+        for record in deep_chapters:
+            render_chapter(record)
+        deep_text = assemble_deep_text(deep_chapters)
+        
+        if any(record.get("context") == "compact" for record in deep_chapters):
+            st.info(
+                "Das Token-Budget war fast aufgebraucht: Diese Analyse wurde mit einem gekürzten Profilkontext erstellt." if lang == "de"
+                else "The token budget was nearly used up: this analysis was written from a shortened profile context."
+            )
+        
+        ctx = st.session_state.profile_context
+        if ctx is not None and (ctx.calls or ctx.cached_responses):
+            ctx_stats = ctx.stats()
+            st.caption(
+                f"🔁 Gemeinsamer Profilkontext ≈{ctx_stats['context_tokens']:,} Tokens · {ctx_stats['calls']} Aufrufe · {ctx_stats['saved_tokens']:,} Eingabe-Tokens aus dem Cache · {ctx_stats['cached_responses']} gespeicherte Antworten" if lang == "de"
+                else f"🔁 Shared profile context ≈{ctx_stats['context_tokens']:,} tokens · {ctx_stats['calls']} calls · {ctx_stats['saved_tokens']:,} input tokens served from cache · {ctx_stats['cached_responses']} stored responses reused"
+            )
+        
+        # Per-chapter regeneration: only the chosen (or failed) chapters are requested again
+        failed = [record["index"] for record in deep_chapters if record["status"] != "ok"]
+        chapter_label = "Kapitel" if lang == "de" else "Chapter"
+        col_pick, col_regen, col_failed = st.columns([2, 1, 1])
+        with col_pick:
+            picked = st.selectbox(
+                "Kapitel neu generieren" if lang == "de" else "Regenerate a chapter",
+                options=[record["index"] for record in deep_chapters],
+                format_func=lambda i: f"{chapter_label} {i+1}: {chapter_title(i, deep_chapters[i]['text'])}",
+                key="regenerate_pick",
+            )
+        with col_regen:
+            st.markdown("<div style='height: 1.75rem'></div>", unsafe_allow_html=True)
+            if st.button("🔄 " + ("Kapitel neu" if lang == "de" else "Regenerate"), use_container_width=True):
+                st.session_state.regenerate_chapters = [picked]
+                st.rerun()
+        with col_failed:
+            st.markdown("<div style='height: 1.75rem'></div>", unsafe_allow_html=True)
+            if st.button(
+                ("⚠️ Fehlgeschlagene wiederholen" if lang == "de" else "⚠️ Retry failed") + f" ({len(failed)})",
+                disabled=not failed, use_container_width=True,
+            ):
+                st.session_state.regenerate_chapters = failed
+                st.rerun()
         
         # Download buttons (only shown after deep analysis is generated)
         st.markdown("---")
         col_md, col_pdf, col_redo = st.columns(3)
         with col_md:
             # Combined markdown: summary + deep analysis
-            combined_md = get_summary_markdown(analysis, t, lang) + "\n\n---\n\n" + st.session_state.deep_analysis
+            with span("export", page="results", format="markdown"):
+                summary_md = memo.get("markdown", lambda: get_summary_markdown(analysis, t, lang), scope=SESSION,
+                                      version=date_str)
+                combined_md = summary_md + "\n\n---\n\n" + deep_text
             st.download_button(
                 label="📄 .md",
                 data=combined_md,
                 file_name=f"user-manual-{datetime.now().strftime('%Y-%m-%d')}.md",
                 mime="text/markdown",
+                on_click="ignore",
                 use_container_width=True
             )
         with col_pdf:
-            pdf_complete = generate_pdf(analysis, t, lang, deep_text=st.session_state.deep_analysis)
+            # Built only when clicked, and memoized by content (only the latest chapters' payload is kept)
+            export_version = (date_str, content_hash(deep_text))
+            pdf_payload = memo.get("pdf_payload", lambda: build_pdf_payload(analysis, lang, deep_text),
+                                   scope=SESSION, version=export_version)
+            pdf_pool = get_pdf_pool()
+            
+            def export_pdf():
+                with span("export", page="results", format="pdf") as attrs:
+                    def fallback(error):
+                        # A full queue or a stuck worker must not cost the download: rendered here instead
+                        attrs["fallback"] = type(error).__name__
+                    
+                    def render(payload):
+                        return render_pdf(pdf_pool, payload, on_fallback=fallback)
+                    return get_pdf(pdf_payload, render=render,
+                                   key=memo.get("pdf_key", lambda: pdf_key(pdf_payload), scope=SESSION,
+                                               version=export_version))
+            
             st.download_button(
                 label="📕 .pdf",
-                data=pdf_complete,
+                data=export_pdf,
                 file_name=f"user-manual-{datetime.now().strftime('%Y-%m-%d')}.pdf",
                 mime="application/pdf",
+                on_click="ignore",
                 use_container_width=True
             )
         with col_redo:
-            if st.button("🔄 " + ("Neu" if lang == "de" else "Redo"), use_container_width=True):
-                st.session_state.deep_analysis = ""
+            if st.button("🔄 " + ("Alles neu" if lang == "de" else "Redo all"), use_container_width=True):
+                st.session_state.regenerate_chapters = [record["index"] for record in deep_chapters]
                 st.rerun()
     
     # Disclaimer + Start Over
     st.markdown("---")
+    share_resume_code("share_results")
     st.caption(t["disclaimer"])
     
     if st.button(t["startOver"], use_container_width=True):
         st.session_state.language = None
         st.session_state.page = "language"
         st.session_state.current_index = 0
-        st.session_state.answers = {}
+        st.session_state.answers = PackedAnswers()
+        st.query_params.pop(RESUME_PARAM, None)
         st.session_state.pending_choice = None
-        st.session_state.deep_analysis = ""
+        st.session_state.deep_chapters = []
+        st.session_state.regenerate_chapters = None
         st.session_state.followup_questions = []
         st.session_state.followup_answers = {}
         st.session_state.followup_index = 0
         st.session_state.followup_error = None
+        st.session_state.profile_id = uuid.uuid4().hex
+        if st.session_state.followup_prefetch is not None:
+            get_prefetcher().discard(st.session_state.followup_prefetch)
+            st.session_state.followup_prefetch = None
+        if st.session_state.profile_context is not None:
+            st.session_state.profile_context.close()
+        st.session_state.profile_context = None
+        if get_session_store() is not None:
+            get_session_store().delete(st.session_state.session_token)
+            st.session_state.persisted_state = None
         st.rerun()
+
+# ============================================================
+# RERUN STATS
+# ============================================================
+record_rerun_stats(asset_bytes)
+
+# ============================================================
+# WARM-UP (after the first page has been sent)
+# ============================================================
+startup.first_page_served()
+if get_setting("WARM_UP", True):
+    startup.warm_up(warm_up_tasks())
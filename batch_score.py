@@ -0,0 +1,214 @@
+"""Score answer sets from JSONL or CSV files without running Streamlit.
+
+Input records (one per line / row):
+
+    JSONL  {"id": "r1", "language": "en", "answers": {"1": {"choice": "A", "intensity": 3}, ...}}
+           Answers may also be compact strings: {"1": "A3", "2": "B1", ...}
+    CSV    id,language,q1,q2,...,q43   with cells like A3 / B1, empty = unanswered
+
+Scores use the same rules as the app (traits, stress patterns, operational
+rules). Records are processed in fixed-size chunks and written as they are
+scored, so memory stays constant regardless of file size.
+
+    python batch_score.py answers.jsonl -o scores.jsonl --summary --workers 4
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+from question_bank import LANGUAGES, get_translations
+from report import get_summary_markdown
+from scoring import (CHOICE_CODES, DEFAULT_INTENSITY, OPERATIONAL_RULES, QUESTION_COUNT, STRESS_PATTERNS,
+                     TRAITS, match_batch, score_batch)
+
+DEFAULT_LANGUAGE = "en"
+
+
+def detect_format(path, fmt=None):
+    """Pick jsonl/csv from an explicit flag or the file extension."""
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    return "csv" if ext == ".csv" else "jsonl"
+
+
+def parse_answer(value):
+    """Turn {"choice", "intensity"} or "A3"-style cells into (choice code, intensity)."""
+    if not value:
+        return 0, 0
+    if isinstance(value, dict):
+        choice, intensity = value.get("choice"), value.get("intensity", DEFAULT_INTENSITY)
+    else:
+        value = str(value).strip().upper()
+        choice, intensity = value[:1], value[1:] or DEFAULT_INTENSITY
+    try:
+        intensity = int(intensity)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid intensity {intensity!r}")
+    if choice not in CHOICE_CODES:
+        if not choice:
+            return 0, 0
+        raise ValueError(f"invalid choice {choice!r}")
+    if intensity not in (1, 2, 3):
+        raise ValueError(f"invalid intensity {intensity!r}")
+    return CHOICE_CODES[choice], intensity
+
+
+def read_records(path, fmt):
+    """Yield (record id, language, {q_id: raw answer} or an error message) from a JSONL or CSV file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            for n, row in enumerate(csv.DictReader(f), start=1):
+                answers = {q_id: row.get(f"q{q_id}") for q_id in range(1, QUESTION_COUNT + 1)}
+                yield row.get("id") or str(n), row.get("language") or None, answers
+        else:
+            for n, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    answers = {int(k): v for k, v in (record.get("answers") or {}).items()}
+                except (ValueError, AttributeError) as e:
+                    yield str(n), None, f"line {n}: {e}"
+                    continue
+                yield str(record.get("id", n)), record.get("language"), answers
+
+
+def score_chunk(records, default_language=DEFAULT_LANGUAGE, with_summary=False):
+    """Score a list of records in one NumPy pass and return output dicts."""
+    out = []
+    rows = []
+    for record_id, language, answers in records:
+        if isinstance(answers, str):
+            out.append({"id": record_id, "error": answers})
+            continue
+        try:
+            codes = [parse_answer(answers.get(q_id)) for q_id in range(1, QUESTION_COUNT + 1)]
+        except ValueError as e:
+            out.append({"id": record_id, "error": str(e)})
+            continue
+        lang = language if language in LANGUAGES else default_language
+        rows.append(len(out))
+        out.append({"id": record_id, "language": lang, "codes": codes})
+    if not rows:
+        return out
+
+    choices = np.array([[c for c, _ in out[i]["codes"]] for i in rows], dtype=np.int8)
+    intensities = np.array([[w for _, w in out[i]["codes"]] for i in rows], dtype=np.int8)
+    traits = score_batch(choices, intensities)
+    stress = match_batch(STRESS_PATTERNS, choices)
+    rules = match_batch(OPERATIONAL_RULES, choices)
+
+    for n, i in enumerate(rows):
+        result = out[i]
+        del result["codes"]
+        t = get_translations(result["language"])
+        result["traits"] = {trait: int(v) for trait, v in zip(TRAITS, traits[n])}
+        result["stressPatterns"] = [t[key] for (_, _, key), hit in zip(STRESS_PATTERNS, stress[n]) if hit]
+        result["operationalRules"] = [t[key] for (_, _, key), hit in zip(OPERATIONAL_RULES, rules[n]) if hit]
+        if with_summary:
+            result["summary"] = get_summary_markdown(result, t, result["language"])
+    return out
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size items."""
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bounded_imap(pool, func, chunks, max_pending, *args):
+    """Like Pool.imap, but never reads more than max_pending chunks ahead of the writer."""
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.apply_async(func, (chunk, *args)))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+class ResultWriter:
+    """Write scored records as JSONL or flat CSV (one column per trait)."""
+
+    def __init__(self, f, fmt, with_summary=False):
+        self.f = f
+        self.fmt = fmt
+        self.csv = None
+        if fmt == "csv":
+            fields = ["id", "language", *TRAITS, "stressPatterns", "operationalRules", "error"]
+            if with_summary:
+                fields.append("summary")
+            self.csv = csv.DictWriter(f, fieldnames=fields)
+            self.csv.writeheader()
+
+    def write(self, result):
+        if self.csv is None:
+            self.f.write(json.dumps(result, ensure_ascii=False) + "\n")
+            return
+        row = {k: v for k, v in result.items() if k != "traits"}
+        row.update(result.get("traits", {}))
+        for key in ("stressPatterns", "operationalRules"):
+            if key in row:
+                row[key] = " | ".join(row[key])
+        self.csv.writerow(row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score psychometric answer sets from JSONL or CSV files.")
+    parser.add_argument("input", help="input file (.jsonl or .csv)")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"], help="default: from the input extension")
+    parser.add_argument("--output-format", choices=["jsonl", "csv"], help="default: from the output extension")
+    parser.add_argument("--language", default=DEFAULT_LANGUAGE, choices=LANGUAGES,
+                        help="language for records without one (default: en)")
+    parser.add_argument("--summary", action="store_true", help="include the markdown summary per record")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="records scored per NumPy pass")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0 = all cores)")
+    args = parser.parse_args(argv)
+
+    in_fmt = detect_format(args.input, args.input_format)
+    out_fmt = args.output_format or (detect_format(args.output) if args.output else "jsonl")
+    workers = args.workers or os.cpu_count() or 1
+    chunks = chunked(read_records(args.input, in_fmt), max(1, args.chunk_size))
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    scored = errors = 0
+    try:
+        writer = ResultWriter(out, out_fmt, args.summary)
+        if workers > 1:
+            with multiprocessing.Pool(workers) as pool:
+                results = bounded_imap(pool, score_chunk, chunks, workers * 2, args.language, args.summary)
+                for chunk_results in results:
+                    for result in chunk_results:
+                        writer.write(result)
+                        errors += "error" in result
+                        scored += 1
+        else:
+            for chunk in chunks:
+                for result in score_chunk(chunk, args.language, args.summary):
+                    writer.write(result)
+                    errors += "error" in result
+                    scored += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Scored {scored - errors} records ({errors} invalid)", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
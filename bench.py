@@ -0,0 +1,256 @@
+"""Offline microbenchmarks for the scoring, export and prompt-building hot paths.
+
+    python bench.py                     # run and compare with bench_baseline.json
+    python bench.py --save-baseline     # run and store the results as the new baseline
+    python bench.py --only pdf          # only benchmarks whose name contains "pdf"
+
+Inputs are fixed: ANSWER_SETS seeded synthetic answer sets and a generated
+deep analysis of ~3000 words in the shape the chapters have (headings,
+bold, bullets, quotes). For each function the median time per call and the
+peak memory one call allocates (tracemalloc) are reported. With a baseline,
+the run fails (exit 1) when a median exceeds max_slowdown times its
+baseline or peak memory exceeds max_memory_growth times. Timings depend on
+the machine, so record the baseline where the benchmarks are compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from answer_code import PackedAnswers
+from prompts import CHAPTER_PROMPTS, build_answer_summary, build_chapter_prompts, build_followup_block, build_profile_block
+from question_bank import QUESTION_IDS, load_bank
+from report import CONTRAST_QUESTIONS, generate_pdf, get_summary_html, get_summary_markdown
+from scoring import analyze, encode_answers, score_batch
+
+ANSWER_SETS = 64
+SEED = 20240501
+DEEP_WORDS = 3000
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+MAX_SLOWDOWN = 1.5
+MAX_MEMORY_GROWTH = 1.25
+
+_WORDS = (
+    "you", "your", "decisions", "pattern", "pressure", "energy", "systems", "trust", "autonomy", "detail",
+    "team", "momentum", "clarity", "structure", "risk", "learning", "conflict", "focus", "rules", "stress",
+    "strength", "blind", "spot", "when", "because", "rather", "than", "often", "quietly", "deliberately",
+    "the", "a", "of", "and", "to", "in", "with", "under", "before", "after", "this", "that", "means",
+)
+
+
+def synthetic_answers(n=ANSWER_SETS, seed=SEED):
+    """n complete answer dicts with seeded random choices and intensities."""
+    rng = random.Random(seed)
+    return [
+        {q_id: {"choice": rng.choice("AB"), "intensity": rng.randint(1, 3)} for q_id in QUESTION_IDS}
+        for _ in range(n)
+    ]
+
+
+def synthetic_followups(seed=SEED):
+    """Five follow-up questions with answers, as the follow-up page stores them."""
+    rng = random.Random(seed)
+    questions = [
+        {"tension": f"Tension {i + 1}", "question": f"How does tension {i + 1} show up for you?",
+         "optionA": "First way", "optionB": "Second way", "optionC": "Third way"}
+        for i in range(5)
+    ]
+    answers = {i: {"choice": rng.choice("ABC"), "text": "It depends on the week."} for i in range(5)}
+    return questions, answers
+
+
+def synthetic_deep_text(words=DEEP_WORDS, seed=SEED):
+    """A deterministic deep analysis of about words words, one section per chapter."""
+    rng = random.Random(seed)
+    per_chapter = words // len(CHAPTER_PROMPTS)
+
+    def sentence(n):
+        text = " ".join(rng.choice(_WORDS) for _ in range(n))
+        return text[0].upper() + text[1:] + "."
+
+    chapters = []
+    for i in range(len(CHAPTER_PROMPTS)):
+        lines = [f"## {i + 1}. Chapter {i + 1}", ""]
+        written = 0
+        while written < per_chapter:
+            kind = rng.random()
+            n = rng.randint(8, 20)
+            if kind < 0.6:
+                lines.append(f"**{sentence(3)[:-1]}:** {sentence(n)} {sentence(n)}")
+            elif kind < 0.85:
+                lines.append(f"- {sentence(n)}")
+            else:
+                lines.append(f"> {sentence(n)}")
+            lines.append("")
+            written += 2 * n + 3 if kind < 0.6 else n
+        chapters.append("\n".join(lines))
+    return "\n\n".join(chapters)
+
+
+def build_benchmarks(lang="en"):
+    """(name, callable) pairs; each callable does one unit of work on the next fixed input."""
+    bank = load_bank(lang)
+    t = bank.t
+    answer_sets = synthetic_answers()
+    analyses = [analyze(answers, t) for answers in answer_sets]
+    codes = [PackedAnswers.from_dict(answers).to_code(lang) for answers in answer_sets]
+    followup_questions, followup_answers = synthetic_followups()
+    deep_text = synthetic_deep_text()
+    encoded = [encode_answers(answers) for answers in answer_sets]
+    choices = np.stack([c for c, _ in encoded])
+    intensities = np.stack([w for _, w in encoded])
+
+    def payload(i, deep):
+        answers = answer_sets[i]
+        return {
+            "lang": lang,
+            "date": "January 1, 2025",
+            "analysis": analyses[i],
+            "contrasts": {str(q_id): answers[q_id]["choice"] for q_id in CONTRAST_QUESTIONS},
+            "deep_text": deep_text if deep else "",
+        }
+
+    def cycling(func):
+        state = {"i": 0}
+
+        def run():
+            i = state["i"] = (state["i"] + 1) % len(answer_sets)
+            return func(i)
+        return run
+
+    return [
+        ("analyze", cycling(lambda i: analyze(answer_sets[i], t))),
+        ("score_batch[64]", lambda: score_batch(choices, intensities)),
+        ("resume_code_decode", cycling(lambda i: PackedAnswers.from_code(codes[i]))),
+        ("answer_summary", cycling(lambda i: build_answer_summary(bank.questions, answer_sets[i]))),
+        ("profile_block", cycling(lambda i: build_profile_block(bank.questions, answer_sets[i], analyses[i]))),
+        ("chapter_prompts", lambda: build_chapter_prompts(
+            "English", build_followup_block(followup_questions, followup_answers))),
+        ("summary_markdown", cycling(lambda i: get_summary_markdown(analyses[i], t, lang))),
+        ("summary_html", cycling(lambda i: get_summary_html(analyses[i], t, lang))),
+        ("pdf", cycling(lambda i: generate_pdf(payload(i, deep=False)))),
+        ("pdf_with_deep_text", cycling(lambda i: generate_pdf(payload(i, deep=True)))),
+    ]
+
+
+def measure(func, min_seconds=0.2, repeats=5):
+    """(median seconds per call, peak bytes allocated by one call)."""
+    func()  # warm-up: imports, styles, caches
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds / repeats or loops >= 1 << 20:
+            break
+        loops *= 2
+    samples = [elapsed / loops]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return statistics.median(samples), peak
+
+
+def compare(result, baseline, max_slowdown, max_memory_growth):
+    """Problems with result relative to its baseline entry, as strings."""
+    problems = []
+    if baseline is None:
+        return problems
+    if result["seconds"] > baseline["seconds"] * max_slowdown:
+        problems.append(f"time {result['seconds'] / baseline['seconds']:.2f}x baseline")
+    if result["peak_bytes"] > baseline["peak_bytes"] * max_memory_growth:
+        problems.append(f"memory {result['peak_bytes'] / max(1, baseline['peak_bytes']):.2f}x baseline")
+    return problems
+
+
+def format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline microbenchmarks.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file (default: bench_baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this text")
+    parser.add_argument("--language", default="en", choices=["en", "de"])
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="minimum timed duration per benchmark")
+    parser.add_argument("--max-slowdown", type=float, help=f"allowed time vs baseline (default: {MAX_SLOWDOWN})")
+    parser.add_argument("--max-memory-growth", type=float,
+                        help=f"allowed peak memory vs baseline (default: {MAX_MEMORY_GROWTH})")
+    args = parser.parse_args(argv)
+
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    # Thresholds stored with the baseline apply unless overridden on the command line
+    limits = (baseline or {}).get("thresholds", {})
+    max_slowdown = args.max_slowdown or limits.get("max_slowdown", MAX_SLOWDOWN)
+    max_memory_growth = args.max_memory_growth or limits.get("max_memory_growth", MAX_MEMORY_GROWTH)
+
+    results = {}
+    failures = 0
+    print(f"{'benchmark':<22} {'median':>12} {'peak mem':>12}  vs baseline")
+    for name, func in build_benchmarks(args.language):
+        if args.only and args.only not in name:
+            continue
+        seconds, peak = measure(func, min_seconds=args.min_seconds)
+        results[name] = {"seconds": seconds, "peak_bytes": peak}
+        base = (baseline or {}).get("results", {}).get(name)
+        problems = compare(results[name], base, max_slowdown, max_memory_growth)
+        failures += bool(problems)
+        if base is None:
+            note = "-"
+        else:
+            note = f"{seconds / base['seconds']:.2f}x time, {peak / max(1, base['peak_bytes']):.2f}x mem"
+        if problems:
+            note += "  FAIL: " + "; ".join(problems)
+        print(f"{name:<22} {format_seconds(seconds):>12} {peak / 1024:>9.1f} KiB  {note}")
+
+    if args.save_baseline:
+        previous = load_baseline(args.baseline) or {}
+        merged = {**previous.get("results", {}), **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "thresholds": previous.get("thresholds", {"max_slowdown": max_slowdown,
+                                                          "max_memory_growth": max_memory_growth}),
+                "results": merged,
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+    elif baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one", file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
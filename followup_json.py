@@ -0,0 +1,159 @@
+"""Response schema and tolerant parsing for the follow-up questions.
+
+The follow-up call asks Gemini for JSON constrained to FOLLOWUP_SCHEMA, so
+the array almost always parses as is. When it does not (stray prose or
+fences, trailing commas, a stream cut off mid-object), repair() fixes the
+text locally so the call does not have to be repeated. Outcomes are
+counted per process; parse_stats() reports how often repair was needed and
+whether it worked.
+"""
+
+import json
+import re
+import threading
+from collections import Counter
+
+FIELDS = ("tension", "question", "optionA", "optionB", "optionC")
+
+FOLLOWUP_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {field: {"type": "string"} for field in FIELDS},
+        "required": list(FIELDS),
+    },
+}
+
+FOLLOWUP_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": FOLLOWUP_SCHEMA,
+}
+
+# Lower-cased keys without separators -> canonical field, e.g. "option_a" -> "optionA"
+_FIELD_ALIASES = {field.lower(): field for field in FIELDS}
+_FENCE = re.compile(r"```(?:json)?", re.IGNORECASE)
+_ARRAY_START = re.compile(r"\[\s*\{")
+
+_lock = threading.Lock()
+_outcomes = Counter()
+
+
+class FollowupParseError(ValueError):
+    """The response could not be turned into follow-up questions, even after repair."""
+
+
+def _count(outcome):
+    with _lock:
+        _outcomes[outcome] += 1
+
+
+def parse_stats():
+    """How many responses parsed as is, needed repair, or could not be used."""
+    with _lock:
+        return dict(_outcomes)
+
+
+def repair(text):
+    """Best-effort JSON array from model output.
+
+    Drops text around the array, trailing commas before a closing bracket
+    and, if the array is cut off, the unfinished last element.
+    """
+    text = _FENCE.sub("", text)
+    # The array of objects, not e.g. a "[5]" in leading prose
+    match = _ARRAY_START.search(text)
+    if match is not None:
+        start = match.start()
+    else:
+        # A lone object (or a run of them) instead of an array
+        start = text.find("{")
+        if start < 0:
+            raise FollowupParseError("no JSON array in response")
+        text = "[" + text[start:]
+        start = 0
+
+    out = []
+    depth = 0
+    in_string = False
+    escaped = False
+    last_complete = None
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            # Trailing comma before the closer
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            depth -= 1
+        out.append(ch)
+        if depth == 1 and ch == "}":
+            last_complete = len(out)
+        if depth == 0 and ch in "]}":
+            break
+
+    if depth > 0:
+        if last_complete is None:
+            raise FollowupParseError("response ended before the first complete question")
+        out = out[:last_complete] + ["]"]
+    return "".join(out)
+
+
+def _normalize(item):
+    """item with canonical field names, or None if a field is missing or empty."""
+    if not isinstance(item, dict):
+        return None
+    fields = {}
+    for key, value in item.items():
+        field = _FIELD_ALIASES.get(re.sub(r"[\s_-]", "", str(key)).lower())
+        if field is not None and isinstance(value, str) and value.strip():
+            fields[field] = value.strip()
+    if len(fields) != len(FIELDS):
+        return None
+    return {field: fields[field] for field in FIELDS}
+
+
+def _questions(data):
+    if isinstance(data, dict):
+        # {"questions": [...]} or similar wrapper
+        data = next((v for v in data.values() if isinstance(v, list)), [data])
+    if not isinstance(data, list):
+        return []
+    return [q for q in map(_normalize, data) if q is not None]
+
+
+def parse_followup_questions(text):
+    """Follow-up questions from a model response, repairing it locally if needed.
+
+    Returns a list of dicts with exactly the FIELDS keys and raises
+    FollowupParseError if no usable question can be recovered.
+    """
+    try:
+        questions = _questions(json.loads(text))
+        if questions:
+            _count("clean")
+            return questions
+    except json.JSONDecodeError:
+        pass
+    try:
+        questions = _questions(json.loads(repair(text)))
+    except (json.JSONDecodeError, FollowupParseError) as e:
+        _count("failed")
+        raise FollowupParseError(f"Invalid response format ({e})") from e
+    if not questions:
+        _count("failed")
+        raise FollowupParseError("Invalid response format (no complete questions)")
+    _count("repaired")
+    return questions
@@ -0,0 +1 @@
+"""Per-language text packs (UI strings and question texts)."""
@@ -0,0 +1,146 @@
+"""German text pack: UI strings and question texts keyed by question id."""
+
+TRANSLATIONS = {
+    "title": "Psychometrisches Benutzerhandbuch",
+    "subtitle": "Erstellen Sie ein hochauflösendes Profil Ihrer Persönlichkeitsarchitektur",
+    "phase1Title": "Phase 1: Entdeckung",
+    "phase1Desc": "20 Fragen zur Erfassung Ihrer grundlegenden Eigenschaften und Antriebe",
+    "phase2Title": "Phase 2: Stresstest",
+    "phase2Desc": '15 Hochdruckszenarien zur Enthüllung Ihrer "Schattenseite"',
+    "phase3Title": "Phase 3: Lösungsdesign",
+    "phase3Desc": "8 Fragen zur gemeinsamen Erstellung von Regeln für blinde Flecken",
+    "formatNote": "Format:",
+    "formatDesc": "Sie sehen zwei Optionen (A vs B) für jede Frage. Wählen Sie die, die stärker resoniert—auch wenn keine perfekt ist. Dann bewerten Sie, wie stark sie passt. Es gibt keine richtigen Antworten.",
+    "beginBtn": "Assessment Starten",
+    "choosePrompt": "Wählen Sie A oder B",
+    "slightly": "Leicht",
+    "clearly": "Klar",
+    "strongly": "Stark",
+    "howStrongly": "Wie stark?",
+    "back": "← Zurück",
+    "next": "Weiter →",
+    "pdfTitle": "Psychometrisches Benutzerhandbuch",
+    "pdfGenerated": "Erstellt am",
+    "architecture": "1. Die Architektur",
+    "hardwareTitle": "Hardware (Temperament) — Big Five Profil",
+    "osTitle": "Betriebssystem — Handlungsmodus-Profil",
+    "driversTitle": "Antriebe (Motivation)",
+    "openness": "Offenheit für Erfahrungen",
+    "conscientiousness": "Gewissenhaftigkeit",
+    "extraversion": "Extraversion",
+    "agreeableness": "Verträglichkeit",
+    "stability": "Emotionale Stabilität",
+    "factFinder": "Recherche-Antrieb",
+    "followThru": "System-Antrieb",
+    "quickStart": "Start-Antrieb",
+    "implementor": "Bau-Antrieb",
+    "autonomy": "Autonomie",
+    "mastery": "Meisterschaft",
+    "power": "Macht",
+    "affiliation": "Zugehörigkeit",
+    "contextualContrasts": "2. Kontextuelle Kontraste",
+    "trait": "Eigenschaft",
+    "closeButNot": "Ähnlich aber nicht Sie",
+    "clearlyNot": "Eindeutig nicht Sie",
+    "decisionSpeed": "Entscheidungsgeschwindigkeit",
+    "riskProfile": "Risikoprofil",
+    "conflictStyle": "Konfliktstil",
+    "learningMode": "Lernmodus",
+    "darkSide": "3. Schattenseite — Stressmuster",
+    "identifiedDerailers": "Identifizierte Entgleiser:",
+    "environmentFit": "4. Umgebungspassung",
+    "thrivesIn": "Blüht auf in",
+    "failsIn": "Scheitert in",
+    "operationalRules": "5. Operationelle Regeln",
+    "rulesIntro": "Selbstauferlegte Regeln zur Bewältigung identifizierter Reibungspunkte:",
+    "disclaimer": "Dieses Assessment dient der Selbstreflexion. Für klinische oder Personalentscheidungen konsultieren Sie validierte Instrumente von qualifizierten Fachleuten.",
+    "percentileOf": "höher als {pct} % der Teilnehmenden",
+    "percentileNote": "P = Perzentil: Anteil der {count} bisherigen Teilnehmenden mit niedrigerem Wert. Gespeichert werden nur anonyme Häufigkeiten, keine Antworten.",
+    "patternShare": "bei {pct} % der Teilnehmenden",
+    "impulsive": "Impulsiv ohne Daten", "methodical": "Methodischer Planer",
+    "paralysis": "Analyse-Paralyse", "gambler": "Bauchentscheider",
+    "calcRisk": "Kalkulierter Risikoträger", "steadyOpt": "Stetiger Optimierer",
+    "riskAverse": "Risikoaverser Bewahrer", "thrillSeek": "Nervenkitzel-Sucher",
+    "diplomatic": "Diplomatischer Herausforderer", "harmonious": "Harmonischer Vermittler",
+    "avoider": "Konfliktvermeider", "aggressive": "Aggressiver Konfrontierer",
+    "experimental": "Experimenteller Lerner", "studious": "Fleißiger Beobachter",
+    "theoretical": "Theoretischer Akademiker", "trialByFire": "Feuertaufe-Improvisator",
+    "highAutonomy": "Hohe Autonomie-Umgebungen", "structured": "Strukturierte Team-Umgebungen",
+    "micromanaged": "Mikromanagte Bürokratien", "unstructured": "Unstrukturiertes Chaos",
+    "fastMoving": "Schnelllebige Startups", "methodicalOrg": "Methodische Organisationen",
+    "slowMoving": "Langsame Institutionen", "moveFast": "Schnell-handeln-Kulturen",
+    "collaborative": "Kollaborative, soziale Umgebungen", "deepWork": "Deep-Work, fokusgetriebene Kulturen",
+    "isolated": "Isolierte Einzelarbeit", "constantMeetings": "Ständige Meetings und Unterbrechungen",
+    "learningFocused": "Lernorientierte Organisationen", "executionFocused": "Umsetzungsorientierte Organisationen",
+    "stagnant": "Stagnierende Umgebungen ohne Wachstum", "constantReinvention": "Ständiges Neuerfindungs-Chaos",
+    "confrontational": "Konfrontativ unter Druck", "withdrawing": "Rückzug unter Druck",
+    "taskFocused": "Aufgabenorientiert in emotionalen Situationen",
+    "ruleBending": "Regelbeugung bei hohen Einsätzen",
+    "perfectionism": "Perfektionismus unter Zeitdruck", "selfSacrifice": "Selbstaufopferungsmuster",
+    "spreadingThin": "Verzetteln im Chaos",
+    "rule1a": "Implementieren Sie nicht verhandelbare Kalenderblöcke für Erholung und Deep Work",
+    "rule1b": "Bestimmen Sie einen vertrauenswürdigen Berater mit Vetorecht über neue Verpflichtungen",
+    "rule2a": "Setzen Sie 48-Stunden-Entscheidungsfristen gegen Analyse-Paralyse",
+    "rule2b": "Führen Sie 24-Stunden-Abkühlungsperioden für wichtige Entscheidungen ein",
+    "rule3a": "Planen Sie monatliche strukturierte Feedback-Sitzungen mit wichtigen Stakeholdern",
+    "rule4a": "Wenden Sie einen 1,5x Multiplikator auf alle Zeitschätzungen an",
+    "rule4b": "Fordern Sie sich heraus zu handeln, bevor Sie sich 'bereit' fühlen",
+    "summaryTab": "📊 Kurzübersicht",
+    "deepTab": "📖 Tiefenanalyse",
+    "generateBtn": "Tiefenanalyse generieren",
+    "generating": "Tiefenanalyse wird erstellt...",
+    "downloadMd": "Herunterladen .md",
+    "downloadHtml": "Herunterladen .html (für PDF-Druck)",
+    "startOver": "Neu Starten",
+    "completeForAnalysis": "Vervollständigen Sie das Assessment für detaillierte Analyse",
+    "completePhase3": "Vervollständigen Sie Phase 3 für personalisierte Regeln.",
+}
+
+QUESTIONS = {
+    # Phase 1: Discovery
+    1: {"category": "Big Five - Offenheit", "questionA": "Du willst ein Thema richtig durchdringen", "questionB": "Du willst überall mitreden können"},
+    2: {"category": "Big Five - Gewissenhaftigkeit", "questionA": "Was du anfängst, machst du fertig", "questionB": "Wenn was Besseres kommt, wechselst du"},
+    3: {"category": "Big Five - Extraversion", "questionA": "Im Gespräch kommen dir die besten Ideen", "questionB": "Alleine denkst du am klarsten"},
+    4: {"category": "Big Five - Verträglichkeit", "questionA": "Du sagst, was Sache ist, auch wenn's unbequem ist", "questionB": "Du hältst die Gruppe zusammen, auch wenn du dafür zurücksteckst"},
+    5: {"category": "Big Five - Neurotizismus", "questionA": "Mit etwas Druck läufst du besser", "questionB": "Ohne Stress arbeitest du besser"},
+    6: {"category": "Handlungsmodus - Recherche", "questionA": "Ohne Fakten entscheidest du nicht", "questionB": "Du entscheidest aus dem Bauch"},
+    7: {"category": "Handlungsmodus - Systeme", "questionA": "Du machst dir gerne Systeme und Abläufe", "questionB": "Zu viel Struktur nervt dich"},
+    8: {"category": "Handlungsmodus - Umsetzung", "questionA": "Du legst einfach los und schaust, was passiert", "questionB": "Du planst erstmal gründlich durch"},
+    9: {"category": "Handlungsmodus - Bau", "questionA": "Du verstehst was, indem du es anfasst oder baust", "questionB": "Du verstehst was, indem du es im Kopf durchgehst"},
+    10: {"category": "Kernantrieb - Autonomie", "questionA": "Hauptsache selbstbestimmt arbeiten", "questionB": "Für gutes Geld nimmst du auch Vorgaben in Kauf"},
+    11: {"category": "Kernantrieb - Meisterschaft", "questionA": "In einer Sache richtig gut sein", "questionB": "In vielen Sachen brauchbar sein"},
+    12: {"category": "Kernantrieb - Macht", "questionA": "Du übernimmst gerne das Ruder", "questionB": "Du ziehst lieber im Hintergrund die Fäden"},
+    13: {"category": "Kernantrieb - Zugehörigkeit", "questionA": "Das Team ist wichtiger als die Aufgabe", "questionB": "Die Aufgabe ist wichtiger als das Team"},
+    14: {"category": "Entscheidungsfindung", "questionA": "Schnell entscheiden, notfalls korrigieren", "questionB": "Lieber einmal richtig entscheiden"},
+    15: {"category": "Risikoorientierung", "questionA": "Hohe Einsätze machen dir Spaß", "questionB": "Lieber stetig vorankommen"},
+    16: {"category": "Konfliktstil", "questionA": "Probleme sprichst du direkt an", "questionB": "Du suchst den Weg ohne Konfrontation"},
+    17: {"category": "Zeitorientierung", "questionA": "Du denkst an morgen", "questionB": "Du lebst im Jetzt"},
+    18: {"category": "Lernstil", "questionA": "Ausprobieren ist dein Weg zu lernen", "questionB": "Erstmal zugucken, dann selber machen"},
+    19: {"category": "Erfolgsdefinition", "questionA": "Erfolg heißt: was aufbauen, das bleibt", "questionB": "Erfolg heißt: leben wie du willst"},
+    20: {"category": "Feedback-Reaktion", "questionA": "Kritik bringt dich sofort in Bewegung", "questionB": "Kritik muss erstmal sacken"},
+    # Phase 2: Stress Testing
+    21: {"category": "Stress - Volatilität", "scenario": "Jemand hat über deinen Kopf hinweg entschieden.", "questionA": "Du gehst ihn sofort an", "questionB": "Du wartest ab und überlegst erstmal"},
+    22: {"category": "Stress - Skepsis", "scenario": "Der Neue will was ändern, das du aufgebaut hast.", "questionA": "Du stellst seine Idee vor allen in Frage", "questionB": "Du schaust dir erstmal an, was er drauf hat"},
+    23: {"category": "Stress - Vorsicht", "scenario": "Die Konkurrenz hat euch überholt.", "questionA": "Ihr haut schnell was raus, auch wenn's wackelt", "questionB": "Ihr macht es anders statt nur schneller"},
+    24: {"category": "Stress - Distanzierung", "scenario": "Im Team ist dicke Luft nach schlechten Nachrichten.", "questionA": "Du kümmerst dich ums Problem", "questionB": "Du kümmerst dich um die Leute"},
+    25: {"category": "Stress - Passiver Widerstand", "scenario": "Der Chef will was von dir, das du falsch findest.", "questionA": "Du machst mit, aber ohne Elan", "questionB": "Du sagst ihm, dass du das anders siehst"},
+    26: {"category": "Stress - Überschätzung", "scenario": "Vor dir hat jemand richtig abgeliefert.", "questionA": "Du legst noch eine Schippe drauf", "questionB": "Du machst einfach dein Ding"},
+    27: {"category": "Stress - Risikobereitschaft", "scenario": "Eine Abkürzung würde die Zahlen retten, ist aber grenzwertig.", "questionA": "Du nimmst sie — am Ende zählt das Ergebnis", "questionB": "Du lässt es und nimmst die schlechten Zahlen"},
+    28: {"category": "Stress - Aufmerksamkeit", "scenario": "Du sollst zuhören und dich zurückhalten.", "questionA": "Das fällt dir schwer", "questionB": "Das ist kein Problem"},
+    29: {"category": "Stress - Exzentrizität", "scenario": "Deine Idee wird als unrealistisch abgetan.", "questionA": "Du bleibst dabei — die anderen kapieren es noch nicht", "questionB": "Du schwenkst auf was Machbareres um"},
+    30: {"category": "Stress - Perfektionismus", "scenario": "80% jetzt oder 100% in drei Wochen?", "questionA": "Du wartest auf die 100%", "questionB": "Du nimmst die 80%"},
+    31: {"category": "Stress - Konformität", "scenario": "Jemand, dem du vertraust, rät dir was, das du falsch findest.", "questionA": "Du machst es trotzdem — er hat sich das Vertrauen verdient", "questionB": "Du gehst deinen eigenen Weg"},
+    32: {"category": "Burnout-Muster", "scenario": "Du bist platt. Urlaub steht an. Eine Krise kommt dazwischen.", "questionA": "Du bleibst und sagst den Urlaub ab", "questionB": "Du fährst trotzdem"},
+    33: {"category": "Misserfolgsreaktion", "scenario": "Dein Projekt ist gerade vor allen gescheitert.", "questionA": "Du gehst sofort in die Analyse", "questionB": "Du brauchst erstmal Abstand"},
+    34: {"category": "Vertrauensreparatur", "scenario": "Jemand hat sich mit deiner Arbeit geschmückt.", "questionA": "Du klärst das erstmal unter vier Augen", "questionB": "Du sorgst erstmal dafür, dass andere Bescheid wissen"},
+    35: {"category": "Kontrolle im Chaos", "scenario": "Alles brennt gleichzeitig — Team, Geld, Produkt.", "questionA": "Du konzentrierst dich auf das Wichtigste und lässt anderes liegen", "questionB": "Du versuchst, alles gleichzeitig zu retten"},
+    # Phase 3: Solution Design
+    36: {"category": "Regeldesign - Grenzen", "context": "Unter Druck nimmst du zu viel auf dich.", "questionA": "Du brauchst feste Zeiten, die keiner antastet", "questionB": "Du brauchst jemanden, der für dich bremst"},
+    37: {"category": "Regeldesign - Entscheidungsfindung", "context": "Du grübelst entweder zu lang oder entscheidest zu schnell.", "questionA": "Du brauchst Fristen, die dich zum Entscheiden zwingen", "questionB": "Du brauchst Pausen, die dich vom Schnellschuss abhalten"},
+    38: {"category": "Regeldesign - Feedback", "context": "Wie Feedback bei dir ankommt, entscheidet, was du damit machst.", "questionA": "Du brauchst feste Termine dafür", "questionB": "Du brauchst es sofort, wenn was ist"},
+    39: {"category": "Regeldesign - Energiemanagement", "context": "Deine Energie über den Tag beeinflusst deine Arbeit.", "questionA": "Das Schwere machst du morgens", "questionB": "Du brauchst Anlauf mit kleinen Sachen"},
+    40: {"category": "Regeldesign - Beziehungen", "context": "Mit bestimmten Leuten hakt es bei dir.", "questionA": "Du musst geduldiger mit den Langsamen sein", "questionB": "Du musst mehr Kontra geben bei den Lauten"},
+    41: {"category": "Regeldesign - Blinde Flecken", "context": "Jeder hat Muster, die er selbst nicht sieht.", "questionA": "Du unterschätzt, wie lang Dinge dauern", "questionB": "Du unterschätzt, was du kannst"},
+    42: {"category": "Regeldesign - Erholung", "context": "Wie du dich von Rückschlägen erholst.", "questionA": "Indem du was tust", "questionB": "Indem du Ruhe findest"},
+    43: {"category": "Regeldesign - Verantwortlichkeit", "context": "Wie du dich selbst bei der Stange hältst.", "questionA": "Jemand muss nachhaken", "questionB": "Druck von außen macht es schlimmer — du brauchst dein eigenes System"},
+}
@@ -0,0 +1,145 @@
+"""English text pack: UI strings and question texts keyed by question id."""
+
+TRANSLATIONS = {
+    "title": "Psychometric User Manual",
+    "subtitle": "Build a high-resolution profile of your personality architecture",
+    "phase1Title": "Phase 1: Discovery",
+    "phase1Desc": "20 questions mapping your baseline traits and drivers",
+    "phase2Title": "Phase 2: Stress Testing",
+    "phase2Desc": '15 high-pressure scenarios to reveal your "Dark Side"',
+    "phase3Title": "Phase 3: Solution Design",
+    "phase3Desc": "8 questions to co-create operational rules for blind spots",
+    "formatNote": "Format:",
+    "formatDesc": "You'll see two options (A vs B) for each question. Choose the one that resonates more strongly—even if neither is perfect. Then rate how strongly it fits. There are no right answers.",
+    "beginBtn": "Begin Assessment",
+    "choosePrompt": "Choose A or B",
+    "slightly": "Slightly",
+    "clearly": "Clearly",
+    "strongly": "Strongly",
+    "howStrongly": "How strongly?",
+    "back": "← Back",
+    "next": "Next →",
+    "pdfTitle": "Psychometric User Manual",
+    "pdfGenerated": "Generated on",
+    "architecture": "1. The Architecture",
+    "hardwareTitle": "Hardware (Temperament) — Big Five Profile",
+    "osTitle": "Operating System — Action Mode Profile",
+    "driversTitle": "Drivers (Motivation)",
+    "openness": "Openness to Experience",
+    "conscientiousness": "Conscientiousness",
+    "extraversion": "Extraversion",
+    "agreeableness": "Agreeableness",
+    "stability": "Emotional Stability",
+    "factFinder": "Research Drive",
+    "followThru": "Systems Drive",
+    "quickStart": "Launch Drive",
+    "implementor": "Build Drive",
+    "autonomy": "Autonomy",
+    "mastery": "Mastery",
+    "power": "Power",
+    "affiliation": "Affiliation",
+    "contextualContrasts": "2. Contextual Contrasts",
+    "trait": "Trait",
+    "closeButNot": "Close But Not You",
+    "clearlyNot": "Clearly Not You",
+    "decisionSpeed": "Decision Speed",
+    "riskProfile": "Risk Profile",
+    "conflictStyle": "Conflict Style",
+    "learningMode": "Learning Mode",
+    "darkSide": "3. Dark Side — Stress Patterns",
+    "identifiedDerailers": "Identified Derailers:",
+    "environmentFit": "4. Environment Fit",
+    "thrivesIn": "Thrives In",
+    "failsIn": "Fails In",
+    "operationalRules": "5. Operational Rules",
+    "rulesIntro": "Self-imposed rules to manage identified friction points:",
+    "disclaimer": "This assessment is for self-reflection purposes. For clinical or hiring decisions, consult validated instruments administered by qualified professionals.",
+    "percentileOf": "higher than {pct}% of respondents",
+    "percentileNote": "P = percentile: the share of {count:,} earlier respondents who scored lower. Only anonymous score counts are kept, never answers.",
+    "patternShare": "shared by {pct}% of respondents",
+    "impulsive": "Impulsive without data", "methodical": "Methodical planner",
+    "paralysis": "Analysis paralysis", "gambler": "Shoot-from-hip gambler",
+    "calcRisk": "Calculated risk-taker", "steadyOpt": "Steady optimizer",
+    "riskAverse": "Risk-averse preserver", "thrillSeek": "Thrill-seeking gambler",
+    "diplomatic": "Diplomatic challenger", "harmonious": "Harmonious mediator",
+    "avoider": "Conflict avoider", "aggressive": "Aggressive confronter",
+    "experimental": "Experimental learner", "studious": "Studious observer",
+    "theoretical": "Theoretical academic", "trialByFire": "Trial-by-fire improviser",
+    "highAutonomy": "High autonomy environments", "structured": "Structured team environments",
+    "micromanaged": "Micromanaged bureaucracies", "unstructured": "Unstructured chaos",
+    "fastMoving": "Fast-moving startups", "methodicalOrg": "Methodical organizations",
+    "slowMoving": "Slow-moving institutions", "moveFast": "Move-fast-break-things cultures",
+    "collaborative": "Collaborative, social settings", "deepWork": "Deep work, focus-driven cultures",
+    "isolated": "Isolated individual work", "constantMeetings": "Constant meetings and interruptions",
+    "learningFocused": "Learning-focused organizations", "executionFocused": "Execution-focused organizations",
+    "stagnant": "Stagnant, no-growth environments", "constantReinvention": "Constant reinvention chaos",
+    "confrontational": "Confrontational under pressure", "withdrawing": "Withdrawing under pressure",
+    "taskFocused": "Task-focused in emotional situations", "ruleBending": "Rule-bending when stakes are high",
+    "perfectionism": "Perfectionism under deadline", "selfSacrifice": "Self-sacrifice pattern",
+    "spreadingThin": "Spreading thin under chaos",
+    "rule1a": "Implement non-negotiable calendar blocks for recovery and deep work",
+    "rule1b": "Designate a trusted advisor with veto power over new commitments",
+    "rule2a": "Set 48-hour decision deadlines to prevent analysis paralysis",
+    "rule2b": "Institute 24-hour cooling-off periods for major decisions",
+    "rule3a": "Schedule monthly structured feedback sessions with key stakeholders",
+    "rule4a": "Apply 1.5x multiplier to all time estimates",
+    "rule4b": "Challenge yourself to act before feeling 'ready'",
+    "summaryTab": "📊 Summary",
+    "deepTab": "📖 Deep Analysis",
+    "generateBtn": "Generate Deep Analysis",
+    "generating": "Generating deep analysis...",
+    "downloadMd": "Download .md",
+    "downloadHtml": "Download .html (for PDF print)",
+    "startOver": "Start Over",
+    "completeForAnalysis": "Complete the full assessment for detailed analysis",
+    "completePhase3": "Complete Phase 3 for personalized rules.",
+}
+
+QUESTIONS = {
+    # Phase 1: Discovery
+    1: {"category": "Big Five - Openness", "questionA": "You'd rather know everything about one topic", "questionB": "You'd rather know a bit about many topics"},
+    2: {"category": "Big Five - Conscientiousness", "questionA": "You finish things, even when they get boring", "questionB": "You move on when something better comes along"},
+    3: {"category": "Big Five - Extraversion", "questionA": "You think better when you talk to others", "questionB": "You think better when you're alone"},
+    4: {"category": "Big Five - Agreeableness", "questionA": "You say hard things, even if people don't like it", "questionB": "You keep the peace, even if it costs you"},
+    5: {"category": "Big Five - Neuroticism", "questionA": "A bit of stress helps you focus", "questionB": "You work best when you feel relaxed"},
+    6: {"category": "Action Mode - Research", "questionA": "You need data before you decide", "questionB": "You go with your gut and look things up later"},
+    7: {"category": "Action Mode - Systems", "questionA": "You like making lists and processes", "questionB": "Lists and processes slow you down"},
+    8: {"category": "Action Mode - Launch", "questionA": "You'd rather start now and fix later", "questionB": "You'd rather wait until it's ready"},
+    9: {"category": "Action Mode - Build", "questionA": "You understand things by building them", "questionB": "You understand things by thinking them through"},
+    10: {"category": "Core Driver - Autonomy", "questionA": "Freedom at work matters more than money", "questionB": "You'd give up some freedom for better pay"},
+    11: {"category": "Core Driver - Mastery", "questionA": "You want to be the best at one thing", "questionB": "You want to be good at many things"},
+    12: {"category": "Core Driver - Power", "questionA": "You like being in charge", "questionB": "You'd rather influence from the side"},
+    13: {"category": "Core Driver - Affiliation", "questionA": "Who you work with matters more than what you do", "questionB": "What you do matters more than who you work with"},
+    14: {"category": "Decision Making", "questionA": "You decide quickly and adjust if needed", "questionB": "You take your time to get it right the first time"},
+    15: {"category": "Risk Orientation", "questionA": "Big risks excite you", "questionB": "You prefer steady progress"},
+    16: {"category": "Conflict Style", "questionA": "You address problems directly", "questionB": "You find ways around confrontation"},
+    17: {"category": "Time Orientation", "questionA": "You plan for the future", "questionB": "You focus on today"},
+    18: {"category": "Learning Style", "questionA": "You learn by trying", "questionB": "You learn by watching first"},
+    19: {"category": "Success Definition", "questionA": "Success means building something that lasts", "questionB": "Success means living how you want"},
+    20: {"category": "Feedback Response", "questionA": "Criticism motivates you right away", "questionB": "Criticism needs time to sink in"},
+    # Phase 2: Stress Testing
+    21: {"category": "Stress - Volatility", "scenario": "Someone made an important decision without asking you.", "questionA": "You confront them right away", "questionB": "You step back and think before reacting"},
+    22: {"category": "Stress - Skepticism", "scenario": "A new colleague wants to change something you built.", "questionA": "You question their idea openly", "questionB": "You first check if they know what they're talking about"},
+    23: {"category": "Stress - Caution", "scenario": "A competitor just launched what you're working on.", "questionA": "You rush to launch, even if it's not perfect", "questionB": "You slow down to do it differently"},
+    24: {"category": "Stress - Detachment", "scenario": "Your team got bad news and people are upset.", "questionA": "You focus on fixing the problem", "questionB": "You first take care of how people feel"},
+    25: {"category": "Stress - Passive Resistance", "scenario": "Your boss wants you to do something you think is wrong.", "questionA": "You do it, but slowly", "questionB": "You say openly that you disagree"},
+    26: {"category": "Stress - Overconfidence", "scenario": "You present right after someone who did really well.", "questionA": "You try harder to match them", "questionB": "You stay calm and do your thing"},
+    27: {"category": "Stress - Risk-Taking", "scenario": "A shortcut would help your numbers but breaks the rules a bit.", "questionA": "You take it — results count", "questionB": "You skip it and miss the target"},
+    28: {"category": "Stress - Attention-Seeking", "scenario": "In a meeting, you should stay quiet and let others talk.", "questionA": "That's hard for you", "questionB": "That's easy for you"},
+    29: {"category": "Stress - Eccentricity", "scenario": "Someone calls your idea unrealistic.", "questionA": "You stick with it — they don't get it yet", "questionB": "You adjust to something more normal"},
+    30: {"category": "Stress - Perfectionism", "scenario": "80% done today or 100% in three weeks?", "questionA": "You wait for 100%", "questionB": "You go with 80%"},
+    31: {"category": "Stress - Compliance", "scenario": "Someone you trust gives you advice you don't agree with.", "questionA": "You follow it — they've earned your trust", "questionB": "You thank them and do your own thing"},
+    32: {"category": "Burnout Pattern", "scenario": "You're exhausted. Vacation is booked. A crisis comes up.", "questionA": "You cancel the vacation", "questionB": "You go anyway"},
+    33: {"category": "Failure Response", "scenario": "Your project just failed publicly.", "questionA": "You analyze what went wrong right away", "questionB": "You need distance first"},
+    34: {"category": "Trust Repair", "scenario": "Someone took credit for your work.", "questionA": "You talk to them directly first", "questionB": "You make sure others know the truth first"},
+    35: {"category": "Control Under Chaos", "scenario": "Everything goes wrong at once — people, money, product.", "questionA": "You pick what matters most and let the rest burn", "questionB": "You try to fix everything"},
+    # Phase 3: Solution Design
+    36: {"category": "Rule Design - Boundaries", "context": "You tend to take on too much when stressed.", "questionA": "You need blocked time that nobody can touch", "questionB": "You need someone who can say no for you"},
+    37: {"category": "Rule Design - Decision Making", "context": "You either think too much or too little before deciding.", "questionA": "You need deadlines to stop overthinking", "questionB": "You need waiting time to stop rushing"},
+    38: {"category": "Rule Design - Feedback", "context": "How you get feedback affects what you do with it.", "questionA": "You need scheduled feedback meetings", "questionB": "You need feedback right when things happen"},
+    39: {"category": "Rule Design - Energy Management", "context": "Your energy level affects your work quality.", "questionA": "You do hard things first, when you're fresh", "questionB": "You start with easy things to get going"},
+    40: {"category": "Rule Design - Relationships", "context": "Your style creates friction with certain people.", "questionA": "You need more patience with slower people", "questionB": "You need to push back more against loud people"},
+    41: {"category": "Rule Design - Blind Spots", "context": "Everyone has patterns they don't see.", "questionA": "You take on too much and underestimate time", "questionB": "You underestimate yourself and prepare too much"},
+    42: {"category": "Rule Design - Recovery", "context": "How you recover from setbacks matters.", "questionA": "You recover by doing something", "questionB": "You recover by resting"},
+    43: {"category": "Rule Design - Accountability", "context": "How you stay on track affects what you finish.", "questionA": "You need someone checking on you", "questionB": "Outside pressure makes it worse — you need your own system"},
+}
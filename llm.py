@@ -0,0 +1,330 @@
+"""Gemini helpers: text generation and per-profile context reuse."""
+
+import datetime
+import hashlib
+import threading
+import time
+
+import startup
+from resilience import CallAbandoned, CallTimeout, run_direct
+from telemetry import status_of
+
+MODEL_NAME = "gemini-2.5-flash"
+CONTEXT_TTL_MINUTES = 30
+# Output tokens charged against the per-minute token budget before the real count is known
+EXPECTED_OUTPUT_TOKENS = 2048
+
+# Set once explicit caching is refused for good (e.g. free tier, prompt below
+# the provider's minimum), so later profiles go straight to prefix reuse.
+_explicit_cache_unavailable = False
+# After a transient failure (network, 429, 5xx) explicit caching is skipped
+# until this time.monotonic() value, then tried again
+_explicit_cache_retry_at = 0.0
+EXPLICIT_CACHE_RETRY_SECONDS = 300
+# Status codes that mean explicit caching will not work for this key or model
+_CACHE_REFUSED_STATUS = frozenset({400, 403, 404})
+
+
+def _genai():
+    # Deferred: the client pulls in protobuf/grpc, which the first pages never need
+    return startup.timed_import("google.generativeai")
+
+
+# Transport settings of the last configure(), reused for per-key clients
+_client_settings = {}
+
+
+def configure(api_key, endpoint=None):
+    """Configure the Gemini client, importing it on first use.
+
+    endpoint (e.g. a local mock_gemini server) replaces the public API and
+    is spoken to over REST.
+    """
+    global _client_settings
+    _client_settings = {"transport": "rest", "client_options": {"api_endpoint": endpoint}} if endpoint else {}
+    _genai().configure(api_key=api_key, **_client_settings)
+
+
+def warm_up_client(api_key, endpoint=None):
+    """Import and configure the client and build a model ahead of the first call."""
+    configure(api_key, endpoint)
+    _genai().GenerativeModel(MODEL_NAME)
+
+
+_key_clients = {}
+
+
+class KeyBindingUnsupported(RuntimeError):
+    """The installed google-generativeai cannot send one model's requests with its own key."""
+
+
+def bind_key(model, api_key):
+    """Make model send its requests with api_key instead of the process-wide configured key.
+
+    google-generativeai has no public per-model key: this builds a client
+    with the SDK's own client manager and sets it as the model's client,
+    which generate_content uses when present. requirements.txt pins the SDK
+    to the versions that work this way; if an upgrade drops either hook,
+    KeyBindingUnsupported is raised rather than every call quietly going
+    out on the configured key.
+    """
+    _genai()
+    manager_class = getattr(startup.timed_import("google.generativeai.client"), "_ClientManager", None)
+    if manager_class is None or not hasattr(model, "_client"):
+        raise KeyBindingUnsupported(
+            "this google-generativeai version cannot bind API keys per call; "
+            "install the version in requirements.txt or configure a single GEMINI_API_KEY"
+        )
+    client = _key_clients.get(api_key)
+    if client is None:
+        # configure() is global, so keep one client per key (same setup as configure())
+        manager = manager_class()
+        manager.configure(api_key=api_key, **_client_settings)
+        client = _key_clients[api_key] = manager.make_client("generative")
+    model._client = client
+    return model
+
+
+def generate_text(model, prompt, buffer=None, stream=False, on_chunk=None, usage=None, timeout=None, cancel=None,
+                  generation_config=None):
+    """Generate a response, appending streamed chunks to buffer as they arrive.
+
+    If usage is a dict, it is updated with the token counts the API reports.
+    timeout (seconds) bounds the whole call; cancel is an Event that stops a
+    stream early. generation_config (e.g. a response schema) applies to this
+    call only.
+    """
+    buffer = [] if buffer is None else buffer
+    options = {"request_options": {"timeout": timeout}} if timeout else {}
+    if generation_config:
+        options["generation_config"] = generation_config
+    deadline = time.monotonic() + timeout if timeout else None
+    if not stream:
+        response = model.generate_content(prompt, **options)
+        buffer.append(response.text)
+    else:
+        response = model.generate_content(prompt, stream=True, **options)
+        for chunk in response:
+            if cancel is not None and cancel.is_set():
+                raise CallAbandoned("another attempt finished first")
+            if deadline is not None and time.monotonic() > deadline:
+                raise CallTimeout(f"response took longer than {timeout:.0f} s")
+            # Trailing chunks may carry only finish metadata and no text
+            if chunk.candidates and chunk.candidates[0].content.parts:
+                buffer.append(chunk.text)
+                if on_chunk:
+                    on_chunk("".join(buffer))
+    text = "".join(buffer)
+    if not text:
+        raise ValueError("Empty response from model")
+    if usage is not None:
+        record_usage(usage, response)
+    return text
+
+
+def generate_limited(ctx, instructions, limiter=None, session_id=None, policy=None,
+                     buffer=None, on_chunk=None, on_wait=None, usage=None, stream=False, cancel=None,
+                     generation_config=None, telemetry=None, labels=None):
+    """One call on a ProfileContext, admitted through limiter and run under policy.
+
+    Each attempt is admitted by limiter in this thread before it is submitted
+    (a hedge only if no waiting is needed) and charged an estimate of its
+    tokens up front; the estimate is corrected with the reported usage
+    afterwards. buffer ends up holding the winning attempt's text and, while
+    streaming, the leading attempt's text so far. on_chunk and on_wait(position, seconds) are called in this thread.
+    Setting the cancel Event stops the call with CallAbandoned at its next
+    progress update. Without a policy the call runs once, in this thread.
+    telemetry records the call as an "llm_call" span with labels (e.g. the
+    chapter), its status, number of attempts and token counts.
+    """
+    started = time.perf_counter()
+    prompt = ctx.prompt(instructions)
+    estimate = estimate_tokens(ctx.full_prompt(instructions)) + EXPECTED_OUTPUT_TOKENS
+    usage_lock = threading.Lock()
+    call_usage_total = {}
+    attempts = []
+
+    def admit(hedge):
+        # Runs in this thread before each attempt is submitted, so no worker waits for quota
+        if limiter is None:
+            return None
+        if hedge:
+            return limiter.try_acquire(estimate)
+        return limiter.acquire(session_id, estimate, on_wait=lambda *pos: relay(("wait", *pos)))
+
+    def attempt(handle):
+        lease = handle.lease
+        handle.start()
+        attempts.append(handle)
+        call_usage = {}
+        try:
+            if cancel is not None and cancel.is_set():
+                raise CallAbandoned("cancelled by the caller")
+            model = ctx.model()
+            if lease is not None and limiter.key_count > 1:
+                bind_key(model, lease.api_key)
+            return generate_text(model, prompt, stream=stream, usage=call_usage, timeout=handle.remaining(),
+                                 cancel=handle.cancelled, on_chunk=lambda text: handle.publish(("text", text)),
+                                 generation_config=generation_config)
+        finally:
+            if lease is not None:
+                limiter.settle(lease, call_usage.get("prompt_tokens", 0) + call_usage.get("output_tokens", 0))
+            with usage_lock:
+                for key, value in call_usage.items():
+                    call_usage_total[key] = call_usage_total.get(key, 0) + value
+                    if usage is not None:
+                        usage[key] = usage.get(key, 0) + value
+
+    def relay(update):
+        if cancel is not None and cancel.is_set():
+            raise CallAbandoned("cancelled by the caller")
+        if update[0] == "wait":
+            if on_wait:
+                on_wait(*update[1:])
+            return
+        if buffer is not None:
+            buffer[:] = [update[1]]
+        if on_chunk:
+            on_chunk(update[1])
+
+    status = "ok"
+    try:
+        if policy is not None:
+            text = policy.call(attempt, relay, admit=admit)
+        else:
+            text = run_direct(attempt, relay, admit=admit)
+    except Exception as e:
+        status = "abandoned" if isinstance(e, CallAbandoned) else status_of(e)
+        raise
+    finally:
+        if telemetry is not None:
+            with usage_lock:
+                tokens = dict(call_usage_total)
+            telemetry.record("llm_call", time.perf_counter() - started, labels, status=status,
+                             attempts=len(attempts), **tokens)
+    if buffer is not None:
+        buffer[:] = [text]
+    return text
+
+
+def record_usage(usage, response):
+    """Add the usage_metadata token counts of a response to a usage dict."""
+    meta = getattr(response, "usage_metadata", None)
+    for key, field in (("prompt_tokens", "prompt_token_count"),
+                       ("cached_tokens", "cached_content_token_count"),
+                       ("output_tokens", "candidates_token_count")):
+        usage[key] = usage.get(key, 0) + (getattr(meta, field, 0) or 0)
+    return usage
+
+
+def estimate_tokens(text):
+    """Rough local token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class ProfileContext:
+    """The shared per-profile prompt block, uploaded once and reused by every call.
+
+    With explicit caching the block is stored provider-side and each call only
+    sends its own instructions. Otherwise every prompt starts with the identical
+    block so the provider's implicit prefix cache can serve it.
+    """
+
+    def __init__(self, block, use_explicit_cache=True, ttl_minutes=CONTEXT_TTL_MINUTES):
+        self.block = block
+        self.key = hashlib.sha256(block.encode("utf-8")).hexdigest()
+        self.context_tokens = estimate_tokens(block)
+        self.calls = 0
+        self.cached_responses = 0
+        self.usage = {}
+        self.mode = "prefix"
+        self._use_explicit_cache = use_explicit_cache
+        self._ttl_minutes = ttl_minutes
+        self._cache = None
+        self._expires = None
+        self._lock = threading.Lock()
+
+    def _ensure_cache(self):
+        # Created on first use, so profiles served entirely from the response
+        # cache never upload anything. Chapter threads race here, hence the lock.
+        with self._lock:
+            self._create_cache()
+
+    def _create_cache(self):
+        global _explicit_cache_unavailable, _explicit_cache_retry_at
+        if not self._use_explicit_cache or _explicit_cache_unavailable or time.monotonic() < _explicit_cache_retry_at:
+            return
+        self._use_explicit_cache = False
+        ttl_minutes = self._ttl_minutes
+        try:
+            self._cache = _genai().caching.CachedContent.create(
+                model=f"models/{MODEL_NAME}",
+                display_name=f"profile-{self.key[:16]}",
+                contents=[self.block],
+                ttl=datetime.timedelta(minutes=ttl_minutes),
+            )
+        except Exception as e:
+            if getattr(e, "code", None) in _CACHE_REFUSED_STATUS:
+                _explicit_cache_unavailable = True
+            else:
+                _explicit_cache_retry_at = time.monotonic() + EXPLICIT_CACHE_RETRY_SECONDS
+            return
+        self.mode = "explicit"
+        self._expires = datetime.datetime.now() + datetime.timedelta(minutes=ttl_minutes - 1)
+        meta = getattr(self._cache, "usage_metadata", None)
+        if meta and meta.total_token_count:
+            self.context_tokens = meta.total_token_count
+
+    def matches(self, block):
+        """Whether this context was built from block and is still usable."""
+        if self.block != block:
+            return False
+        return self._expires is None or datetime.datetime.now() < self._expires
+
+    def model(self, **kwargs):
+        """A model bound to this context."""
+        self._ensure_cache()
+        if self._cache is not None:
+            return _genai().GenerativeModel.from_cached_content(cached_content=self._cache, **kwargs)
+        return _genai().GenerativeModel(MODEL_NAME, **kwargs)
+
+    def prompt(self, instructions):
+        """The prompt to send for one call that uses this context."""
+        self._ensure_cache()
+        if self._cache is not None:
+            return instructions
+        return self.full_prompt(instructions)
+
+    def full_prompt(self, instructions):
+        """The complete logical prompt (context plus instructions) of one call."""
+        return f"{self.block}\n\n{instructions}"
+
+    def record_cached_response(self):
+        """Account one call answered by the response cache instead of the API."""
+        self.cached_responses += 1
+
+    def record(self, usage):
+        """Account one finished call."""
+        self.calls += 1
+        for key, value in usage.items():
+            self.usage[key] = self.usage.get(key, 0) + value
+
+    def stats(self):
+        """Context size, number of calls and input tokens served from cache."""
+        return {
+            "mode": self.mode,
+            "context_tokens": self.context_tokens,
+            "calls": self.calls,
+            "cached_responses": self.cached_responses,
+            "prompt_tokens": self.usage.get("prompt_tokens", 0),
+            "saved_tokens": self.usage.get("cached_tokens", 0),
+        }
+
+    def close(self):
+        """Drop the provider-side cache early instead of waiting for its TTL."""
+        if self._cache is not None:
+            try:
+                self._cache.delete()
+            except Exception:
+                pass
+            self._cache = None
@@ -0,0 +1,340 @@
+"""Load test: simulated concurrent sessions against one app instance.
+
+Starts mock_gemini.MockGeminiServer and `streamlit run app.py` pointed at
+it, then drives N sessions over Streamlit's websocket protocol the way a
+browser does: language, intro, all 43 questions, the follow-up questions
+and the results page until the deep analysis is complete. Sessions start
+spread over --ramp seconds and pause --think-time seconds (exponential)
+between clicks.
+
+Reported: p50/p95/p99 latency of ordinary reruns (click until the script
+run finished), the wait for the follow-up questions, report completion
+time, and the server's CPU time and memory (RSS of the server process and
+its children, Linux only) in total and per session.
+
+    python loadtest.py --sessions 20 --ramp 10 --latency-median 2 --error-rate 0.02
+    python loadtest.py --sessions 5 --setting RATE_LIMIT_RPM=30 --setting CHAPTER_CONCURRENCY=2
+
+Needs the development tools: pip install -r requirements-dev.txt
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from mock_gemini import MockGeminiServer, add_config_arguments, config_from_args
+from question_bank import get_translations
+from resilience import percentile
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+FINISHED = ForwardMsg.ScriptFinishedStatus.FINISHED_SUCCESSFULLY
+COMPILE_ERROR = ForwardMsg.ScriptFinishedStatus.FINISHED_WITH_COMPILE_ERROR
+BEGIN_LABEL = get_translations("en")["beginBtn"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def widget_key(widget_id):
+    """The user key of a widget id ("$$ID-<hash>-<key>"), or None."""
+    parts = widget_id.split("-", 2)
+    return parts[2] if len(parts) == 3 and parts[2] != "None" else None
+
+
+class ProcessSampler:
+    """CPU seconds and RSS of a process and its children, sampled from /proc."""
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.available = os.path.exists(f"/proc/{pid}/stat")
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _pids(self):
+        pids = [self.pid]
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat") as f:
+                        if int(f.read().rsplit(")", 1)[1].split()[1]) == self.pid:
+                            pids.append(int(entry))
+                except (OSError, IndexError, ValueError):
+                    continue
+        return pids
+
+    def sample(self):
+        """(cpu seconds, rss bytes) of the process tree now."""
+        cpu = rss = 0
+        for pid in self._pids():
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                cpu += (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+                rss += int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+            except (OSError, IndexError, ValueError):
+                continue
+        self.peak_rss = max(self.peak_rss, rss)
+        return cpu, rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        if self.available:
+            self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+class Session:
+    """One simulated user clicking through the app over a websocket."""
+
+    def __init__(self, n, url, think_time, timeout, rng):
+        self.n = n
+        self.url = url
+        self.think_time = think_time
+        self.timeout = timeout
+        self.rng = rng
+        self.query_string = ""
+        self.buttons = []
+        self.timings = []          # (kind, seconds)
+        self.errors = []
+        self.answered = 0
+        self.completed = False
+        self.duration = None
+
+    async def run(self, websockets):
+        started = time.perf_counter()
+        try:
+            async with websockets.connect(self.url, subprotocols=["streamlit"], max_size=None) as ws:
+                self.ws = ws
+                await self.interact(None, "navigate")
+                while not self.completed:
+                    widget_id, kind = self.next_click()
+                    if widget_id is None:
+                        self.errors.append("no button to continue with")
+                        break
+                    await asyncio.sleep(self.rng.expovariate(1 / self.think_time) if self.think_time else 0)
+                    await self.interact(widget_id, kind)
+        except Exception as e:
+            self.errors.append(f"{type(e).__name__}: {e}")
+        self.duration = time.perf_counter() - started
+
+    async def interact(self, widget_id, kind):
+        """Click widget_id (None: plain rerun) and wait until the app settled."""
+        msg = BackMsg()
+        msg.rerun_script.query_string = self.query_string
+        if widget_id is not None:
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            state.trigger_value = True
+        started = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        deadline = started + self.timeout
+        buttons = []
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise TimeoutError(f"no finished script run within {self.timeout:.0f} s")
+            fm = ForwardMsg()
+            fm.ParseFromString(await asyncio.wait_for(self.ws.recv(), remaining))
+            kind_of = fm.WhichOneof("type")
+            if kind_of == "new_session":
+                # Every script run (also after st.rerun) starts with one
+                buttons = []
+            elif kind_of == "page_info_changed":
+                self.query_string = fm.page_info_changed.query_string
+            elif kind_of == "delta" and fm.delta.WhichOneof("type") == "new_element":
+                element = fm.delta.new_element
+                if element.WhichOneof("type") == "button":
+                    buttons.append(element.button)
+                elif element.WhichOneof("type") == "exception":
+                    self.errors.append(f"app exception: {element.exception.message}")
+            elif kind_of == "script_finished" and fm.script_finished in (FINISHED, COMPILE_ERROR):
+                break
+        self.timings.append((kind, time.perf_counter() - started))
+        self.buttons = buttons
+        if any("Redo" in b.label for b in buttons):
+            self.completed = True
+
+    def next_click(self):
+        """(widget id, timing kind) of the next click, like a user would choose it."""
+        by_key = {widget_key(b.id): b for b in self.buttons}
+        for b in self.buttons:
+            if "English" in b.label or b.label == BEGIN_LABEL:
+                return b.id, "navigate"
+        if "a_" + str(self.answered + 1) in by_key:
+            return by_key[self.rng.choice("ab") + "_" + str(self.answered + 1)].id, "answer"
+        if "int_1" in by_key:
+            self.answered += 1
+            # The last answer opens the follow-up page, which generates its questions
+            kind = "followup_wait" if self.answered == 43 else "answer"
+            return by_key[self.rng.choice(("int_1", "int_2", "int_3"))].id, kind
+        if "fu_next" in by_key:
+            next_button = by_key["fu_next"]
+            if next_button.disabled:
+                options = [b for key, b in by_key.items() if key and key.startswith("fu_") and key[-2] == "_"]
+                return self.rng.choice(options).id, "followup"
+            last = "Results" in next_button.label or "Ergebnisse" in next_button.label
+            return next_button.id, "report" if last else "followup"
+        for b in self.buttons:
+            # Follow-up generation failed: skip to the results
+            if "Skip" in b.label and widget_key(b.id) is None:
+                return b.id, "report"
+        return None, None
+
+
+def summarize(values):
+    if not values:
+        return "n=0"
+    return (f"n={len(values)} p50 {percentile(values, 0.5):.3f} s · p95 {percentile(values, 0.95):.3f} s"
+            f" · p99 {percentile(values, 0.99):.3f} s · max {max(values):.3f} s")
+
+
+async def drive(sessions, ramp):
+    import websockets
+
+    async def start(session, delay):
+        await asyncio.sleep(delay)
+        await session.run(websockets)
+
+    step = ramp / max(1, len(sessions) - 1) if len(sessions) > 1 else 0
+    await asyncio.gather(*(start(s, i * step) for i, s in enumerate(sessions)))
+
+
+def wait_healthy(base_url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("streamlit exited during startup")
+        try:
+            with urllib.request.urlopen(f"{base_url}/_stcore/health", timeout=2) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.3)
+    raise RuntimeError("streamlit did not become healthy")
+
+
+def write_secrets(directory, endpoint, settings):
+    values = {
+        "GEMINI_API_KEY": "mock-key",
+        "GEMINI_API_ENDPOINT": endpoint,
+        "RESPONSE_CACHE_PATH": os.path.join(directory, "responses.sqlite3"),
+        "SESSION_STORE_PATH": os.path.join(directory, "sessions.sqlite3"),
+    }
+    values.update(settings)
+    path = os.path.join(directory, "secrets.toml")
+    with open(path, "w", encoding="utf-8") as f:
+        for key, value in values.items():
+            if isinstance(value, str) and value.lower() not in ("true", "false") and not value.replace(".", "", 1).isdigit():
+                value = '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+            f.write(f"{key} = {str(value).lower() if isinstance(value, bool) else value}\n")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the app with simulated sessions and a mock Gemini API.")
+    parser.add_argument("--sessions", type=int, default=10, help="simulated concurrent sessions")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which sessions start")
+    parser.add_argument("--think-time", type=float, default=0.3, help="mean pause between clicks (seconds)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="max seconds for one click to settle")
+    parser.add_argument("--setting", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra app setting written to the test secrets (repeatable)")
+    parser.add_argument("--port", type=int, default=0, help="app port (default: a free one)")
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        parser.error("loadtest.py needs the websockets package: pip install -r requirements-dev.txt")
+
+    mock = MockGeminiServer(config_from_args(args)).start()
+    settings = dict(item.split("=", 1) for item in args.setting)
+    port = args.port or free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as directory:
+        secrets = write_secrets(directory, mock.url, settings)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", SCRIPT, "--server.port", str(port),
+             "--server.address", "127.0.0.1", "--server.headless", "true",
+             "--server.enableXsrfProtection", "false", "--server.fileWatcherType", "none",
+             "--browser.gatherUsageStats", "false", "--secrets.files", secrets],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, cwd=directory,
+        )
+        try:
+            wait_healthy(base_url, server)
+            sampler = ProcessSampler(server.pid).start()
+            cpu_before, rss_before = sampler.sample()
+            sessions = [
+                Session(i, f"ws://127.0.0.1:{port}/_stcore/stream", args.think_time, args.timeout,
+                        random.Random(rng.random()))
+                for i in range(args.sessions)
+            ]
+            started = time.perf_counter()
+            asyncio.run(drive(sessions, args.ramp))
+            wall = time.perf_counter() - started
+            cpu_after, _ = sampler.sample()
+            sampler.stop()
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+            mock.stop()
+
+    timings = {}
+    for session in sessions:
+        for kind, seconds in session.timings:
+            timings.setdefault(kind, []).append(seconds)
+    reruns = timings.get("navigate", []) + timings.get("answer", []) + timings.get("followup", [])
+    completed = [s for s in sessions if s.completed]
+
+    print(f"Sessions: {len(completed)}/{len(sessions)} completed in {wall:.1f} s "
+          f"(mock: median first token {args.latency_median} s, {args.tokens_per_second:g} tok/s, "
+          f"error rate {args.error_rate:g})")
+    print(f"Rerun latency          {summarize(reruns)}")
+    print(f"Follow-up wait         {summarize(timings.get('followup_wait', []))}")
+    print(f"Report completion      {summarize(timings.get('report', []))}")
+    print(f"Session duration       {summarize([s.duration for s in completed])}")
+    if sampler.available:
+        cpu = cpu_after - cpu_before
+        growth = max(0, sampler.peak_rss - rss_before)
+        print(f"Server CPU             {cpu:.1f} s total · {cpu / max(1, len(sessions)):.2f} s per session"
+              f" · {cpu / wall:.2f} cores average")
+        print(f"Server memory          {rss_before / 2**20:.0f} MiB idle · {sampler.peak_rss / 2**20:.0f} MiB peak"
+              f" · {growth / max(1, len(sessions)) / 2**20:.1f} MiB per session")
+    else:
+        print("Server CPU/memory      not available (needs /proc)")
+    print(f"Mock API               {mock.stats.snapshot()}")
+    failed = [s for s in sessions if s.errors]
+    for session in failed[:10]:
+        print(f"session {session.n}: {'; '.join(dict.fromkeys(session.errors))}", file=sys.stderr)
+    return 1 if failed or len(completed) < len(sessions) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
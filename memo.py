@@ -0,0 +1,84 @@
+"""Answer-fingerprint memo for everything derived from a session's answers.
+
+Scores, stress patterns, rules, prompt blocks, the contrast and
+environment-fit tables and the summary exports are pure functions of the
+answers, the language and, for some, the follow-up questions and answers.
+fingerprint() hashes exactly that state. ArtifactMemo keeps artifacts per
+scope: ANSWERS for what reads only the 43 answers and the language, SESSION
+for what also reads the follow-ups. A scope's artifacts are dropped as soon
+as its fingerprint changes, so reruns with unchanged inputs rebuild nothing,
+a changed answer is never served a stale artifact, and typing a follow-up
+answer keeps the scores and profile blocks. Artifacts that also read
+something outside their scope (the exports read the deep-analysis text)
+pass a version; only the artifact of the latest version is kept per key,
+so regenerating chapters replaces the old export instead of adding one.
+"""
+
+import hashlib
+import json
+
+# Artifact scopes: what an artifact reads
+ANSWERS = "answers"     # the 43 answers and the language
+SESSION = "session"     # those plus the follow-up questions and answers
+
+
+def fingerprint(answers, lang, followup_questions=(), followup_answers=None):
+    """Content hash of the answer state that every derived artifact depends on."""
+    digest = hashlib.sha256((lang or "").encode("utf-8") + b"\0")
+    states = getattr(answers, "states", None)
+    if states is None:
+        # A plain answer dict (e.g. from tests or batch input)
+        states = json.dumps(sorted((int(q_id), a.get("choice"), a.get("intensity")) for q_id, a in answers.items()))
+        states = states.encode("utf-8")
+    digest.update(states + b"\0")
+    followup = [list(followup_questions or ()), {str(i): a for i, a in (followup_answers or {}).items()}]
+    digest.update(json.dumps(followup, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def content_hash(text):
+    """Short stand-in for a large input (e.g. the deep-analysis text) in an artifact version."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class ArtifactMemo:
+    """Derived artifacts per scope, built on first use."""
+
+    def __init__(self):
+        self.fingerprints = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._values = {}           # scope -> {key: (version, artifact)}
+
+    def sync(self, fingerprints):
+        """Switch to {scope: fingerprint}, forgetting the artifacts of every scope whose fingerprint changed."""
+        for scope, fp in fingerprints.items():
+            if self.fingerprints.get(scope) != fp:
+                if scope in self.fingerprints:
+                    self.invalidations += 1
+                self._values.pop(scope, None)
+                self.fingerprints[scope] = fp
+        return self
+
+    def get(self, key, build, scope=SESSION, version=None):
+        """The artifact under key (any hashable, e.g. "markdown"), built with build() on a miss.
+
+        scope names what build() reads; the default SESSION is always safe.
+        version (any hashable) covers whatever else build() reads: a
+        different version rebuilds the artifact and replaces the old one.
+        """
+        values = self._values.setdefault(scope, {})
+        entry = values.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = build()
+        values[key] = (version, value)
+        return value
+
+    def stats(self):
+        """Artifacts held, hit/miss counts and how often answers changed."""
+        return {"artifacts": sum(map(len, self._values.values())), "hits": self.hits, "misses": self.misses,
+                "invalidations": self.invalidations}
@@ -0,0 +1,252 @@
+"""Local stand-in for the Gemini REST API, for load tests and offline runs.
+
+Serves generateContent and streamGenerateContent for any model with
+synthetic text: a JSON array of follow-up questions when the request asks
+for JSON, otherwise a chapter of about output_tokens tokens. Latency is a
+lognormal time to first token plus output_tokens / tokens_per_second, and a
+share of requests (error_rate) fails with 503 or 429. Explicit context
+caching is not offered, so the app falls back to prefix reuse.
+
+Point the app at it with GEMINI_API_ENDPOINT = "http://127.0.0.1:8765" in
+secrets (any GEMINI_API_KEY works), or run it next to loadtest.py:
+
+    python mock_gemini.py --port 8765 --latency-median 1.5 --error-rate 0.02
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_WORDS = (
+    "you", "your", "decide", "pattern", "pressure", "energy", "systems", "trust", "autonomy", "detail",
+    "team", "momentum", "clarity", "structure", "risk", "learning", "conflict", "focus", "rules", "stress",
+    "the", "a", "of", "and", "to", "in", "with", "under", "when", "because", "rather", "than", "often",
+)
+_ROUTE = re.compile(r"^/v1(?:beta)?/models/(?P<model>[^:/]+):(?P<method>generateContent|streamGenerateContent)")
+_HEADING = re.compile(r"^## +.+$", re.MULTILINE)
+# Characters per token, as in llm.estimate_tokens
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class MockConfig:
+    """Latency, throughput and failure behaviour of the stand-in."""
+
+    latency_median: float = 1.0      # seconds to first token (median)
+    latency_sigma: float = 0.5       # lognormal spread of the time to first token
+    tokens_per_second: float = 80.0  # output speed after the first token
+    output_tokens: int = 450         # length of a chapter response
+    error_rate: float = 0.0          # share of requests that fail
+    chunk_tokens: int = 20           # tokens per streamed chunk
+    seed: int = None
+
+    def first_token_delay(self, rng):
+        if self.latency_median <= 0:
+            return 0.0
+        return rng.lognormvariate(math.log(self.latency_median), self.latency_sigma)
+
+
+class MockStats:
+    """Request counters of one server."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.output_tokens = 0
+
+    def add(self, error=False, output_tokens=0):
+        with self._lock:
+            self.requests += 1
+            self.errors += error
+            self.output_tokens += output_tokens
+
+    def snapshot(self):
+        with self._lock:
+            return {"requests": self.requests, "errors": self.errors, "output_tokens": self.output_tokens}
+
+
+def prompt_text(body):
+    """All text parts of a generateContent request body."""
+    return "\n".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+
+
+def wants_json(body):
+    config = body.get("generationConfig") or body.get("generation_config") or {}
+    return (config.get("responseMimeType") or config.get("response_mime_type")) == "application/json"
+
+
+def followup_text(rng):
+    """Five follow-up questions in the shape the app's schema asks for."""
+    return json.dumps([
+        {"tension": f"Tension {i + 1}", "question": f"When tension {i + 1} shows up, what do you do?",
+         "optionA": rng.choice(_WORDS).capitalize() + " first", "optionB": "Wait and see",
+         "optionC": "Ask someone"}
+        for i in range(5)
+    ])
+
+
+def chapter_text(prompt, tokens, rng):
+    """A markdown chapter of about tokens tokens, headed like the chapter the prompt asks for."""
+    headings = _HEADING.findall(prompt)
+    lines = [headings[-1] if headings else "## Analysis", ""]
+    written = 0
+    while written < tokens * CHARS_PER_TOKEN:
+        sentence = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 18)))
+        line = f"**{sentence[:1].upper()}{sentence[1:]}.**" if rng.random() < 0.2 else f"{sentence.capitalize()}."
+        lines.append(line)
+        written += len(line) + 1
+    return "\n".join(lines)
+
+
+def response_chunk(text, prompt_tokens=0, output_tokens=0, final=False):
+    chunk = {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}]}
+    if final:
+        chunk["candidates"][0]["finishReason"] = "STOP"
+        chunk["usageMetadata"] = {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens,
+                                  "totalTokenCount": prompt_tokens + output_tokens}
+    return chunk
+
+
+def make_handler(config, stats):
+    rng = random.Random(config.seed)
+    rng_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        # One response per connection: streamed bodies end when the connection closes
+        protocol_version = "HTTP/1.0"
+
+        def log_message(self, *args):
+            pass
+
+        def send_json(self, status, payload):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            match = _ROUTE.match(self.path)
+            if match is None:
+                # e.g. cachedContents: not offered, so clients use plain prompts
+                stats.add(error=True)
+                self.send_json(404, {"error": {"code": 404, "message": "not supported by the mock",
+                                               "status": "NOT_FOUND"}})
+                return
+
+            with rng_lock:
+                fail = rng.random() < config.error_rate
+                status = rng.choice((503, 429))
+                delay = config.first_token_delay(rng)
+                seed = rng.random()
+            prompt = prompt_text(body)
+            prompt_tokens = max(1, len(prompt) // CHARS_PER_TOKEN)
+            time.sleep(delay)
+            if fail:
+                stats.add(error=True)
+                self.send_json(status, {"error": {"code": status, "message": "mock failure",
+                                                  "status": "UNAVAILABLE" if status == 503 else "RESOURCE_EXHAUSTED"}})
+                return
+
+            local_rng = random.Random(seed)
+            text = followup_text(local_rng) if wants_json(body) else chapter_text(prompt, config.output_tokens, local_rng)
+            output_tokens = max(1, len(text) // CHARS_PER_TOKEN)
+            stats.add(output_tokens=output_tokens)
+            if match.group("method") == "generateContent":
+                time.sleep(output_tokens / config.tokens_per_second)
+                self.send_json(200, response_chunk(text, prompt_tokens, output_tokens, final=True))
+                return
+
+            # Streamed as one JSON array whose elements arrive over time
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            step = config.chunk_tokens * CHARS_PER_TOKEN
+            pieces = [text[i:i + step] for i in range(0, len(text), step)]
+            self.wfile.write(b"[")
+            for n, piece in enumerate(pieces):
+                time.sleep(config.chunk_tokens / config.tokens_per_second)
+                final = n == len(pieces) - 1
+                chunk = response_chunk(piece, prompt_tokens, output_tokens, final=final)
+                self.wfile.write((("," if n else "") + json.dumps(chunk)).encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"]")
+
+    return Handler
+
+
+class MockGeminiServer:
+    """The stand-in API on a local port, served from background threads."""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or MockConfig()
+        self.stats = MockStats()
+        self._server = ThreadingHTTPServer((host, port), make_handler(self.config, self.stats))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-gemini", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def add_config_arguments(parser):
+    """Command-line options for a MockConfig (shared with loadtest.py)."""
+    defaults = MockConfig()
+    parser.add_argument("--latency-median", type=float, default=defaults.latency_median,
+                        help="median seconds to first token")
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma,
+                        help="lognormal sigma of the time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--output-tokens", type=int, default=defaults.output_tokens, help="tokens per chapter")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="share of failed requests")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args):
+    return MockConfig(latency_median=args.latency_median, latency_sigma=args.latency_sigma,
+                      tokens_per_second=args.tokens_per_second, output_tokens=args.output_tokens,
+                      error_rate=args.error_rate, seed=args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Gemini API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = MockGeminiServer(config_from_args(args), host=args.host, port=args.port).start()
+    print(f"Mock Gemini API on {server.url} (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(5)
+            print(server.stats.snapshot(), file=sys.stderr)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
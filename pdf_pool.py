@@ -0,0 +1,119 @@
+"""Process pool for PDF exports.
+
+reportlab layout is CPU-bound and holds the GIL, so rendering in the server
+process slows every other session's reruns. PdfPool renders report payloads
+(see report.generate_pdf) in separate worker processes and returns bytes.
+At most queue_depth exports are queued or running at once; further requests
+fail fast with PdfPoolBusy, and an export that takes longer than timeout
+seconds raises PdfTimeout. render_pdf() turns either into an in-process
+render, so a busy pool slows an export down instead of failing it.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from report import generate_pdf, pdf_styles
+
+
+def _ping():
+    return True
+
+
+class PdfPoolBusy(RuntimeError):
+    """Raised when the export queue is full."""
+
+
+class PdfTimeout(RuntimeError):
+    """Raised when an export did not finish in time."""
+
+
+class PdfPool:
+    """A bounded pool of worker processes that turn report payloads into PDF bytes."""
+
+    def __init__(self, workers=2, queue_depth=8, timeout=30):
+        self.workers = max(1, workers)
+        self.queue_depth = max(1, queue_depth)
+        self.timeout = timeout
+        self.rendered = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._slots = threading.BoundedSemaphore(self.queue_depth)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: workers must not inherit the server's threads and sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=pdf_styles,
+                )
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        # shutdown() cannot interrupt a running job, so stop the workers directly
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def render(self, payload):
+        """Render payload in a worker process and return the PDF bytes."""
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PdfPoolBusy(f"{self.queue_depth} PDF exports already queued")
+        try:
+            executor = self._get_executor()
+            future = executor.submit(generate_pdf, payload)
+            try:
+                pdf = future.result(timeout=self.timeout)
+            except FutureTimeout:
+                self.timed_out += 1
+                # A stuck worker would keep its slot forever; start a fresh pool
+                self._reset(executor)
+                raise PdfTimeout(f"PDF export took longer than {self.timeout} s")
+            except BrokenProcessPool:
+                self._reset(executor)
+                raise
+            self.rendered += 1
+            return pdf
+        finally:
+            self._slots.release()
+
+    def warm_up(self):
+        """Start the worker processes and load reportlab in them ahead of the first export."""
+        executor = self._get_executor()
+        for future in [executor.submit(_ping) for _ in range(self.workers)]:
+            future.result(timeout=self.timeout)
+
+    def stats(self):
+        """Counters for this process."""
+        return {"rendered": self.rendered, "rejected": self.rejected, "timed_out": self.timed_out}
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def render_pdf(pool, payload, on_fallback=None):
+    """PDF bytes for payload from pool, rendered in this process if there is no pool or it is busy or stuck.
+
+    on_fallback(error) is called with the PdfPoolBusy / PdfTimeout that
+    caused an in-process render.
+    """
+    if pool is not None:
+        try:
+            return pool.render(payload)
+        except (PdfPoolBusy, PdfTimeout) as e:
+            if on_fallback:
+                on_fallback(e)
+    return generate_pdf(payload)
@@ -0,0 +1,247 @@
+"""Population statistics: how a profile compares with earlier respondents.
+
+Trait scores are integers on the spec's scale (1-10), so an exact histogram
+per trait is the whole sketch: 13 x 10 counters, O(1) updates, merged by
+adding counts, and percentile ranks without approximation. Stress patterns
+and operational rules are counted per translation key. No answers are
+kept. To count a resumed profile only once, the store keeps a keyed hash
+(HMAC with a random per-store salt) of each counted answer set for
+dedup_days; it cannot be turned back into answers.
+
+Counts are persisted in local SQLite and held in memory for instant reads.
+They are tied to the scoring spec version: when the rules change, counts
+made under the old rules are dropped rather than mixed with new scores.
+The command line only reads its files: one written under another spec
+version is skipped and left as it is.
+
+    python population.py .cache/population.sqlite3 [more.sqlite3 ...]   # merged distribution
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+
+from scoring_spec import SPEC
+
+# Count kinds besides the traits
+PROFILES = "profiles"
+STRESS = "stress"
+RULE = "rule"
+
+
+class SpecVersionMismatch(ValueError):
+    """A read-only store holds counts of another scoring spec version."""
+
+
+class PopulationStats:
+    """Per-trait score histograms and pattern counts of completed profiles.
+
+    Kept in memory only without a path. read_only opens an existing file
+    without ever writing to it (e.g. another deployment's counts): a file
+    made under another spec version raises SpecVersionMismatch instead of
+    being reset, and add() is not allowed.
+    """
+
+    def __init__(self, path=None, spec=SPEC, dedup_days=90, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self.dedup_seconds = dedup_days * 24 * 3600
+        self.version = spec["version"]
+        self.traits = tuple(spec["traits"])
+        self.min_score = spec["scale"]["min"]
+        self.max_score = spec["scale"]["max"]
+        self._lock = threading.Lock()
+        self._counts = Counter()    # (kind, key, bucket) -> count
+        self._conn = None
+        self._salt = secrets.token_bytes(16)
+        self._counted = {}          # identity digest -> time counted (in-memory stores only)
+        if path and read_only:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+            self._load_read_only()
+        elif path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS counts ("
+                " kind TEXT NOT NULL, key TEXT NOT NULL, bucket INTEGER NOT NULL, count INTEGER NOT NULL,"
+                " PRIMARY KEY (kind, key, bucket))"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS counted (digest TEXT PRIMARY KEY, added REAL NOT NULL)")
+            self._load()
+
+    def _load(self):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'spec_version'").fetchone()
+        if row is None or int(row[0]) != self.version:
+            # Scores made under other rules are not comparable
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM counts")
+            self._conn.execute("DELETE FROM counted")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('spec_version', ?)", (str(self.version),))
+            self._conn.execute("COMMIT")
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('salt', ?)", (self._salt.hex(),))
+        self._salt = bytes.fromhex(self._conn.execute("SELECT value FROM meta WHERE key = 'salt'").fetchone()[0])
+        self._conn.execute("DELETE FROM counted WHERE added < ?", (time.time() - self.dedup_seconds,))
+        for kind, key, bucket, count in self._conn.execute("SELECT kind, key, bucket, count FROM counts"):
+            self._counts[(kind, key, bucket)] = count
+
+    def _load_read_only(self):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'spec_version'").fetchone()
+        stored = int(row[0]) if row else None
+        if stored != self.version:
+            self._conn.close()
+            raise SpecVersionMismatch(f"{self.path} holds counts of scoring spec {stored}, not {self.version}")
+        for kind, key, bucket, count in self._conn.execute("SELECT kind, key, bucket, count FROM counts"):
+            self._counts[(kind, key, bucket)] = count
+
+    def _apply(self, deltas, digest=None):
+        """Add a {(kind, key, bucket): count} mapping in memory and on disk, in one transaction.
+
+        With digest, nothing is added (and False returned) if that digest was already counted.
+        """
+        if self.read_only:
+            raise ValueError(f"{self.path} is open read-only")
+        now = time.time()
+        with self._lock:
+            if self._conn is None and digest is not None:
+                if now - self._counted.get(digest, float("-inf")) < self.dedup_seconds:
+                    return False
+                self._counted[digest] = now
+            if self._conn is not None:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if digest is not None:
+                        self._conn.execute("DELETE FROM counted WHERE digest = ? AND added < ?",
+                                           (digest, now - self.dedup_seconds))
+                        inserted = self._conn.execute(
+                            "INSERT OR IGNORE INTO counted (digest, added) VALUES (?, ?)", (digest, now)
+                        ).rowcount
+                        if not inserted:
+                            self._conn.execute("ROLLBACK")
+                            return False
+                    self._conn.executemany(
+                        "INSERT INTO counts (kind, key, bucket, count) VALUES (?, ?, ?, ?)"
+                        " ON CONFLICT (kind, key, bucket) DO UPDATE SET count = count + excluded.count",
+                        [(*key, count) for key, count in deltas.items()],
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            self._counts.update(deltas)
+        return True
+
+    def add(self, traits, stress_keys=(), rule_keys=(), identity=None):
+        """Count one completed profile: its trait dict and the pattern / rule keys it triggered.
+
+        identity (bytes, e.g. the packed answer states) makes the count
+        idempotent: the same identity is counted at most once per dedup
+        window. Returns whether the profile was counted.
+        """
+        digest = None
+        if identity is not None:
+            digest = hmac.new(self._salt, identity, hashlib.sha256).hexdigest()
+        deltas = Counter({(PROFILES, "", 0): 1})
+        for trait in self.traits:
+            deltas[(trait, "", int(traits[trait]))] += 1
+        for key in stress_keys:
+            deltas[(STRESS, key, 0)] += 1
+        for key in rule_keys:
+            deltas[(RULE, key, 0)] += 1
+        return self._apply(deltas, digest)
+
+    def merge(self, other):
+        """Add every count of another PopulationStats (e.g. from a second deployment)."""
+        if other.version != self.version:
+            raise ValueError(f"cannot merge counts of scoring spec {other.version} into {self.version}")
+        self._apply(other.snapshot())
+
+    def snapshot(self):
+        """Copy of all counts as {(kind, key, bucket): count}."""
+        with self._lock:
+            return dict(self._counts)
+
+    @property
+    def profiles(self):
+        return self._counts[(PROFILES, "", 0)]
+
+    def histogram(self, trait):
+        """Number of profiles per score, min_score first."""
+        with self._lock:
+            return [self._counts[(trait, "", score)] for score in range(self.min_score, self.max_score + 1)]
+
+    def percentile_rank(self, trait, score):
+        """Percent of counted profiles that scored below score on trait (0-100)."""
+        with self._lock:
+            total = self._counts[(PROFILES, "", 0)]
+            below = sum(self._counts[(trait, "", s)] for s in range(self.min_score, int(score)))
+        return round(100 * below / total) if total else None
+
+    def share(self, kind, key):
+        """Percent of counted profiles with stress pattern / rule key (kind STRESS or RULE)."""
+        with self._lock:
+            total = self._counts[(PROFILES, "", 0)]
+            count = self._counts[(kind, key, 0)]
+        return round(100 * count / total) if total else None
+
+    def compare(self, traits, stress_keys=(), min_profiles=30):
+        """How a profile compares with the population, or None with fewer than min_profiles counted.
+
+        Returns {"count", "traits": {trait: percent scoring lower},
+        "stressPatterns": [percent sharing each of stress_keys]}.
+        """
+        count = self.profiles
+        if count < max(1, min_profiles):
+            return None
+        return {
+            "count": count,
+            "traits": {trait: self.percentile_rank(trait, traits[trait]) for trait in self.traits},
+            "stressPatterns": [self.share(STRESS, key) for key in stress_keys],
+        }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    paths = argv or [".cache/population.sqlite3"]
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        print(f"no population counts in {', '.join(missing)}", file=sys.stderr)
+        return 1
+    stats = PopulationStats()
+    merged = 0
+    for path in paths:
+        try:
+            other = PopulationStats(path, read_only=True)
+        except (SpecVersionMismatch, sqlite3.DatabaseError) as e:
+            print(f"skipped {path}: {e}", file=sys.stderr)
+            continue
+        stats.merge(other)
+        merged += 1
+    if not merged:
+        return 1
+    print(f"{stats.profiles} profiles (scoring spec {stats.version})\n")
+    scores = range(stats.min_score, stats.max_score + 1)
+    print(f"{'trait':<18}" + "".join(f"{score:>6}" for score in scores))
+    for trait in stats.traits:
+        print(f"{trait:<18}" + "".join(f"{n:>6}" for n in stats.histogram(trait)))
+    for kind, title in ((STRESS, "stress patterns"), (RULE, "operational rules")):
+        keys = sorted(key for k, key, _ in stats.snapshot() if k == kind)
+        if keys:
+            print(f"\n{title}:")
+            for key in keys:
+                print(f"  {key:<18} {stats.share(kind, key):>3}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Speculative follow-up generation that runs independently of the page.
+
+The follow-up call reads every answer, so it starts in a background thread
+as soon as the last answer is recorded, from a snapshot of the answers and
+the profile block built from them. If an answer in the snapshot changes
+(the user went back and answered differently) the speculation is cancelled
+and a new one started. The follow-up page joins a running, or picks up a
+finished, speculation only if its profile block equals the final one;
+otherwise it is discarded and the call made anew.
+"""
+
+import threading
+from collections import Counter
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+
+class Speculation:
+    """One background call started from a snapshot of a session's answers."""
+
+    def __init__(self, lang, answers, block=None):
+        self.lang = lang
+        self.snapshot = dict(answers)
+        self.block = block
+        self.cancelled = threading.Event()
+        self.future = None
+        self.latest = None
+        self.updates = 0
+
+    def matches(self, lang, answers):
+        """Whether the call still fits: same language and every snapshot answer unchanged."""
+        return lang == self.lang and all(answers.get(q_id) == a for q_id, a in self.snapshot.items())
+
+    def publish(self, value):
+        """Report progress from the worker; wait() relays the latest value."""
+        self.latest = value
+        self.updates += 1
+
+    def cancel(self):
+        """Stop the call if it has not finished; its result is never used."""
+        self.cancelled.set()
+        self.future.cancel()
+
+    def done(self):
+        return self.future.done()
+
+    def wait(self, on_update=None, poll_seconds=0.15):
+        """Block until the call finishes and return its result.
+
+        on_update(value) is called from this thread whenever the worker
+        published something new.
+        """
+        seen = 0
+        while True:
+            try:
+                return self.future.result(timeout=poll_seconds)
+            except FutureTimeout:
+                pass
+            except CancelledError:
+                return None
+            if on_update and self.updates != seen and self.latest is not None:
+                seen = self.updates
+                on_update(self.latest)
+
+
+class Prefetcher:
+    """Background threads for speculative calls, shared by all sessions."""
+
+    def __init__(self, workers=4):
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="prefetch")
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def start(self, lang, answers, func, block=None):
+        """Run func(speculation) in the background and return the speculation.
+
+        block is the prompt context the call is built from. func should give
+        up once speculation.cancelled is set.
+        """
+        spec = Speculation(lang, answers, block)
+        spec.future = self._executor.submit(func, spec)
+        self._count("started")
+        return spec
+
+    def discard(self, spec):
+        """Cancel a speculation whose answers changed."""
+        spec.cancel()
+        self._count("cancelled")
+
+    def claim(self, spec, lang, answers, block=None):
+        """Return spec if its result may be used for these answers and this block, else cancel it and return None."""
+        if spec.matches(lang, answers) and (block is None or spec.block == block):
+            self._count("hits" if spec.done() else "joined")
+            return spec
+        if spec.matches(lang, answers):
+            # Answers were added after the snapshot: its prompt lacked them
+            self._count("stale")
+        self.discard(spec)
+        return None
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
@@ -0,0 +1,202 @@
+"""Prompt builders for the follow-up questions and the deep analysis.
+
+Every Gemini call for a profile starts with the same profile block (answers
+and scores), so it can be uploaded once as cached context or, failing that,
+sent as an identical prefix that the provider can cache implicitly.
+"""
+
+import re
+
+INTENSITY_LABELS = {1: "slightly", 2: "clearly", 3: "strongly"}
+
+
+def build_answer_summary(questions, answers):
+    """One line per answered question: texts, category and the chosen option."""
+    lines = []
+    for q in questions:
+        a = answers.get(q["id"])
+        c = a.get("choice") if a else None
+        if not c:
+            continue
+        i_label = INTENSITY_LABELS.get(a.get("intensity", 2), "strongly")
+        scenario = f'Scenario: {q["scenario"]} | ' if q.get("scenario") else ""
+        context = f'Context: {q["context"]} | ' if q.get("context") else ""
+        lines.append(f'Q{q["id"]} [{q["category"]}]: {scenario}{context}A: "{q["questionA"]}" | B: "{q["questionB"]}" | CHOSE: {c} ({i_label})')
+    return "\n".join(lines)
+
+
+def build_choice_summary(questions, answers):
+    """Shorter answer lines: only the chosen option and its strength, for tight token budgets."""
+    lines = []
+    for q in questions:
+        a = answers.get(q["id"])
+        c = a.get("choice") if a else None
+        if not c:
+            continue
+        i_label = INTENSITY_LABELS.get(a.get("intensity", 2), "strongly")
+        lines.append(f'Q{q["id"]} [{q["category"]}]: "{q["question" + c]}" ({i_label})')
+    return "\n".join(lines)
+
+
+def build_trait_summary(analysis):
+    """Trait scores, stress patterns and rules as compact prompt lines."""
+    tr = analysis["traits"]
+    return f"""Big Five (1-10): Openness={tr["openness"]}, Conscientiousness={tr["conscientiousness"]}, Extraversion={tr["extraversion"]}, Agreeableness={tr["agreeableness"]}, Stability={tr["stability"]}
+Action Modes (1-10): ResearchDrive={tr["factFinder"]}, SystemsDrive={tr["followThru"]}, LaunchDrive={tr["quickStart"]}, BuildDrive={tr["implementor"]}
+Drivers (1-10): Autonomy={tr["autonomy"]}, Mastery={tr["mastery"]}, Power={tr["power"]}, Affiliation={tr["affiliation"]}
+Stress Patterns: {', '.join(analysis['stressPatterns']) or 'None'}
+Rules: {' | '.join(analysis['operationalRules']) or 'None'}"""
+
+
+def build_profile_block(questions, answers, analysis):
+    """The shared per-profile context: all answers plus computed scores."""
+    return f"""ASSESSMENT DATA ({len(questions)} questions including stress scenarios and self-designed rules):
+{build_answer_summary(questions, answers)}
+
+SCORES:
+{build_trait_summary(analysis)}"""
+
+
+def build_compact_profile_block(questions, answers, analysis):
+    """A shorter profile context (chosen options only) used when the token budget is nearly spent."""
+    return f"""ASSESSMENT DATA ({len(questions)} questions, chosen option per question):
+{build_choice_summary(questions, answers)}
+
+SCORES:
+{build_trait_summary(analysis)}"""
+
+
+def build_followup_block(followup_questions, followup_answers):
+    """Build follow-up answer data string for the deep analysis prompt."""
+    if not followup_questions or not followup_answers:
+        return ""
+
+    lines = []
+    for i, q in enumerate(followup_questions):
+        a = followup_answers.get(i)
+        if not a or not a.get("choice"):
+            continue
+        chosen = q["optionA"] if a["choice"] == "A" else q["optionB"] if a["choice"] == "B" else q["optionC"]
+        user_text = f' | USER ADDED: "{a["text"]}"' if a.get("text") else ""
+        lines.append(f'TENSION: {q["tension"]}\nQUESTION: {q["question"]}\nCHOSE {a["choice"]}: "{chosen}"{user_text}')
+
+    if not lines:
+        return ""
+    return "\n\nPERSONALIZED FOLLOW-UP ANSWERS (these reveal how the person experiences their core tensions — reference these heavily in your analysis):\n" + "\n\n".join(lines)
+
+
+def analyst_instructions(lang_name):
+    """Shared style and naming rules for every deep-analysis chapter."""
+    return f"""You are a world-class Psychometric Analyst. Write in {lang_name}. Be personal, reference specific answers from the assessment data above. No filler, no generic advice. Direct style like a trusted advisor. HARD LIMIT: Stay under 300 words. Complete every sentence.
+
+IMPORTANT: Never use trademarked assessment names. Never write "Kolbe", "Hogan", "HDS", "NEO-PI-R", "MBTI", "Myers-Briggs", "DISC", "StrengthsFinder", "CliftonStrengths", or "Enneagram" as product names. Use our own terms: "Research Drive", "Systems Drive", "Launch Drive", "Build Drive" for action modes. Say "Big Five" or "Five Factor" for temperament (these are academic, not trademarked). Say "action modes" not "Kolbe modes". Say "stress derailers" not "HDS scales"."""
+
+
+CHAPTER_PROMPTS = [
+    """Write ONLY (max 300 words):
+
+# Deep Psychometric Analysis
+
+## 1. Executive Summary
+2 paragraphs: who this person is, their central paradox, what makes their combination unique. Bold and specific.""",
+
+    """Write ONLY (max 300 words). No title/summary.
+
+## 2. Temperament: Openness & Conscientiousness
+
+1 focused paragraph per trait: score meaning, how they interact, "close but not you". No fluff.""",
+
+    """Write ONLY (max 300 words). No prior sections.
+
+## (continued) Extraversion, Agreeableness & Stability
+
+1 focused paragraph per trait: score meaning, interactions, "close but not you".""",
+
+    """Write ONLY (max 300 words). No prior sections.
+
+## 3. Operating System: Action Modes
+
+1 paragraph covering all four action mode dimensions (Research Drive, Systems Drive, Launch Drive, Build Drive): their instinctive approach, what happens when forced against it, how it connects to temperament.""",
+
+    """Write ONLY (max 300 words). No prior sections.
+
+## 4. The Drivers: What Fuels and What Drains
+
+Dominant driver, key tension between drivers, what happens when starved. Concrete, no theory.""",
+
+    """Write ONLY (max 300 words). No prior sections.
+
+## 5. The Dark Side: Derailers Under Pressure
+
+Name the pattern, trigger sequence, how it manifests, the cost, one early warning sign.""",
+
+    """Write ONLY (max 300 words). No prior sections.
+
+## 6. Core Paradoxes
+
+2 paradoxes max. Name each, explain friction, show superpower vs liability. Brief.""",
+
+    """Write ONLY (max 300 words). No prior sections.
+
+## 7. Environment Fit
+
+Ideal org/role, 3 red flags, boss type, team dynamics. Bullet-style density, no padding.""",
+
+    """Write ONLY (max 300 words). No prior sections.
+
+## 8. Operational Rules
+
+3 rules. Each: bold name, one sentence why, one sentence implementation, circuit breaker phrase. Tight.""",
+
+    """Write ONLY (max 250 words). No prior sections.
+
+## 9. Who You Are at Your Best
+
+1-2 paragraphs: peak performance portrait. What it looks like when all systems align. End strong. FINISH the final sentence completely.""",
+]
+
+
+# Chapter indices in the order they are kept when the token budget only covers some
+CHAPTER_PRIORITY = (0, 5, 8, 7, 3, 4, 6, 1, 2, 9)
+
+
+def build_chapter_prompts(lang_name, followup_block=""):
+    """Per-chapter instructions that follow the shared profile block."""
+    head = analyst_instructions(lang_name) + followup_block
+    return [f"{head}\n\n{chapter}" for chapter in CHAPTER_PROMPTS]
+
+
+def chapter_title(index, text=""):
+    """Title of a chapter: the first "## " heading of its text, else the one in its prompt."""
+    for source in (text, CHAPTER_PROMPTS[index]):
+        match = re.search(r"^## +(?:\d+\.\s*)?(.+)$", source or "", re.MULTILINE)
+        if match:
+            return match.group(1).strip()
+    return ""
+
+
+def build_followup_prompt(lang_name):
+    """Instructions for the 5 follow-up questions that follow the profile block."""
+    return f"""You are a world-class psychometric analyst. Based on the COMPLETE assessment data above, identify the 5 most interesting TENSIONS or PARADOXES in this person's profile. For each tension, generate a personalized follow-up question with exactly 3 options (A, B, C).
+
+WRITE IN {lang_name}.
+
+RULES:
+- Generate EXACTLY 5 questions in this order:
+  1. TRAIT PARADOX: Two personality traits that create unusual tension
+  2. TRAIT PARADOX: A second trait combination that seems contradictory or rare
+  3. STRESS PATTERN: How a specific stress behavior contradicts their baseline personality
+  4. STRESS PATTERN: A second stress reaction that reveals something unexpected
+  5. RULE CONTRADICTION: A mismatch between the rules they chose (Q36-Q43) and their actual behavior in earlier answers
+- Each question should reference the SPECIFIC tension you found
+- Options A, B, C should represent genuinely different ways the person might experience this tension
+- Questions should feel like a coach who just noticed something about you
+- Be concrete: reference their actual scores and answer patterns
+- Never use trademarked assessment names (no Kolbe, Hogan, MBTI, etc.)
+
+Respond with ONLY a JSON array, no markdown fences, no explanation. Format:
+[
+  {{"tension": "Short label", "question": "The question text", "optionA": "First option", "optionB": "Second option", "optionC": "Third option"}}
+]
+
+Return exactly 5 questions."""
@@ -0,0 +1,86 @@
+"""Compiled, immutable question bank.
+
+The language-independent structure (question ids, phases and their
+boundaries) is defined once here; the scoring loadings come from
+scoring_spec. UI strings and question
+texts live in per-language packs under i18n/ that are imported only when a
+language is first used. load_bank() merges both into read-only records with
+an O(1) id index and precomputed phase offsets.
+"""
+
+import importlib
+from types import MappingProxyType
+
+from scoring_spec import SPEC, translation_keys
+
+LANGUAGES = ("en", "de")
+
+# Bump when a question changes meaning; saved answer codes from other versions are rejected
+BANK_VERSION = 1
+
+# (phase key, first question id, last question id)
+PHASES = (
+    ("discovery", 1, 20),
+    ("stressTesting", 21, 35),
+    ("solutionDesign", 36, 43),
+)
+QUESTION_IDS = tuple(q_id for _, first, last in PHASES for q_id in range(first, last + 1))
+
+_LOADINGS_BY_ID = {
+    q_id: tuple((trait, a_dir, b_dir, rule) for qid, trait, a_dir, b_dir, rule in SPEC["loadings"] if qid == q_id)
+    for q_id in QUESTION_IDS
+}
+
+
+def load_text_pack(lang):
+    """Import the i18n pack for lang (cached by the import system after the first call)."""
+    if lang not in LANGUAGES:
+        raise KeyError(f"unknown language {lang!r}")
+    return importlib.import_module(f"i18n.{lang}")
+
+
+def get_translations(lang):
+    """Read-only UI strings for lang."""
+    return MappingProxyType(load_text_pack(lang).TRANSLATIONS)
+
+
+class QuestionBank:
+    """All questions of one language, in order, with lookup tables for the UI."""
+
+    def __init__(self, lang):
+        pack = load_text_pack(lang)
+        missing = set(QUESTION_IDS) - set(pack.QUESTIONS)
+        extra = set(pack.QUESTIONS) - set(QUESTION_IDS)
+        if missing or extra:
+            raise ValueError(f"text pack {lang!r} does not match the question structure "
+                             f"(missing {sorted(missing)}, unexpected {sorted(extra)})")
+        missing_keys = translation_keys() - set(pack.TRANSLATIONS)
+        if missing_keys:
+            raise ValueError(f"text pack {lang!r} lacks scoring texts {sorted(missing_keys)}")
+
+        questions = []
+        phase_offsets = {}
+        phase_by_index = []
+        for phase, first, last in PHASES:
+            phase_offsets[phase] = (len(questions), len(questions) + last - first + 1)
+            for q_id in range(first, last + 1):
+                record = {"id": q_id, "phase": phase, **pack.QUESTIONS[q_id], "loadings": _LOADINGS_BY_ID[q_id]}
+                questions.append(MappingProxyType(record))
+                phase_by_index.append(phase)
+
+        self.lang = lang
+        self.t = get_translations(lang)
+        self.questions = tuple(questions)
+        self.by_id = MappingProxyType({q["id"]: q for q in self.questions})
+        self.index_by_id = MappingProxyType({q["id"]: i for i, q in enumerate(self.questions)})
+        self.phase_offsets = MappingProxyType(phase_offsets)
+        self.phase_by_index = tuple(phase_by_index)
+        self.total = len(self.questions)
+
+    def __len__(self):
+        return self.total
+
+
+def load_bank(lang):
+    """Compile the question bank for lang."""
+    return QuestionBank(lang)
@@ -0,0 +1,220 @@
+"""Process-wide rate limiting for Gemini calls.
+
+Every API key has two token buckets, requests per minute and tokens per
+minute. Calls from all sessions wait in one queue that admits sessions
+round-robin, so a session fanning out ten chapters cannot starve another
+one waiting for a single response. Each admitted call gets the key with the
+most headroom. When the estimated wait is longer than max_wait, a call is
+rejected with RateLimitExceeded instead of queued (backpressure).
+try_acquire() admits an optional call only if that needs no waiting.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when a call cannot be admitted within the allowed wait."""
+
+
+class TokenBucket:
+    """A bucket of per_minute units that refills continuously."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.rate = self.capacity / 60
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount units are available."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        """Charge (or refund, if negative) units after the fact; the level may go into debt."""
+        self.level = max(-self.capacity, min(self.capacity, self.level - amount))
+
+
+class KeyQuota:
+    """The request and token buckets of one API key."""
+
+    def __init__(self, api_key, rpm, tpm):
+        self.api_key = api_key
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.admitted = 0
+
+    def wait_time(self, tokens, now):
+        return max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+
+
+class Lease:
+    """One admitted call: the key to use and the tokens charged for it."""
+
+    def __init__(self, quota, tokens, waited):
+        self.quota = quota
+        self.api_key = quota.api_key
+        self.tokens = tokens
+        self.waited = waited
+
+
+class RateLimiter:
+    """Shared RPM/TPM limits over one or more API keys with fair admission."""
+
+    def __init__(self, api_keys, rpm=60, tpm=1_000_000, max_wait=120, poll_seconds=0.25):
+        if not api_keys:
+            raise ValueError("at least one API key is required")
+        self.quotas = [KeyQuota(key, rpm, tpm) for key in api_keys]
+        self.max_wait = max_wait
+        self.poll_seconds = poll_seconds
+        self.admitted = 0
+        self.rejected = 0
+        self.waited_seconds = 0.0
+        self._cond = threading.Condition()
+        # session id -> its waiting tickets; admitted sessions rotate to the back
+        self._queues = OrderedDict()
+
+    @property
+    def key_count(self):
+        return len(self.quotas)
+
+    def _position(self, session_id, ticket):
+        # Admission is round-robin, so the k-th ticket of a session goes after
+        # the first k tickets of every session and after the k-th tickets of
+        # the sessions ahead of it in the rotation.
+        k = self._queues[session_id].index(ticket)
+        position = 0
+        for other, tickets in self._queues.items():
+            if other == session_id:
+                position += k
+                break
+            position += min(len(tickets), k + 1)
+        for other, tickets in reversed(self._queues.items()):
+            if other == session_id:
+                break
+            position += min(len(tickets), k)
+        return position
+
+    def _eta(self, position, tokens, now):
+        # Time for the head to be admitted plus one admission slot per call ahead
+        head_wait = min(quota.wait_time(tokens, now) for quota in self.quotas)
+        per_second = sum(quota.requests.rate for quota in self.quotas)
+        return head_wait + position / per_second
+
+    def _best_quota(self, tokens, now):
+        # Key with the shortest wait; on a tie the one with the most requests left
+        return min(self.quotas, key=lambda q: (q.wait_time(tokens, now), -q.requests.level))
+
+    def position(self, session_id):
+        """(calls ahead, estimated seconds) for the session's next waiting call, or None."""
+        with self._cond:
+            tickets = self._queues.get(session_id)
+            if not tickets:
+                return None
+            position = self._position(session_id, tickets[0])
+            return position, self._eta(position, 0, time.monotonic())
+
+    def acquire(self, session_id, tokens, on_wait=None):
+        """Wait for a turn and quota, then return a Lease.
+
+        on_wait(position, seconds) is called from this thread while waiting.
+        Raises RateLimitExceeded when the wait would exceed max_wait.
+        """
+        ticket = object()
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        with self._cond:
+            self._queues.setdefault(session_id, deque()).append(ticket)
+            if self._eta(self._position(session_id, ticket), tokens, started) > self.max_wait:
+                self._remove(session_id, ticket)
+                self.rejected += 1
+                raise RateLimitExceeded("Gemini quota exhausted; too many requests are already waiting")
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    tickets = self._queues[session_id]
+                    at_head = next(iter(self._queues)) == session_id and tickets[0] is ticket
+                    if at_head:
+                        quota = self._best_quota(tokens, now)
+                        wait = quota.wait_time(tokens, now)
+                        if wait <= 0:
+                            quota.requests.take(1, now)
+                            quota.tokens.take(tokens, now)
+                            quota.admitted += 1
+                            self._remove(session_id, ticket)
+                            self.admitted += 1
+                            self.waited_seconds += now - started
+                            self._cond.notify_all()
+                            return Lease(quota, tokens, now - started)
+                    else:
+                        wait = self.poll_seconds
+                    if now + min(wait, self.poll_seconds) > deadline:
+                        self.rejected += 1
+                        raise RateLimitExceeded(f"Gemini quota: no capacity within {self.max_wait:.0f} s")
+                    position = self._position(session_id, ticket)
+                    eta = self._eta(position, tokens, now)
+                    self._cond.wait(min(wait, self.poll_seconds))
+                if on_wait:
+                    on_wait(position, eta)
+        finally:
+            with self._cond:
+                if ticket in self._queues.get(session_id, ()):
+                    self._remove(session_id, ticket)
+                    self._cond.notify_all()
+
+    def try_acquire(self, tokens):
+        """A Lease if a key has capacity right now and no call is waiting, else None (never blocks).
+
+        For optional extra calls such as hedges, which must not queue or jump the queue.
+        """
+        with self._cond:
+            if self._queues:
+                return None
+            now = time.monotonic()
+            quota = self._best_quota(tokens, now)
+            if quota.wait_time(tokens, now) > 0:
+                return None
+            quota.requests.take(1, now)
+            quota.tokens.take(tokens, now)
+            quota.admitted += 1
+            self.admitted += 1
+            return Lease(quota, tokens, 0.0)
+
+    def _remove(self, session_id, ticket):
+        tickets = self._queues[session_id]
+        was_head = tickets[0] is ticket
+        tickets.remove(ticket)
+        if not tickets:
+            del self._queues[session_id]
+        elif was_head:
+            self._queues.move_to_end(session_id)
+
+    def settle(self, lease, used_tokens):
+        """Correct the token bucket once the real usage of a call is known."""
+        if used_tokens:
+            with self._cond:
+                lease.quota.tokens.adjust(used_tokens - lease.tokens)
+
+    def stats(self):
+        """Admission counters and the current queue length."""
+        with self._cond:
+            waiting = sum(len(tickets) for tickets in self._queues.values())
+        return {
+            "keys": len(self.quotas),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "waiting": waiting,
+            "avg_wait_seconds": self.waited_seconds / self.admitted if self.admitted else 0.0,
+        }
@@ -0,0 +1,235 @@
+"""Timeouts, retries with backoff and hedged requests for model calls.
+
+ResiliencePolicy.call() runs one logical call as one or more attempts in
+worker threads. Admission (e.g. waiting for rate-limit quota) happens in
+the calling thread before an attempt is submitted, so the workers only
+ever run model calls and an attempt's timeout covers just that call.
+Every attempt has a timeout. Retryable failures (429, 5xx,
+timeouts) are retried with exponential backoff and full jitter. With hedging
+on, an attempt that is still running past the observed p95 latency gets a
+duplicate, and whichever finishes first wins. Progress an attempt publishes
+is relayed to the calling thread, so UI callbacks never run off-thread.
+"""
+
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class CallTimeout(TimeoutError):
+    """An attempt ran past its timeout."""
+
+
+class CallAbandoned(RuntimeError):
+    """An attempt was stopped because another one already succeeded or the caller cancelled it."""
+
+
+def is_retryable(exc):
+    """Whether a failed attempt is worth repeating."""
+    if isinstance(exc, (CallTimeout, ConnectionError)):
+        return True
+    # google.api_core errors carry the HTTP status as an int
+    code = getattr(exc, "code", None)
+    return isinstance(code, int) and code in RETRYABLE_STATUS
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty sequence."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LatencyTracker:
+    """Latencies of the most recent calls."""
+
+    def __init__(self, window=500):
+        self._values = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._values.append(seconds)
+
+    def quantile(self, q, min_samples=1):
+        """The q-quantile, or None with fewer than min_samples observations."""
+        with self._lock:
+            if len(self._values) < max(1, min_samples):
+                return None
+            return percentile(self._values, q)
+
+    def summary(self):
+        with self._lock:
+            values = list(self._values)
+        if not values:
+            return {"count": 0}
+        return {"count": len(values), "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95), "p99": percentile(values, 0.99)}
+
+
+class Attempt:
+    """Handle passed to one attempt: timing, cancellation and progress publishing."""
+
+    def __init__(self, timeout, hedge=False, on_publish=None, lease=None):
+        self.timeout = timeout
+        self.hedge = hedge
+        self.lease = lease
+        self._on_publish = on_publish
+        self.started = None
+        self.cancelled = threading.Event()
+        self.latest = None
+        self.updates = 0
+
+    def start(self):
+        """Start the clock when the attempt begins its call."""
+        self.started = time.monotonic()
+
+    def remaining(self):
+        """Seconds left before the attempt times out (None without a timeout)."""
+        if not self.timeout:
+            return None
+        if self.started is None:
+            return self.timeout
+        return max(0.0, self.started + self.timeout - time.monotonic())
+
+    def publish(self, value):
+        """Report progress; the calling thread relays the leading attempt's latest value."""
+        self.latest = value
+        self.updates += 1
+        if self._on_publish:
+            self._on_publish(value)
+
+
+class ResiliencePolicy:
+    """Timeout, retry and hedging settings plus counters, shared by all calls."""
+
+    def __init__(self, timeout=120, max_attempts=3, base_delay=1.0, max_delay=20.0,
+                 hedge=False, hedge_quantile=0.95, hedge_min_samples=20, poll_seconds=0.1):
+        self.timeout = timeout
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.poll_seconds = poll_seconds
+        self.latency = LatencyTracker()
+        self.reports = LatencyTracker()
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="llm-attempt")
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def backoff(self, retry):
+        """Delay before retry number retry (1-based): exponential with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    def hedge_after(self):
+        """Seconds after which a running attempt gets a duplicate, or None."""
+        if not self.hedge:
+            return None
+        return self.latency.quantile(self.hedge_quantile, self.hedge_min_samples)
+
+    def call(self, attempt, on_update=None, admit=None):
+        """Run attempt(handle) until one attempt succeeds and return its result.
+
+        on_update(value) is called from this thread with the latest value the
+        leading attempt published. admit(hedge) is called in this thread
+        before every attempt and its result handed to the attempt as
+        handle.lease: for the first attempt and retries it may block (or
+        raise), for a hedge it should return None at once if there is no
+        capacity, and the hedge is then put off. Raises the last error once
+        retries are used up or the error is not retryable.
+        """
+        retry = 0
+        while True:
+            try:
+                return self._run_round(attempt, on_update, admit)
+            except CallAbandoned:
+                self._count("abandoned")
+                raise
+            except Exception as e:
+                if isinstance(e, CallTimeout):
+                    self._count("timeouts")
+                retry += 1
+                if retry >= self.max_attempts or not is_retryable(e):
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(self.backoff(retry))
+
+    def _run_round(self, attempt, on_update, admit):
+        # One primary attempt plus at most one hedge; the first success wins
+        running = {}
+        self._submit(running, attempt, hedge=False, lease=admit(False) if admit else None)
+        primary = next(iter(running.values()))
+        relayed = None
+        error = None
+        hedge_after = self.hedge_after()
+        try:
+            while running:
+                done, _ = wait(running, timeout=self.poll_seconds, return_when=FIRST_COMPLETED)
+                for future in done:
+                    handle = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        error = e
+                        continue
+                    if handle.started is not None:
+                        self.latency.add(time.monotonic() - handle.started)
+                    if handle.hedge:
+                        self._count("hedge_wins")
+                    self._count("successes")
+                    if on_update and handle.latest is not None and handle.latest is not relayed:
+                        on_update(handle.latest)
+                    return result
+                if not running:
+                    break
+
+                leader = max(running.values(), key=lambda h: h.updates)
+                if on_update and leader.latest is not None and leader.latest is not relayed:
+                    relayed = leader.latest
+                    on_update(relayed)
+
+                now = time.monotonic()
+                if (hedge_after is not None and len(running) == 1 and primary in running.values()
+                        and primary.started is not None and now - primary.started > hedge_after):
+                    lease = admit(True) if admit else None
+                    if admit is None or lease is not None:
+                        self._count("hedges")
+                        self._submit(running, attempt, hedge=True, lease=lease)
+                # Attempts enforce their own timeout; this catches calls that ignore it
+                for handle in running.values():
+                    if handle.started is not None and self.timeout and now - handle.started > self.timeout + 5:
+                        raise CallTimeout(f"no response within {self.timeout:.0f} s")
+            raise error
+        finally:
+            for handle in running.values():
+                handle.cancelled.set()
+
+    def _submit(self, running, attempt, hedge, lease=None):
+        handle = Attempt(self.timeout, hedge=hedge, lease=lease)
+        self._count("attempts")
+        running[self._executor.submit(attempt, handle)] = handle
+
+    def record_report(self, seconds):
+        """Record the wall time of one complete report, for its tail percentiles."""
+        self.reports.add(seconds)
+
+    def stats(self):
+        """Counters plus call and report latency percentiles."""
+        with self._lock:
+            counters = dict(self.counters)
+        return {**counters, "calls": self.latency.summary(), "reports": self.reports.summary()}
+
+
+def run_direct(attempt, on_update=None, admit=None):
+    """Run attempt(handle) once in this thread, without timeouts, retries or hedging."""
+    return attempt(Attempt(None, on_publish=on_update, lease=admit(False) if admit else None))
@@ -0,0 +1,108 @@
+"""Persistent, content-addressed cache for LLM responses.
+
+Entries are keyed by a hash of (model, generation config, full prompt) and
+stored in a local SQLite file, so identical prompts from any session are
+served from disk instead of the API. Entries expire after a TTL and the
+least recently used ones are evicted once the size cap is exceeded.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ResponseCache:
+    """Disk-backed LLM response cache with TTL, LRU eviction and a size cap."""
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_bytes=50 * 1024 * 1024):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, text TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(model, generation_config, prompt):
+        """Content address of one request."""
+        payload = json.dumps([model, generation_config or {}, prompt], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached text for key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT text, created, size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            text, created, size = row
+            if now - created > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bytes -= size
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return text
+
+    def put(self, key, text):
+        """Store text under key, then evict expired and least recently used entries."""
+        now = time.time()
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, text, created, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                (key, text, now, now, size),
+            )
+            self._bytes += size - (row[0] if row else 0)
+            self._evict(now)
+
+    def delete(self, key):
+        """Drop one entry, e.g. a response that turned out to be unusable."""
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bytes -= row[0]
+
+    def _evict(self, now):
+        if self._bytes <= self.max_bytes:
+            return
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while self._bytes > self.max_bytes:
+            rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed LIMIT 32").fetchall()
+            if not rows:
+                break
+            # Only as many of the oldest as needed to get under the cap
+            victims = []
+            for key, size in rows:
+                if self._bytes <= self.max_bytes:
+                    break
+                victims.append((key,))
+                self._bytes -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def stats(self):
+        """Entry count, stored bytes and hit/miss counters for this process."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"entries": entries, "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,295 @@
+"""Scoring: the compiled scoring spec, table-walk scoring and batch scoring.
+
+The rules live in scoring_spec.SPEC. At import the spec is checked against
+the question bank (question ids, bank version, traits, choices, weights)
+and compiled into flat lookup tables indexed by question and answer state
+(0 = unanswered, 1-3 = A with intensity 1-3, 4-6 = B with intensity 1-3):
+the trait deltas of every state, the stress patterns and rules it
+triggers, the contrast texts per choice and the environment-fit texts per
+score. Scoring one profile is then a walk over 43 table rows with no rule
+logic, and score_batch does the same for many rows at once in NumPy.
+"""
+
+import numpy as np
+
+from question_bank import BANK_VERSION, QUESTION_IDS
+from scoring_spec import SPEC
+
+PRIMARY = "primary"
+SECONDARY = "secondary"
+
+# Choice codes used by the batch arrays
+UNANSWERED = 0
+CHOICE_A = 1
+CHOICE_B = 2
+CHOICE_CODES = {"A": CHOICE_A, "B": CHOICE_B}
+
+# Answer states: unanswered, A with intensity 1-3, B with intensity 1-3
+STATES = 7
+DEFAULT_INTENSITY = SPEC["scale"]["default_intensity"]
+_CHOICE_OFFSET = {"A": 0, "B": 3}
+
+
+class ScoringSpecError(ValueError):
+    """The scoring spec does not fit the question bank or is malformed."""
+
+
+def answer_state(choice, intensity=DEFAULT_INTENSITY):
+    """The 0-6 state of one answer."""
+    if choice not in _CHOICE_OFFSET:
+        return UNANSWERED
+    if intensity not in (1, 2, 3):
+        raise ValueError(f"invalid intensity {intensity!r}")
+    return _CHOICE_OFFSET[choice] + intensity
+
+
+def validate_spec(spec, question_ids=QUESTION_IDS, bank_version=BANK_VERSION):
+    """Raise ScoringSpecError if spec refers to unknown questions, traits, choices or weights."""
+    problems = []
+    if spec["bank_version"] != bank_version:
+        problems.append(f"written for question bank version {spec['bank_version']}, the bank is {bank_version}")
+    ids = set(question_ids)
+    traits = set(spec["traits"])
+    scale = spec["scale"]
+    if not scale["min"] <= scale["baseline"] <= scale["max"]:
+        problems.append(f"baseline {scale['baseline']} outside {scale['min']}-{scale['max']}")
+    for kind, weights in spec["weights"].items():
+        if len(weights) != 3:
+            problems.append(f"weights {kind!r} need one value per intensity 1-3")
+    for q_id, trait, _, _, kind in spec["loadings"]:
+        if q_id not in ids:
+            problems.append(f"loading on unknown question {q_id}")
+        if trait not in traits:
+            problems.append(f"loading of question {q_id} on unknown trait {trait!r}")
+        if kind not in spec["weights"]:
+            problems.append(f"loading of question {q_id} has unknown kind {kind!r}")
+    for section in ("stress_patterns", "operational_rules"):
+        for q_id, choice, key in spec[section]:
+            if q_id not in ids:
+                problems.append(f"{section} {key!r} refers to unknown question {q_id}")
+            if choice not in _CHOICE_OFFSET:
+                problems.append(f"{section} {key!r} has invalid choice {choice!r}")
+    for q_id, label, _, _ in spec["contrasts"]:
+        if q_id not in ids:
+            problems.append(f"contrast {label!r} refers to unknown question {q_id}")
+    for trait, _, _ in spec["environment_fit"]["rows"]:
+        if trait not in traits:
+            problems.append(f"environment fit refers to unknown trait {trait!r}")
+    if problems:
+        raise ScoringSpecError("invalid scoring spec: " + "; ".join(problems))
+
+
+class CompiledScoring:
+    """Flat lookup tables compiled from a scoring spec."""
+
+    def __init__(self, spec, question_ids=QUESTION_IDS, bank_version=BANK_VERSION):
+        validate_spec(spec, question_ids, bank_version)
+        self.version = spec["version"]
+        self.question_ids = tuple(question_ids)
+        self.traits = tuple(spec["traits"])
+        scale = spec["scale"]
+        self.baseline, self.min_score, self.max_score = scale["baseline"], scale["min"], scale["max"]
+        index = {q_id: i for i, q_id in enumerate(self.question_ids)}
+        trait_index = {trait: i for i, trait in enumerate(self.traits)}
+
+        # deltas: (question index, ((trait index, delta), ...) per state) for questions with loadings
+        deltas = [[{} for _ in range(STATES)] for _ in self.question_ids]
+        for q_id, trait, a_dir, b_dir, kind in spec["loadings"]:
+            for intensity, weight in enumerate(spec["weights"][kind], start=1):
+                for choice, direction in (("A", a_dir), ("B", b_dir)):
+                    if direction:
+                        row = deltas[index[q_id]][answer_state(choice, intensity)]
+                        row[trait_index[trait]] = row.get(trait_index[trait], 0) + direction * weight
+        self.deltas = tuple((i, tuple(tuple(row.items()) for row in states))
+                            for i, states in enumerate(deltas) if any(states))
+
+        # Every reachable raw score maps to its clamped score
+        low = high = 0
+        for _, states in self.deltas:
+            per_trait = [[0] for _ in self.traits]
+            for row in states:
+                for t, delta in row:
+                    per_trait[t].append(delta)
+            low += min(min(values) for values in per_trait)
+            high += max(max(values) for values in per_trait)
+        self.raw_min = self.baseline + low
+        self.clamp = tuple(max(self.min_score, min(self.max_score, raw))
+                           for raw in range(self.raw_min, self.baseline + high + 1))
+
+        self.stress = self._match_table(spec["stress_patterns"], index)
+        self.rules = self._match_table(spec["operational_rules"], index)
+        self.contrasts = tuple(
+            (q_id, label, {"A": if_a}, otherwise) for q_id, label, if_a, otherwise in spec["contrasts"]
+        )
+        fit = spec["environment_fit"]
+        scores = range(self.min_score, self.max_score + 1)
+        self.environment = tuple(
+            (trait, tuple(high_keys if score >= fit["threshold"] else low_keys for score in scores))
+            for trait, high_keys, low_keys in fit["rows"]
+        )
+
+    def _match_table(self, entries, index):
+        # (question index, translation keys per state), in question order
+        table = {}
+        for q_id, choice, key in entries:
+            states = table.setdefault(index[q_id], [()] * STATES)
+            for intensity in (1, 2, 3):
+                states[answer_state(choice, intensity)] += (key,)
+        return tuple((i, tuple(states)) for i, states in sorted(table.items()))
+
+    def score(self, states):
+        """Trait scores of one row of answer states."""
+        raw = [self.baseline] * len(self.traits)
+        for i, rows in self.deltas:
+            for t, delta in rows[states[i]]:
+                raw[t] += delta
+        clamp, offset = self.clamp, self.raw_min
+        return {trait: clamp[value - offset] for trait, value in zip(self.traits, raw)}
+
+    def matches(self, table, states):
+        """Translation keys a match table (stress or rules) yields for a row of answer states."""
+        return [key for i, keys in table for key in keys[states[i]]]
+
+    def contrast_keys(self, choices):
+        """(label, close but not, clearly not) keys; choices maps question ids (int or str) to "A"/"B"."""
+        rows = []
+        for q_id, label, by_choice, otherwise in self.contrasts:
+            close, clearly_not = by_choice.get(choices.get(q_id) or choices.get(str(q_id)), otherwise)
+            rows.append((label, close, clearly_not))
+        return rows
+
+    def environment_keys(self, traits):
+        """(thrives in, fails in) keys per environment-fit row for a trait dict."""
+        return [by_score[traits[trait] - self.min_score] for trait, by_score in self.environment]
+
+
+SCORING = CompiledScoring(SPEC)
+
+# Flat views of the spec, for callers and the batch path
+TRAITS = SCORING.traits
+TRAIT_INDEX = {trait: i for i, trait in enumerate(TRAITS)}
+QUESTION_COUNT = len(QUESTION_IDS)
+BASELINE = SCORING.baseline
+MIN_SCORE = SCORING.min_score
+MAX_SCORE = SCORING.max_score
+LOADINGS = SPEC["loadings"]
+STRESS_PATTERNS = SPEC["stress_patterns"]
+OPERATIONAL_RULES = SPEC["operational_rules"]
+CONTRAST_QUESTIONS = tuple(q_id for q_id, _, _, _ in SPEC["contrasts"])
+LOADING_KINDS = tuple(SPEC["weights"])
+# Weight of intensity 0-3 per loading kind (0 = unanswered)
+WEIGHT_TABLES = np.array([(0, *SPEC["weights"][kind]) for kind in LOADING_KINDS], dtype=np.float32)
+
+
+_STATE_BY_ANSWER = {(choice, w): answer_state(choice, w) for choice in _CHOICE_OFFSET for w in (1, 2, 3)}
+
+
+def answer_states(answers):
+    """The answer states of a PackedAnswers value or an answer dict, in question order."""
+    states = getattr(answers, "states", None)
+    if states is not None:
+        return states
+    row = bytearray(QUESTION_COUNT)
+    for i, q_id in enumerate(QUESTION_IDS):
+        a = answers.get(q_id)
+        if a:
+            answer = (a.get("choice"), a.get("intensity", DEFAULT_INTENSITY))
+            row[i] = _STATE_BY_ANSWER.get(answer) or answer_state(*answer)
+    return row
+
+
+def _build_loading_matrix():
+    """Stack the loadings into one (2 * kinds * questions) x traits direction matrix.
+
+    Row blocks: A and B for each loading kind in LOADING_KINDS order.
+    Multiplying a matching block of per-question weights by it gives the
+    raw trait deltas.
+    """
+    matrix = np.zeros((2 * len(LOADING_KINDS), QUESTION_COUNT, len(TRAITS)), dtype=np.float32)
+    for q_id, trait, a_dir, b_dir, kind in LOADINGS:
+        block = 2 * LOADING_KINDS.index(kind)
+        matrix[block, q_id - 1, TRAIT_INDEX[trait]] += a_dir
+        matrix[block + 1, q_id - 1, TRAIT_INDEX[trait]] += b_dir
+    matrix.setflags(write=False)
+    return matrix.reshape(2 * len(LOADING_KINDS) * QUESTION_COUNT, len(TRAITS))
+
+
+LOADING_MATRIX = _build_loading_matrix()
+
+
+def score_traits(answers):
+    """Score one answer dict ({q_id: {"choice", "intensity"}}) or PackedAnswers into 13 traits."""
+    return SCORING.score(answer_states(answers))
+
+
+def matched_keys(table, answers):
+    """Translation keys of the STRESS_PATTERNS / OPERATIONAL_RULES entries that apply."""
+    return [key for q_id, choice, key in table if (answers.get(q_id) or {}).get("choice") == choice]
+
+
+def analyze(answers, t):
+    """Compute trait scores, stress patterns, and operational rules for one answer dict."""
+    states = answer_states(answers)
+    return {
+        "traits": SCORING.score(states),
+        "stressPatterns": [t[key] for key in SCORING.matches(SCORING.stress, states)],
+        "operationalRules": [t[key] for key in SCORING.matches(SCORING.rules, states)],
+    }
+
+
+def pattern_keys(answers):
+    """(stress pattern keys, operational rule keys) that apply, in the order analyze() lists their texts."""
+    states = answer_states(answers)
+    return SCORING.matches(SCORING.stress, states), SCORING.matches(SCORING.rules, states)
+
+
+def encode_answers(answers):
+    """Encode one answer dict as (choice codes, intensities) rows of length 43."""
+    choices = np.zeros(QUESTION_COUNT, dtype=np.int8)
+    intensities = np.zeros(QUESTION_COUNT, dtype=np.int8)
+    for q_id, a in answers.items():
+        code = CHOICE_CODES.get(a.get("choice")) if a else None
+        if code and 1 <= int(q_id) <= QUESTION_COUNT:
+            choices[int(q_id) - 1] = code
+            intensities[int(q_id) - 1] = a.get("intensity", DEFAULT_INTENSITY)
+    return choices, intensities
+
+
+def score_batch(choices, intensities, chunk_size=65536):
+    """Score an (N x 43) array of choice codes and intensities in NumPy.
+
+    choices holds UNANSWERED / CHOICE_A / CHOICE_B, intensities 1-3. Returns an
+    (N x 13) int8 array of clamped trait scores in TRAITS order, identical to
+    calling score_traits on each row.
+    """
+    choices = np.asarray(choices)
+    intensities = np.asarray(intensities)
+    if choices.shape != intensities.shape or choices.ndim != 2 or choices.shape[1] != QUESTION_COUNT:
+        raise ValueError(f"expected two (N x {QUESTION_COUNT}) arrays, got {choices.shape} and {intensities.shape}")
+
+    out = np.empty((choices.shape[0], len(TRAITS)), dtype=np.int8)
+    for start in range(0, choices.shape[0], chunk_size):
+        c = choices[start:start + chunk_size]
+        w = intensities[start:start + chunk_size]
+        is_a = c == CHOICE_A
+        is_b = c == CHOICE_B
+        blocks = []
+        for weights in WEIGHT_TABLES:
+            kind_w = np.take(weights, w, mode="clip")
+            blocks += [kind_w * is_a, kind_w * is_b]
+        raw = BASELINE + np.concatenate(blocks, axis=1) @ LOADING_MATRIX
+        out[start:start + chunk_size] = np.clip(np.rint(raw), MIN_SCORE, MAX_SCORE)
+    return out
+
+
+def match_batch(table, choices):
+    """(N x len(table)) bool array: which table entries apply to each row of choice codes."""
+    choices = np.asarray(choices)
+    columns = np.array([q_id - 1 for q_id, _, _ in table])
+    codes = np.array([CHOICE_CODES[choice] for _, choice, _ in table], dtype=choices.dtype)
+    return choices[:, columns] == codes
+
+
+def traits_from_row(row):
+    """Turn one row of score_batch output back into a trait dict."""
+    return {trait: int(value) for trait, value in zip(TRAITS, row)}
@@ -0,0 +1,127 @@
+"""Declarative scoring specification.
+
+Every scoring rule of the assessment is data here: the trait scale, how an
+answer's intensity is weighted, the question loadings, the stress patterns
+and operational rules, the contextual contrasts and the environment-fit
+thresholds. scoring.py validates it against the question bank and compiles
+it into flat lookup tables once per process; nothing else hard-codes a
+question id or a threshold.
+
+Bump SPEC["version"] whenever a rule changes. SPEC["bank_version"] names the
+question_bank.BANK_VERSION the rules were written for, so a changed question
+set fails loudly at startup instead of being scored with stale rules.
+"""
+
+SPEC = {
+    "version": 1,
+    "bank_version": 1,
+
+    "traits": (
+        "openness", "conscientiousness", "extraversion", "agreeableness", "stability",
+        "factFinder", "followThru", "quickStart", "implementor",
+        "autonomy", "mastery", "power", "affiliation",
+    ),
+    # Every trait starts at baseline; the result is clamped to min-max
+    "scale": {"baseline": 5, "min": 1, "max": 10, "default_intensity": 2},
+    # Weight of an answer of intensity 1, 2, 3 for each kind of loading
+    # (secondary loadings count half the intensity, rounded up)
+    "weights": {
+        "primary": (1, 2, 3),
+        "secondary": (1, 1, 2),
+    },
+
+    # (question id, trait, direction if A, direction if B, kind of loading)
+    "loadings": (
+        # Phase 1: Primary
+        (1, "openness", -1, 1, "primary"),
+        (2, "conscientiousness", 1, -1, "primary"),
+        (3, "extraversion", 1, -1, "primary"),
+        (4, "agreeableness", -1, 1, "primary"),
+        (5, "stability", -1, 1, "primary"),
+        (6, "factFinder", 1, -1, "primary"),
+        (7, "followThru", 1, -1, "primary"),
+        (8, "quickStart", 1, -1, "primary"),
+        (9, "implementor", 1, -1, "primary"),
+        (10, "autonomy", 1, -1, "primary"),
+        (11, "mastery", 1, -1, "primary"),
+        (12, "power", 1, -1, "primary"),
+        (13, "affiliation", 1, -1, "primary"),
+
+        # Phase 1: Secondary
+        (14, "quickStart", 1, -1, "secondary"),
+        (15, "quickStart", 1, 0, "secondary"),
+        (15, "stability", -1, 1, "secondary"),
+        (16, "extraversion", 1, -1, "secondary"),
+        (16, "agreeableness", -1, 1, "secondary"),
+        (17, "openness", 1, -1, "secondary"),
+        (18, "quickStart", 1, 0, "secondary"),
+        (18, "implementor", 1, -1, "secondary"),
+        (19, "power", 1, -1, "secondary"),
+        (19, "mastery", 1, 0, "secondary"),
+        (20, "stability", 1, -1, "secondary"),
+        (20, "conscientiousness", 1, 0, "secondary"),
+
+        # Phase 2: Secondary
+        (21, "extraversion", 1, -1, "secondary"),
+        (22, "agreeableness", -1, 0, "secondary"),
+        (23, "quickStart", 1, -1, "secondary"),
+        (24, "agreeableness", -1, 1, "secondary"),
+        (26, "extraversion", 1, 0, "secondary"),
+        (29, "openness", 1, -1, "secondary"),
+        (30, "conscientiousness", 1, -1, "secondary"),
+        (30, "followThru", 1, 0, "secondary"),
+        (31, "autonomy", -1, 1, "secondary"),
+        (31, "affiliation", 1, 0, "secondary"),
+    ),
+
+    # (question id, choice, translation key); reported in this order
+    "stress_patterns": (
+        (21, "A", "confrontational"),
+        (21, "B", "withdrawing"),
+        (24, "A", "taskFocused"),
+        (27, "A", "ruleBending"),
+        (30, "A", "perfectionism"),
+        (32, "A", "selfSacrifice"),
+        (35, "B", "spreadingThin"),
+    ),
+    "operational_rules": (
+        (36, "A", "rule1a"),
+        (36, "B", "rule1b"),
+        (37, "A", "rule2a"),
+        (37, "B", "rule2b"),
+        (38, "A", "rule3a"),
+        (41, "A", "rule4a"),
+        (41, "B", "rule4b"),
+    ),
+
+    # "Close but not / clearly not": (question id, label key, (close, clearly not) if A,
+    # (close, clearly not) otherwise)
+    "contrasts": (
+        (14, "decisionSpeed", ("impulsive", "paralysis"), ("methodical", "gambler")),
+        (15, "riskProfile", ("calcRisk", "riskAverse"), ("steadyOpt", "thrillSeek")),
+        (16, "conflictStyle", ("diplomatic", "avoider"), ("harmonious", "aggressive")),
+        (18, "learningMode", ("experimental", "theoretical"), ("studious", "trialByFire")),
+    ),
+
+    # A trait scoring at least threshold counts as high:
+    # (trait, (thrives in, fails in) if high, (thrives in, fails in) otherwise)
+    "environment_fit": {
+        "threshold": 6,
+        "rows": (
+            ("autonomy", ("highAutonomy", "micromanaged"), ("structured", "unstructured")),
+            ("quickStart", ("fastMoving", "slowMoving"), ("methodicalOrg", "moveFast")),
+            ("extraversion", ("collaborative", "isolated"), ("deepWork", "constantMeetings")),
+            ("mastery", ("learningFocused", "stagnant"), ("executionFocused", "constantReinvention")),
+        ),
+    },
+}
+
+
+def translation_keys(spec=SPEC):
+    """Every translation key the spec refers to (each text pack must define them)."""
+    keys = {key for _, _, key in spec["stress_patterns"] + spec["operational_rules"]}
+    for _, label, if_a, otherwise in spec["contrasts"]:
+        keys.update((label, *if_a, *otherwise))
+    for _, high, low in spec["environment_fit"]["rows"]:
+        keys.update((*high, *low))
+    return keys
@@ -0,0 +1,126 @@
+"""Opt-in, crash-safe persistence of assessment sessions in local SQLite.
+
+A session is keyed by an anonymous random token (kept in the page URL, no
+account or personal data). Its progress (answers as a resume code, page
+and position, follow-up questions and answers) is one row that is
+overwritten as the user moves on; every finished deep-analysis chapter is
+its own row, written the moment it completes. The database runs in WAL
+mode, so a crash or redeploy loses at most the step in flight. Sessions not
+touched for retention_seconds are deleted.
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+# How often (seconds) writes also sweep expired sessions
+PURGE_INTERVAL = 3600
+
+
+def new_token():
+    """A fresh anonymous session token."""
+    return secrets.token_urlsafe(16)
+
+
+class SessionStore:
+    """Session progress and finished chapters, keyed by session token."""
+
+    def __init__(self, path, retention_seconds=7 * 24 * 3600):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " token TEXT PRIMARY KEY, state TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chapters ("
+            " token TEXT NOT NULL, idx INTEGER NOT NULL, record TEXT NOT NULL, updated REAL NOT NULL,"
+            " PRIMARY KEY (token, idx))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated)")
+        self._purged = 0.0
+        self.purge()
+
+    def _write(self, *statements):
+        """Run (sql, params) statements as one transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for sql, params in statements:
+                    self._conn.execute(sql, params)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def save_state(self, token, state):
+        """Replace the progress of a session with state (a JSON-serializable dict)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (token, state, updated) VALUES (?, ?, ?)",
+                (token, json.dumps(state, ensure_ascii=False), now),
+            )
+        if now - self._purged > PURGE_INTERVAL:
+            self.purge()
+
+    def save_chapter(self, token, record):
+        """Store one finished chapter record (see app.chapter_record) under its index."""
+        now = time.time()
+        self._write(
+            ("INSERT OR REPLACE INTO chapters (token, idx, record, updated) VALUES (?, ?, ?, ?)",
+             (token, record["index"], json.dumps(record, ensure_ascii=False), now)),
+            # A chapter counts as activity, so a long generation never expires its session
+            ("UPDATE sessions SET updated = ? WHERE token = ?", (now, token)),
+        )
+
+    def delete_chapter(self, token, index):
+        """Forget a chapter, e.g. one whose regeneration failed."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chapters WHERE token = ? AND idx = ?", (token, index))
+
+    def load(self, token):
+        """(state, chapter records in index order) of a live session, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT state, updated FROM sessions WHERE token = ?", (token,)).fetchone()
+            if row is None or time.time() - row[1] > self.retention_seconds:
+                return None
+            chapters = self._conn.execute(
+                "SELECT record FROM chapters WHERE token = ? ORDER BY idx", (token,)
+            ).fetchall()
+        return json.loads(row[0]), [json.loads(record) for (record,) in chapters]
+
+    def delete(self, token):
+        """Remove a session and its chapters."""
+        self._write(
+            ("DELETE FROM chapters WHERE token = ?", (token,)),
+            ("DELETE FROM sessions WHERE token = ?", (token,)),
+        )
+
+    def purge(self):
+        """Delete sessions (and their chapters) older than the retention period."""
+        now = time.time()
+        cutoff = now - self.retention_seconds
+        self._write(
+            ("DELETE FROM chapters WHERE token IN (SELECT token FROM sessions WHERE updated < ?)"
+             " OR token NOT IN (SELECT token FROM sessions)", (cutoff,)),
+            ("DELETE FROM sessions WHERE updated < ?", (cutoff,)),
+        )
+        self._purged = now
+
+    def stats(self):
+        """Number of stored sessions and chapters."""
+        with self._lock:
+            sessions = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            chapters = self._conn.execute("SELECT COUNT(*) FROM chapters").fetchone()[0]
+        return {"sessions": sessions, "chapters": chapters}
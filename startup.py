@@ -0,0 +1,101 @@
+"""Cold-start bookkeeping: deferred heavy imports, background warm-up and timings.
+
+The Gemini client and reportlab are imported on first use through
+timed_import(), so the language page renders without them. warm_up() can
+prepare them in a background thread once the first page has been served,
+and report() lists where startup time went in this process.
+
+    python startup.py    # import cost of each dependency in a fresh interpreter
+"""
+
+import importlib
+import subprocess
+import sys
+import threading
+import time
+
+# app.py imports this module first, so this is close to the process start
+PROCESS_STARTED = time.perf_counter()
+
+# Measured by `python startup.py`, in the order the app needs them
+PROFILED_MODULES = (
+    "streamlit", "numpy", "scoring", "question_bank", "i18n.en", "i18n.de",
+    "google.generativeai", "reportlab.platypus",
+)
+
+_lock = threading.Lock()
+_timings = {}
+_warm_up_thread = None
+
+
+def record(label, seconds):
+    """Keep the first measurement for label."""
+    with _lock:
+        _timings.setdefault(label, seconds)
+
+
+def timed_import(name):
+    """Import a module on first use and record how long the import took."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    record(f"import {name}", time.perf_counter() - start)
+    return module
+
+
+def first_page_served():
+    """Record the time from process start to the end of the first script run."""
+    record("first page served", time.perf_counter() - PROCESS_STARTED)
+
+
+def warm_up(tasks):
+    """Run (label, func) tasks once per process in a daemon thread.
+
+    Failures are recorded but otherwise ignored; the real call will import or
+    build whatever is missing on its own.
+    """
+    global _warm_up_thread
+    with _lock:
+        if _warm_up_thread is not None:
+            return
+        _warm_up_thread = threading.Thread(target=_run_tasks, args=(tasks,), name="warm-up", daemon=True)
+    _warm_up_thread.start()
+
+
+def _run_tasks(tasks):
+    for label, func in tasks:
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception:
+            label += " (failed)"
+        record(f"warm-up: {label}", time.perf_counter() - start)
+
+
+def report():
+    """(label, seconds) pairs recorded so far, in the order they happened."""
+    with _lock:
+        return list(_timings.items())
+
+
+def measure_imports(modules=PROFILED_MODULES):
+    """Import each module in its own fresh interpreter and return (module, seconds)."""
+    results = []
+    for name in modules:
+        code = f"import time; s = time.perf_counter(); import {name}; print(time.perf_counter() - s)"
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        results.append((name, float(proc.stdout.strip()) if proc.returncode == 0 else None))
+    return results
+
+
+def main():
+    print(f"{'module':<24} {'import (ms)':>12}")
+    for name, seconds in measure_imports():
+        print(f"{name:<24} {'failed' if seconds is None else f'{seconds * 1000:.0f}':>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""Performance spans: where time goes in reruns, model calls and exports.
+
+A span is one timed operation with a name ("rerun", "analyze", "prompt",
+"llm_call", "report", "export") and grouping labels such as the page, the
+chapter index or the export format. Attributes like the call status, the
+number of attempts and token counts ride along. Spans are appended to a
+size-rotated JSONL file and aggregated in memory: recent latencies per
+name and labels (for p50/p95) plus cumulative counts, rendered in the
+Prometheus text format by prometheus_text() and served by MetricsServer.
+
+    python telemetry.py .cache/spans.jsonl    # p50/p95 per span from a span log
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from resilience import LatencyTracker, percentile
+
+# Attributes that are summed into counters rather than kept per span
+TOKEN_FIELDS = ("prompt_tokens", "cached_tokens", "output_tokens")
+
+
+def label_key(labels):
+    """Hashable, ordered form of a labels dict (None values dropped)."""
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def status_of(exc):
+    """Short status for a failed operation: the HTTP code if it has one, else the exception type."""
+    code = getattr(exc, "code", None)
+    return str(code) if isinstance(code, int) else type(exc).__name__
+
+
+class SpanLog:
+    """Append-only JSONL file, rotated to path.1 … path.<backups> once it reaches max_bytes."""
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = max(0, backups)
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _rotate(self):
+        if self.backups == 0:
+            os.remove(self.path)
+            return
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{n}"):
+                os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            try:
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError:
+                # Losing a span must never break the page that produced it
+                pass
+
+
+class Telemetry:
+    """Process-wide span recorder shared by all sessions."""
+
+    def __init__(self, log=None, window=500):
+        self.log = log
+        self.window = window
+        self._latency = {}           # (name, labels) -> LatencyTracker of recent spans
+        self._totals = Counter()     # (name, labels) -> span count
+        self._seconds = Counter()    # (name, labels) -> summed seconds
+        self._status = Counter()     # (name, labels, status) -> span count
+        self._tokens = Counter()     # (name, labels, field) -> summed tokens
+        self._attempts = Counter()   # (name, labels) -> summed attempts
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, labels=None, **attrs):
+        """Record one finished span; attrs (status, attempts, token counts, ...) go to the log as-is."""
+        labels = {k: v for k, v in (labels or {}).items() if v is not None}
+        key = (name, label_key(labels))
+        with self._lock:
+            tracker = self._latency.get(key)
+            if tracker is None:
+                tracker = self._latency[key] = LatencyTracker(self.window)
+            self._totals[key] += 1
+            self._seconds[key] += seconds
+            if attrs.get("status") is not None:
+                self._status[key + (str(attrs["status"]),)] += 1
+            if attrs.get("attempts"):
+                self._attempts[key] += attrs["attempts"]
+            for field in TOKEN_FIELDS:
+                if attrs.get(field):
+                    self._tokens[key + (field,)] += attrs[field]
+        tracker.add(seconds)
+        if self.log is not None:
+            self.log.write({"ts": datetime.now().isoformat(timespec="milliseconds"), "span": name,
+                            "seconds": round(seconds, 4), **labels, **attrs})
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time the block as one span; set entries of the yielded dict to add attributes.
+
+        A block that raises is recorded with the error as its status.
+        """
+        attrs = {}
+        started = time.perf_counter()
+        try:
+            yield attrs
+        except Exception as e:
+            attrs.setdefault("status", status_of(e))
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, labels, **attrs)
+
+    def summary(self, name=None):
+        """[(name, labels dict, {"count", "p50", "p95", "p99"})] for recent spans, sorted."""
+        with self._lock:
+            items = sorted((key, tracker) for key, tracker in self._latency.items() if name in (None, key[0]))
+        return [(key[0], dict(key[1]), tracker.summary()) for key, tracker in items]
+
+    def prometheus_text(self, prefix="profiler"):
+        """All aggregates in the Prometheus text exposition format."""
+
+        def labels_text(pairs):
+            if not pairs:
+                return ""
+            escaped = (k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+                       for k, v in pairs)
+            return "{" + ",".join(escaped) + "}"
+
+        with self._lock:
+            latency = dict(self._latency)
+            totals, seconds = dict(self._totals), dict(self._seconds)
+            status, tokens, attempts = dict(self._status), dict(self._tokens), dict(self._attempts)
+        lines = [f"# HELP {prefix}_span_seconds Span latency (quantiles over the last {self.window} spans).",
+                 f"# TYPE {prefix}_span_seconds summary"]
+        for (name, labels), tracker in sorted(latency.items()):
+            pairs = (("span", name),) + labels
+            stats = tracker.summary()
+            for q, quantile in (("p50", "0.5"), ("p95", "0.95"), ("p99", "0.99")):
+                if stats["count"]:
+                    lines.append(f"{prefix}_span_seconds{labels_text(pairs + (('quantile', quantile),))} {stats[q]:.6f}")
+            lines.append(f"{prefix}_span_seconds_sum{labels_text(pairs)} {seconds[(name, labels)]:.6f}")
+            lines.append(f"{prefix}_span_seconds_count{labels_text(pairs)} {totals[(name, labels)]}")
+        lines += [f"# HELP {prefix}_span_status_total Finished spans by status.",
+                  f"# TYPE {prefix}_span_status_total counter"]
+        for (name, labels, value), count in sorted(status.items()):
+            lines.append(f"{prefix}_span_status_total{labels_text((('span', name),) + labels + (('status', value),))} {count}")
+        lines += [f"# HELP {prefix}_span_attempts_total Model call attempts, including retries and hedges.",
+                  f"# TYPE {prefix}_span_attempts_total counter"]
+        for (name, labels), count in sorted(attempts.items()):
+            lines.append(f"{prefix}_span_attempts_total{labels_text((('span', name),) + labels)} {count}")
+        lines += [f"# HELP {prefix}_tokens_total Tokens reported by the API.",
+                  f"# TYPE {prefix}_tokens_total counter"]
+        for (name, labels, field), count in sorted(tokens.items()):
+            lines.append(f"{prefix}_tokens_total{labels_text((('span', name),) + labels + (('type', field),))} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves telemetry.prometheus_text() at /metrics from a background thread."""
+
+    def __init__(self, telemetry, host="127.0.0.1", port=9464):
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                data = telemetry.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def read_spans(path):
+    """Spans of a span log and its rotated backups, oldest file first."""
+    paths = [path]
+    n = 1
+    while os.path.exists(f"{path}.{n}"):
+        paths.insert(0, f"{path}.{n}")
+        n += 1
+    for name in paths:
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else ".cache/spans.jsonl"
+    groups = {}
+    for span in read_spans(path):
+        labels = {k: span[k] for k in ("page", "chapter", "kind", "format") if k in span}
+        groups.setdefault((span.get("span"), label_key(labels)), []).append(span.get("seconds", 0.0))
+    if not groups:
+        print(f"no spans in {path}", file=sys.stderr)
+        return 1
+    print(f"{'span':<10} {'labels':<28} {'n':>6} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+    for (name, labels), values in sorted(groups.items(), key=lambda item: (str(item[0][0]), item[0][1])):
+        text = ",".join(f"{k}={v}" for k, v in labels)
+        print(f"{name:<10} {text:<28} {len(values):>6} {percentile(values, 0.5) * 1000:>10.1f}"
+              f" {percentile(values, 0.95) * 1000:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
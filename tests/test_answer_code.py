@@ -0,0 +1,49 @@
+import base64
+
+import pytest
+
+from answer_code import BANK_TAG, InvalidAnswerCode, PackedAnswers
+from question_bank import LANGUAGES, QUESTION_IDS
+
+
+def sample_answers():
+    return PackedAnswers.from_dict({q_id: {"choice": "AB"[q_id % 2], "intensity": q_id % 3 + 1}
+                                    for q_id in QUESTION_IDS[:30]})
+
+
+def test_round_trip_with_language():
+    answers = sample_answers()
+    for lang in LANGUAGES:
+        decoded, decoded_lang = PackedAnswers.from_code(answers.to_code(lang))
+        assert decoded == answers
+        assert decoded_lang == lang
+        assert dict(decoded) == dict(answers)
+
+
+def test_round_trip_without_language():
+    decoded, lang = PackedAnswers.from_code(PackedAnswers().to_code())
+    assert decoded == PackedAnswers()
+    assert len(decoded) == 0
+    assert lang is None
+
+
+def test_code_from_another_question_bank_is_rejected():
+    raw = bytearray(base64.urlsafe_b64decode(sample_answers().to_code() + "=="))
+    raw[1:3] = bytes(b ^ 0xFF for b in BANK_TAG)
+    code = base64.urlsafe_b64encode(bytes(raw)).rstrip(b"=").decode("ascii")
+    with pytest.raises(InvalidAnswerCode, match="different version"):
+        PackedAnswers.from_code(code)
+
+
+@pytest.mark.parametrize("code", ["", "not a code!", "AAAA", sample_answers().to_code()[:-4]])
+def test_malformed_code_is_rejected(code):
+    with pytest.raises(InvalidAnswerCode):
+        PackedAnswers.from_code(code)
+
+
+def test_out_of_range_payload_is_rejected():
+    raw = bytearray(base64.urlsafe_b64decode(sample_answers().to_code() + "=="))
+    raw[4:] = b"\xff" * (len(raw) - 4)
+    code = base64.urlsafe_b64encode(bytes(raw)).rstrip(b"=").decode("ascii")
+    with pytest.raises(InvalidAnswerCode, match="out of range"):
+        PackedAnswers.from_code(code)
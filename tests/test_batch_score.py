@@ -0,0 +1,76 @@
+import csv
+import json
+
+import batch_score
+from scoring import QUESTION_COUNT, TRAITS, score_traits
+
+ALL_A = {q_id: {"choice": "A", "intensity": 3} for q_id in range(1, QUESTION_COUNT + 1)}
+MIXED = {q_id: {"choice": "AB"[q_id % 2], "intensity": q_id % 3 + 1} for q_id in range(1, 21)}
+
+
+def compact(answers):
+    return {str(q_id): a["choice"] + str(a["intensity"]) for q_id, a in answers.items()}
+
+
+def write_jsonl(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in open(path, encoding="utf-8")]
+
+
+def test_jsonl_records_score_like_the_app(tmp_path):
+    source = write_jsonl(tmp_path / "answers.jsonl", [
+        json.dumps({"id": "a", "language": "de", "answers": ALL_A}),
+        json.dumps({"id": "m", "answers": compact(MIXED)}),
+    ])
+    output = str(tmp_path / "scores.jsonl")
+    assert batch_score.main([source, "-o", output, "--chunk-size", "1"]) == 0
+    results = read_jsonl(output)
+    assert [r["id"] for r in results] == ["a", "m"]
+    assert [r["language"] for r in results] == ["de", "en"]
+    assert results[0]["traits"] == score_traits(ALL_A)
+    assert results[1]["traits"] == score_traits(MIXED)
+
+
+def test_invalid_records_are_reported_and_set_the_exit_code(tmp_path, capsys):
+    source = write_jsonl(tmp_path / "answers.jsonl", [
+        json.dumps({"id": "good", "answers": compact(MIXED)}),
+        "{not json",
+        json.dumps({"id": "bad choice", "answers": {"1": "C2"}}),
+        json.dumps({"id": "bad intensity", "answers": {"1": "A7"}}),
+    ])
+    output = str(tmp_path / "scores.jsonl")
+    assert batch_score.main([source, "-o", output]) == 1
+    results = read_jsonl(output)
+    assert "traits" in results[0]
+    assert [r["id"] for r in results[1:]] == ["2", "bad choice", "bad intensity"]
+    assert all("error" in r for r in results[1:])
+    assert "Scored 1 records (3 invalid)" in capsys.readouterr().err
+
+
+def test_csv_in_and_out(tmp_path):
+    source = tmp_path / "answers.csv"
+    with open(source, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "language", *(f"q{q_id}" for q_id in range(1, QUESTION_COUNT + 1))])
+        writer.writerow(["a", "en", *("A3" for _ in range(QUESTION_COUNT))])
+        writer.writerow(["empty", "", *("" for _ in range(QUESTION_COUNT))])
+    output = str(tmp_path / "scores.csv")
+    assert batch_score.main([str(source), "-o", output]) == 0
+    rows = list(csv.DictReader(open(output, encoding="utf-8")))
+    assert [row["id"] for row in rows] == ["a", "empty"]
+    assert {trait: int(rows[0][trait]) for trait in TRAITS} == score_traits(ALL_A)
+    assert {trait: int(rows[1][trait]) for trait in TRAITS} == score_traits({})
+
+
+def test_worker_processes_keep_the_input_order(tmp_path):
+    lines = [json.dumps({"id": str(n), "answers": compact(MIXED if n % 2 else ALL_A)}) for n in range(50)]
+    source = write_jsonl(tmp_path / "answers.jsonl", lines)
+    output = str(tmp_path / "scores.jsonl")
+    assert batch_score.main([source, "-o", output, "--workers", "2", "--chunk-size", "7"]) == 0
+    results = read_jsonl(output)
+    assert [r["id"] for r in results] == [str(n) for n in range(50)]
+    assert results[1]["traits"] == score_traits(MIXED)
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from followup_json import FIELDS, FollowupParseError, parse_followup_questions, repair
+
+
+def question(n):
+    return {field: f"{field} {n}" for field in FIELDS}
+
+
+def test_repair_strips_prose_and_fences():
+    text = "Here you go [5 questions]:\n```json\n" + json.dumps([question(1)]) + "\n```\nGood luck!"
+    assert json.loads(repair(text)) == [question(1)]
+
+
+def test_repair_drops_trailing_commas():
+    text = '[{"tension": "t", "question": "q", "optionA": "a", "optionB": "b", "optionC": "c",},]'
+    assert json.loads(repair(text)) == [{"tension": "t", "question": "q", "optionA": "a", "optionB": "b", "optionC": "c"}]
+
+
+def test_repair_drops_unfinished_last_element():
+    text = json.dumps([question(1), question(2)])[:-1] + ', {"tension": "cut off'
+    assert json.loads(repair(text)) == [question(1), question(2)]
+
+
+def test_repair_keeps_brackets_inside_strings():
+    item = {**question(1), "question": 'Is "[x]" {fine}?'}
+    assert json.loads(repair("prefix " + json.dumps([item]))) == [item]
+
+
+def test_repair_wraps_lone_objects():
+    assert json.loads(repair("Question: " + json.dumps(question(1)))) == [question(1)]
+
+
+def test_repair_fails_without_a_complete_question():
+    with pytest.raises(FollowupParseError):
+        repair('[{"tension": "only')
+    with pytest.raises(FollowupParseError):
+        repair("no JSON here")
+
+
+def test_parse_normalizes_field_names_and_skips_incomplete_items():
+    item = {"Tension": " t ", "question": "q", "option_a": "a", "option-b": "b", "OptionC": "c"}
+    text = json.dumps({"questions": [item, {"question": "incomplete"}]})
+    assert parse_followup_questions(text) == [{"tension": "t", "question": "q", "optionA": "a",
+                                               "optionB": "b", "optionC": "c"}]
+
+
+def test_parse_repairs_truncated_stream():
+    text = json.dumps([question(1), question(2)])[:-20]
+    assert parse_followup_questions(text) == [question(1)]
+
+
+def test_parse_raises_when_nothing_is_usable():
+    with pytest.raises(FollowupParseError):
+        parse_followup_questions('[{"question": "no options"}]')
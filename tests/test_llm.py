@@ -0,0 +1,129 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import llm
+from llm import generate_limited
+from rate_limit import RateLimiter
+from resilience import ResiliencePolicy
+
+
+class FakeModel:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def generate_content(self, prompt, **options):
+        self.calls.append(threading.current_thread())
+        meta = SimpleNamespace(prompt_token_count=10, cached_content_token_count=0, candidates_token_count=5)
+        return SimpleNamespace(text="answer", usage_metadata=meta)
+
+
+class FakeContext:
+    def __init__(self):
+        self.calls = []
+
+    def prompt(self, instructions):
+        return "block\n" + instructions
+
+    full_prompt = prompt
+
+    def model(self):
+        return FakeModel(self.calls)
+
+
+class RecordingLimiter(RateLimiter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquired_in = []
+
+    def acquire(self, session_id, tokens, on_wait=None):
+        self.acquired_in.append(threading.current_thread())
+        return super().acquire(session_id, tokens, on_wait)
+
+
+def test_quota_is_acquired_in_the_calling_thread_not_in_a_worker():
+    ctx = FakeContext()
+    limiter = RecordingLimiter(["key"], rpm=60)
+    usage = {}
+    text = generate_limited(ctx, "write", limiter=limiter, session_id="s", policy=ResiliencePolicy(), usage=usage)
+    assert text == "answer"
+    assert limiter.acquired_in == [threading.current_thread()]
+    assert ctx.calls and ctx.calls[0] is not threading.current_thread()
+    assert usage == {"prompt_tokens": 10, "cached_tokens": 0, "output_tokens": 5}
+    # The up-front estimate was corrected to the reported 15 tokens
+    assert limiter.quotas[0].tokens.level == limiter.quotas[0].tokens.capacity - 15
+
+
+def test_direct_call_is_admitted_too():
+    ctx = FakeContext()
+    limiter = RecordingLimiter(["key"], rpm=60)
+    assert generate_limited(ctx, "write", limiter=limiter, session_id="s") == "answer"
+    assert limiter.stats()["admitted"] == 1
+
+
+class FakeClientManager:
+    def configure(self, api_key, **settings):
+        self.api_key = api_key
+
+    def make_client(self, name):
+        return SimpleNamespace(api_key=self.api_key)
+
+
+class KeyedModel(FakeModel):
+    def __init__(self, calls):
+        super().__init__(calls)
+        self._client = None
+
+    def generate_content(self, prompt, **options):
+        self.calls.append(self._client.api_key if self._client else "configured key")
+        return super().generate_content(prompt, **options)
+
+
+def fake_sdk_modules(client_module):
+    modules = {"google.generativeai": SimpleNamespace(), "google.generativeai.client": client_module}
+    return lambda name: modules[name]
+
+
+@pytest.fixture
+def fake_sdk(monkeypatch):
+    monkeypatch.setattr(llm.startup, "timed_import",
+                        fake_sdk_modules(SimpleNamespace(_ClientManager=FakeClientManager)))
+    monkeypatch.setattr(llm, "_key_clients", {})
+
+
+def test_leased_key_is_the_one_the_call_uses(fake_sdk):
+    ctx = FakeContext()
+    ctx.model = lambda: KeyedModel(ctx.calls)
+    limiter = RateLimiter(["key a", "key b"], rpm=60)
+    limiter.quotas[0].requests.level = 10      # key b has more headroom
+    generate_limited(ctx, "write", limiter=limiter, session_id="s", policy=ResiliencePolicy())
+    assert ctx.calls[0] == "key b"
+    assert limiter.quotas[1].admitted == 1
+
+
+def test_sdk_without_the_hook_fails_loudly(monkeypatch):
+    monkeypatch.setattr(llm.startup, "timed_import", fake_sdk_modules(SimpleNamespace()))
+    with pytest.raises(llm.KeyBindingUnsupported):
+        llm.bind_key(KeyedModel([]), "key")
+    with pytest.raises(llm.KeyBindingUnsupported):
+        llm.bind_key(object(), "key")
+
+
+def test_installed_sdk_sends_with_the_bound_key(monkeypatch):
+    genai = pytest.importorskip("google.generativeai")
+    monkeypatch.setattr(llm, "_key_clients", {})
+    llm.configure("configured-key")
+    model = llm.bind_key(genai.GenerativeModel(llm.MODEL_NAME), "pool-key")
+    client = model._client
+    assert client._transport._credentials.token == "pool-key"
+
+    class Sent(Exception):
+        pass
+
+    def generate_content(*args, **kwargs):
+        raise Sent()
+
+    monkeypatch.setattr(client, "generate_content", generate_content)
+    with pytest.raises(Sent):
+        model.generate_content("hello")
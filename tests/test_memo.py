@@ -0,0 +1,59 @@
+from answer_code import PackedAnswers
+from memo import ANSWERS, SESSION, ArtifactMemo, content_hash, fingerprint
+
+ANSWERS_A = PackedAnswers.from_dict({1: {"choice": "A", "intensity": 2}})
+ANSWERS_B = PackedAnswers.from_dict({1: {"choice": "B", "intensity": 2}})
+
+
+def counting_build(value):
+    calls = []
+
+    def build():
+        calls.append(value)
+        return value
+
+    return build, calls
+
+
+def test_fingerprint_covers_answers_language_and_follow_ups():
+    base = fingerprint(ANSWERS_A, "en")
+    assert base == fingerprint(PackedAnswers(ANSWERS_A.states), "en")
+    assert base != fingerprint(ANSWERS_B, "en")
+    assert base != fingerprint(ANSWERS_A, "de")
+    assert base != fingerprint(ANSWERS_A, "en", [{"question": "q"}], {0: "answer"})
+
+
+def test_artifacts_are_built_once_per_fingerprint():
+    memo = ArtifactMemo().sync({ANSWERS: fingerprint(ANSWERS_A, "en")})
+    build, calls = counting_build("scores")
+    assert memo.get("analysis", build, scope=ANSWERS) == "scores"
+    assert memo.get("analysis", build, scope=ANSWERS) == "scores"
+    assert calls == ["scores"]
+    memo.sync({ANSWERS: fingerprint(ANSWERS_B, "en")})
+    memo.get("analysis", build, scope=ANSWERS)
+    assert len(calls) == 2
+    assert memo.stats() == {"artifacts": 1, "hits": 1, "misses": 2, "invalidations": 1}
+
+
+def test_follow_up_change_keeps_answer_scoped_artifacts():
+    memo = ArtifactMemo()
+    memo.sync({ANSWERS: fingerprint(ANSWERS_A, "en"), SESSION: fingerprint(ANSWERS_A, "en")})
+    scores, score_calls = counting_build("scores")
+    export, export_calls = counting_build("markdown")
+    memo.get("analysis", scores, scope=ANSWERS)
+    memo.get("markdown", export, scope=SESSION)
+    memo.sync({ANSWERS: fingerprint(ANSWERS_A, "en"),
+               SESSION: fingerprint(ANSWERS_A, "en", [{"question": "q"}], {0: "typed"})})
+    memo.get("analysis", scores, scope=ANSWERS)
+    memo.get("markdown", export, scope=SESSION)
+    assert len(score_calls) == 1
+    assert len(export_calls) == 2
+
+
+def test_new_version_replaces_the_artifact():
+    memo = ArtifactMemo()
+    for text in ("chapters v1", "chapters v2", "chapters v3"):
+        memo.get("pdf_payload", lambda: {"deep": text}, version=("date", content_hash(text)))
+    assert memo.stats()["artifacts"] == 1
+    assert memo.get("pdf_payload", lambda: None, version=("date", content_hash("chapters v3"))) == {"deep": "chapters v3"}
+    assert memo.stats()["hits"] == 1
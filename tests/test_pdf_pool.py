@@ -0,0 +1,73 @@
+from concurrent.futures import Future
+
+import pytest
+
+import pdf_pool
+from pdf_pool import PdfPool, PdfPoolBusy, PdfTimeout, render_pdf
+
+
+class StuckExecutor:
+    """Accepts jobs that never finish, like a hung worker process."""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        return Future()
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+@pytest.fixture
+def in_process(monkeypatch):
+    rendered = []
+
+    def fake_generate_pdf(payload):
+        rendered.append(payload)
+        return b"%PDF in process"
+
+    monkeypatch.setattr(pdf_pool, "generate_pdf", fake_generate_pdf)
+    return rendered
+
+
+def test_full_queue_fails_fast():
+    pool = PdfPool(queue_depth=1)
+    assert pool._slots.acquire(blocking=False)
+    with pytest.raises(PdfPoolBusy):
+        pool.render({"lang": "en"})
+    assert pool.stats()["rejected"] == 1
+
+
+def test_stuck_export_times_out_and_resets_the_pool():
+    pool = PdfPool(queue_depth=1, timeout=0.05)
+    executor = StuckExecutor()
+    pool._executor = executor
+    with pytest.raises(PdfTimeout):
+        pool.render({"lang": "en"})
+    assert executor.shut_down
+    assert pool._executor is None
+    assert pool.stats()["timed_out"] == 1
+    # The slot is free again
+    assert pool._slots.acquire(blocking=False)
+
+
+def test_busy_pool_falls_back_to_rendering_in_process(in_process):
+    pool = PdfPool(queue_depth=1)
+    pool._slots.acquire(blocking=False)
+    errors = []
+    assert render_pdf(pool, {"lang": "de"}, on_fallback=errors.append) == b"%PDF in process"
+    assert in_process == [{"lang": "de"}]
+    assert [type(e) for e in errors] == [PdfPoolBusy]
+
+
+def test_timed_out_pool_falls_back_to_rendering_in_process(in_process):
+    pool = PdfPool(timeout=0.05)
+    pool._executor = StuckExecutor()
+    errors = []
+    assert render_pdf(pool, {"lang": "en"}, on_fallback=errors.append) == b"%PDF in process"
+    assert [type(e) for e in errors] == [PdfTimeout]
+
+
+def test_without_a_pool_renders_in_process(in_process):
+    assert render_pdf(None, {"lang": "en"}) == b"%PDF in process"
@@ -0,0 +1,64 @@
+import pytest
+
+import population
+from population import PopulationStats
+from scoring_spec import SPEC
+
+TRAITS = {trait: 5 for trait in SPEC["traits"]}
+
+
+def test_same_answers_are_counted_once(tmp_path):
+    path = str(tmp_path / "population.sqlite3")
+    stats = PopulationStats(path)
+    assert stats.add(TRAITS, ["withdrawing"], identity=b"\x01\x02")
+    assert not stats.add(TRAITS, ["withdrawing"], identity=b"\x01\x02")
+    assert stats.add(TRAITS, identity=b"\x02\x01")
+    assert stats.profiles == 2
+
+    reopened = PopulationStats(path)
+    assert reopened.profiles == 2
+    assert not reopened.add(TRAITS, identity=b"\x01\x02")
+    assert reopened.share("stress", "withdrawing") == 50
+
+
+def test_in_memory_store_dedups_too():
+    stats = PopulationStats()
+    assert stats.add(TRAITS, identity=b"answers")
+    assert not stats.add(TRAITS, identity=b"answers")
+    assert stats.add(TRAITS)
+    assert stats.profiles == 2
+
+
+def test_percentile_rank_counts_lower_scores():
+    stats = PopulationStats()
+    for score in (2, 4, 6, 8):
+        stats.add({**TRAITS, "openness": score})
+    assert stats.percentile_rank("openness", 6) == 50
+    assert stats.compare(TRAITS, min_profiles=5) is None
+    assert stats.compare(TRAITS, min_profiles=4)["count"] == 4
+
+
+def test_cli_reads_files_without_touching_them(tmp_path, capsys):
+    current = str(tmp_path / "current.sqlite3")
+    old = str(tmp_path / "old.sqlite3")
+    PopulationStats(current).add(TRAITS)
+    PopulationStats(old, spec={**SPEC, "version": SPEC["version"] - 1}).add(TRAITS)
+    before = open(old, "rb").read()
+
+    assert population.main([current, old]) == 0
+    out, err = capsys.readouterr()
+    assert out.startswith("1 profiles")
+    assert "skipped" in err and "old.sqlite3" in err
+    assert population.main([old]) == 1
+    # The old deployment's counts are still there
+    assert open(old, "rb").read() == before
+    assert PopulationStats(old, spec={**SPEC, "version": SPEC["version"] - 1}, read_only=True).profiles == 1
+
+
+def test_read_only_store_refuses_to_count(tmp_path):
+    path = str(tmp_path / "population.sqlite3")
+    PopulationStats(path).add(TRAITS)
+    stats = PopulationStats(path, read_only=True)
+    assert stats.profiles == 1
+    with pytest.raises(ValueError):
+        stats.add(TRAITS)
@@ -0,0 +1,55 @@
+import threading
+
+from prefetch import Prefetcher
+
+ANSWERS = {1: {"choice": "A", "intensity": 2}, 2: {"choice": "B", "intensity": 3}}
+
+
+def test_speculation_on_the_final_block_is_claimed():
+    prefetcher = Prefetcher(workers=1)
+    spec = prefetcher.start("en", ANSWERS, lambda spec: (["question"], None), block="final block")
+    assert prefetcher.claim(spec, "en", dict(ANSWERS), block="final block") is spec
+    assert spec.wait() == (["question"], None)
+    assert prefetcher.stats()["started"] == 1
+    assert prefetcher.stats().keys() & {"hits", "joined"}
+
+
+def test_running_speculation_is_joined_and_relays_progress():
+    prefetcher = Prefetcher(workers=1)
+    release = threading.Event()
+
+    def run(spec):
+        spec.publish("drafting")
+        release.wait(5)
+        return "done"
+
+    spec = prefetcher.start("en", ANSWERS, run, block="final block")
+    assert prefetcher.claim(spec, "en", ANSWERS, block="final block") is spec
+    updates = []
+
+    def on_update(value):
+        updates.append(value)
+        release.set()
+
+    assert spec.wait(on_update, poll_seconds=0.01) == "done"
+    assert updates == ["drafting"]
+    assert prefetcher.stats()["joined"] == 1
+
+
+def test_speculation_on_another_block_is_discarded():
+    prefetcher = Prefetcher(workers=1)
+    spec = prefetcher.start("en", ANSWERS, lambda spec: "result", block="earlier block")
+    assert prefetcher.claim(spec, "en", ANSWERS, block="final block") is None
+    assert spec.cancelled.is_set()
+    assert prefetcher.stats()["stale"] == 1
+
+
+def test_changed_answer_or_language_discards_the_speculation():
+    prefetcher = Prefetcher(workers=1)
+    changed = {**ANSWERS, 2: {"choice": "A", "intensity": 3}}
+    spec = prefetcher.start("en", ANSWERS, lambda spec: "result", block="block")
+    assert not spec.matches("en", changed)
+    assert not spec.matches("de", ANSWERS)
+    assert prefetcher.claim(spec, "en", changed, block="block") is None
+    assert prefetcher.stats()["cancelled"] == 1
+    assert "stale" not in prefetcher.stats()
@@ -0,0 +1,59 @@
+import string
+
+import pytest
+
+from question_bank import LANGUAGES, PHASES, QUESTION_IDS, get_translations, load_bank
+from scoring_spec import translation_keys
+
+
+def fields(text):
+    """Names of the str.format placeholders in text."""
+    return {name for _, name, _, _ in string.Formatter().parse(text) if name is not None}
+
+
+@pytest.mark.parametrize("lang", LANGUAGES)
+def test_bank_has_every_question_in_phase_order(lang):
+    bank = load_bank(lang)
+    assert [q["id"] for q in bank.questions] == list(QUESTION_IDS)
+    assert bank.total == len(QUESTION_IDS) == 43
+    for phase, first, last in PHASES:
+        start, end = bank.phase_offsets[phase]
+        assert [q["id"] for q in bank.questions[start:end]] == list(range(first, last + 1))
+    assert all(q["questionA"] and q["questionB"] and q["category"] for q in bank.questions)
+    assert bank.by_id[21] is bank.questions[bank.index_by_id[21]]
+
+
+@pytest.mark.parametrize("lang", LANGUAGES)
+def test_packs_cover_the_scoring_texts(lang):
+    assert translation_keys() <= set(get_translations(lang))
+
+
+def test_languages_have_the_same_keys_and_placeholders():
+    reference = get_translations(LANGUAGES[0])
+    for lang in LANGUAGES[1:]:
+        t = get_translations(lang)
+        assert set(t) == set(reference)
+        for key, text in reference.items():
+            if isinstance(text, str):
+                assert fields(t[key]) == fields(text), key
+
+
+def test_questions_have_the_same_fields_in_every_language():
+    reference = load_bank(LANGUAGES[0])
+    for lang in LANGUAGES[1:]:
+        bank = load_bank(lang)
+        for q, ref in zip(bank.questions, reference.questions):
+            assert set(q) == set(ref), q["id"]
+            assert bool(q.get("scenario")) == bool(ref.get("scenario")), q["id"]
+            assert bool(q.get("context")) == bool(ref.get("context")), q["id"]
+
+
+def test_records_are_read_only():
+    bank = load_bank("en")
+    with pytest.raises(TypeError):
+        bank.questions[0]["questionA"] = "changed"
+
+
+def test_unknown_language_is_rejected():
+    with pytest.raises(KeyError):
+        load_bank("fr")
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+from rate_limit import RateLimiter, RateLimitExceeded
+
+
+def test_sessions_are_admitted_round_robin():
+    limiter = RateLimiter(["key"], rpm=240, max_wait=10, poll_seconds=0.01)
+    limiter.quotas[0].requests.level = 0    # one admission every 0.25 s from now on
+    order = []
+    lock = threading.Lock()
+
+    def call(session_id):
+        limiter.acquire(session_id, 0)
+        with lock:
+            order.append(session_id)
+
+    threads = []
+    for session_id in ["fan-out"] * 3 + ["single"]:
+        thread = threading.Thread(target=call, args=(session_id,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02)
+    assert limiter.position("single")[0] == 1    # behind only the first fan-out call
+    for thread in threads:
+        thread.join()
+    assert order == ["fan-out", "single", "fan-out", "fan-out"]
+    assert limiter.stats()["admitted"] == 4
+
+
+def test_call_is_rejected_when_the_wait_exceeds_max_wait():
+    limiter = RateLimiter(["key"], rpm=6, max_wait=1)
+    limiter.quotas[0].requests.level = 0    # next request in 10 s
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire("session", 0)
+    assert limiter.stats()["rejected"] == 1
+    assert limiter.stats()["waiting"] == 0
+
+
+def test_lease_uses_the_key_with_most_headroom():
+    limiter = RateLimiter(["a", "b"], rpm=60)
+    limiter.quotas[0].requests.level = 10
+    assert limiter.acquire("session", 0).api_key == "b"
+
+
+
+def test_try_acquire_never_waits_or_jumps_the_queue():
+    limiter = RateLimiter(["key"], rpm=60, tpm=600, max_wait=30, poll_seconds=0.01)
+    assert limiter.try_acquire(0).api_key == "key"
+    limiter.quotas[0].requests.level = 0
+    assert limiter.try_acquire(0) is None
+    limiter.quotas[0].requests.level = 60
+    limiter.quotas[0].tokens.level = 0      # a 100-token call now waits about 10 s
+    waiting = threading.Thread(target=limiter.acquire, args=("other", 100))
+    waiting.start()
+    while limiter.position("other") is None:
+        time.sleep(0.01)
+    # Capacity for a 0-token call, but the waiting call goes first
+    assert limiter.try_acquire(0) is None
+    limiter.quotas[0].tokens.level = limiter.quotas[0].tokens.capacity
+    waiting.join()
+    assert limiter.stats()["admitted"] == 2
+    assert limiter.try_acquire(0) is not None
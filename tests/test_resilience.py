@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+
+from resilience import ResiliencePolicy
+
+
+class ApiError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+def flaky(failures, code=503):
+    calls = []
+
+    def attempt(handle):
+        handle.start()
+        calls.append(handle)
+        if len(calls) <= failures:
+            raise ApiError(code)
+        return "ok"
+
+    return attempt, calls
+
+
+def test_retryable_errors_are_retried():
+    policy = ResiliencePolicy(max_attempts=3, base_delay=0)
+    attempt, calls = flaky(2)
+    assert policy.call(attempt) == "ok"
+    assert len(calls) == 3
+    assert policy.stats()["retries"] == 2
+
+
+def test_retries_are_capped():
+    policy = ResiliencePolicy(max_attempts=2, base_delay=0)
+    attempt, calls = flaky(5)
+    with pytest.raises(ApiError):
+        policy.call(attempt)
+    assert len(calls) == 2
+    assert policy.stats()["failures"] == 1
+
+
+def test_client_errors_are_not_retried():
+    policy = ResiliencePolicy(max_attempts=3, base_delay=0)
+    attempt, calls = flaky(1, code=400)
+    with pytest.raises(ApiError):
+        policy.call(attempt)
+    assert len(calls) == 1
+
+
+def test_slow_attempt_is_hedged_and_the_duplicate_wins():
+    policy = ResiliencePolicy(hedge=True, hedge_min_samples=1, poll_seconds=0.01)
+    policy.latency.add(0.05)
+
+    def attempt(handle):
+        handle.start()
+        if not handle.hedge:
+            handle.cancelled.wait(5)
+            return "slow"
+        return "fast"
+
+    assert policy.call(attempt) == "fast"
+    stats = policy.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_progress_is_relayed_to_the_caller():
+    policy = ResiliencePolicy()
+    updates = []
+
+    def attempt(handle):
+        handle.start()
+        handle.publish("partial")
+        return "done"
+
+    assert policy.call(attempt, on_update=updates.append) == "done"
+    assert updates == ["partial"]
+
+
+def test_admission_runs_in_the_calling_thread_and_the_lease_reaches_the_attempt():
+    policy = ResiliencePolicy(max_attempts=2, base_delay=0)
+    admitted = []
+
+    def admit(hedge):
+        admitted.append((hedge, threading.current_thread()))
+        return f"lease {len(admitted)}"
+
+    leases = []
+
+    def attempt(handle):
+        handle.start()
+        leases.append(handle.lease)
+        if len(leases) == 1:
+            raise ApiError(503)
+        return "ok"
+
+    assert policy.call(attempt, admit=admit) == "ok"
+    assert leases == ["lease 1", "lease 2"]
+    assert admitted == [(False, threading.current_thread())] * 2
+
+
+def test_hedge_waits_for_capacity_instead_of_queueing():
+    policy = ResiliencePolicy(hedge=True, hedge_min_samples=1, poll_seconds=0.01)
+    policy.latency.add(0.01)
+    offers = []
+
+    def admit(hedge):
+        if not hedge:
+            return "primary"
+        offers.append(hedge)
+        # No capacity for the first few polls
+        return "hedge" if len(offers) > 3 else None
+
+    def attempt(handle):
+        handle.start()
+        if handle.lease == "primary":
+            handle.cancelled.wait(5)
+            return "slow"
+        return "fast"
+
+    assert policy.call(attempt, admit=admit) == "fast"
+    assert len(offers) == 4
+    assert policy.stats()["hedges"] == 1
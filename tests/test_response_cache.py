@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "responses.sqlite3"), ttl_seconds=60, max_bytes=30)
+
+
+def test_key_depends_on_model_config_and_prompt():
+    key = ResponseCache.make_key("model", {"temperature": 0.7}, "prompt")
+    assert key == ResponseCache.make_key("model", {"temperature": 0.7}, "prompt")
+    assert key != ResponseCache.make_key("other", {"temperature": 0.7}, "prompt")
+    assert key != ResponseCache.make_key("model", {"temperature": 0.2}, "prompt")
+    assert key != ResponseCache.make_key("model", {"temperature": 0.7}, "prompt!")
+
+
+def test_get_returns_stored_text_until_the_ttl(cache, monkeypatch):
+    cache.put("k", "text")
+    assert cache.get("k") == "text"
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("k") is None
+    assert cache.stats() == {"entries": 0, "bytes": 0, "hits": 1, "misses": 1}
+
+
+def test_least_recently_used_entries_are_evicted_over_the_size_cap(cache):
+    cache.put("a", "x" * 10)
+    cache.put("b", "x" * 10)
+    cache.get("a")
+    cache.put("c", "x" * 10)
+    assert cache.stats()["bytes"] == 30
+    cache.put("d", "x" * 10)
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["x" * 10] * 3
+    assert cache.stats()["bytes"] == 30
+
+
+def test_oversized_entry_does_not_evict_newer_ones_first(cache):
+    cache.put("a", "x" * 10)
+    cache.put("b", "x" * 25)
+    assert cache.get("a") is None
+    assert cache.get("b") == "x" * 25
+
+
+def test_put_replaces_an_entry(cache):
+    # A redo skips the lookup and overwrites the cached response with the new one
+    cache.put("k", "old response")
+    cache.put("k", "new")
+    assert cache.get("k") == "new"
+    assert cache.stats()["bytes"] == 3
+
+
+def test_delete_and_reopen_keep_the_size_accounting(cache, tmp_path):
+    cache.put("a", "x" * 10)
+    cache.put("b", "x" * 5)
+    cache.delete("a")
+    reopened = ResponseCache(str(tmp_path / "responses.sqlite3"))
+    assert reopened.stats()["bytes"] == 5
+    assert reopened.get("b") == "x" * 5
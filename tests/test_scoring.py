@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from scoring import QUESTION_COUNT, TRAITS, encode_answers, score_batch, score_traits, traits_from_row
+
+# Scores of the original hand-written rules for a few fixed answer sets, in TRAITS order
+BASELINE_SCORES = {
+    "empty": [5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5],
+    "all_a_3": [6, 10, 10, 1, 2, 8, 10, 10, 10, 6, 10, 10, 10],
+    "all_b_1": [4, 3, 2, 8, 6, 4, 4, 2, 3, 5, 4, 3, 4],
+    "alternating": [3, 10, 6, 1, 10, 6, 4, 9, 5, 8, 2, 5, 3],
+}
+
+QUESTION_IDS = range(1, QUESTION_COUNT + 1)
+
+PROFILES = {
+    "empty": {},
+    "all_a_3": {q_id: {"choice": "A", "intensity": 3} for q_id in QUESTION_IDS},
+    "all_b_1": {q_id: {"choice": "B", "intensity": 1} for q_id in QUESTION_IDS},
+    "alternating": {q_id: {"choice": "AB"[q_id % 2], "intensity": q_id % 3 + 1} for q_id in QUESTION_IDS},
+}
+
+
+@pytest.mark.parametrize("name", sorted(PROFILES))
+def test_score_traits_matches_baseline(name):
+    assert [score_traits(PROFILES[name])[trait] for trait in TRAITS] == BASELINE_SCORES[name]
+
+
+def test_score_batch_matches_baseline():
+    names = sorted(PROFILES)
+    rows = [encode_answers(PROFILES[name]) for name in names]
+    scores = score_batch(np.stack([c for c, _ in rows]), np.stack([w for _, w in rows]))
+    assert scores.tolist() == [BASELINE_SCORES[name] for name in names]
+
+
+def test_score_batch_matches_score_traits_on_random_rows():
+    rng = np.random.default_rng(7)
+    choices = rng.integers(0, 3, size=(500, len(QUESTION_IDS)), dtype=np.int8)
+    intensities = rng.integers(1, 4, size=(500, len(QUESTION_IDS)), dtype=np.int8)
+    scores = score_batch(choices, intensities, chunk_size=64)
+    for row_choices, row_intensities, row in zip(choices, intensities, scores):
+        answers = {q_id: {"choice": " AB"[c], "intensity": int(w)}
+                   for q_id, c, w in zip(QUESTION_IDS, row_choices, row_intensities) if c}
+        assert traits_from_row(row) == score_traits(answers)
+
+
+def test_score_batch_rejects_wrong_shape():
+    with pytest.raises(ValueError):
+        score_batch(np.zeros((2, 5)), np.zeros((2, 5)))
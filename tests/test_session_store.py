@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+from session_store import SessionStore, new_token
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SessionStore(str(tmp_path / "sessions.sqlite3"), retention_seconds=60)
+
+
+def test_load_returns_state_and_chapters_in_order(store):
+    token = new_token()
+    store.save_state(token, {"page": "results"})
+    store.save_chapter(token, {"index": 1, "text": "second"})
+    store.save_chapter(token, {"index": 0, "text": "first"})
+    state, chapters = store.load(token)
+    assert state == {"page": "results"}
+    assert [c["text"] for c in chapters] == ["first", "second"]
+
+
+def test_expired_session_is_not_loaded_and_is_purged(store, monkeypatch):
+    token = new_token()
+    store.save_state(token, {"page": "questions"})
+    store.save_chapter(token, {"index": 0, "text": "chapter"})
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert store.load(token) is None
+    store.purge()
+    assert store.stats()["sessions"] == 0
+    assert store.stats()["chapters"] == 0
+
+
+def test_chapter_keeps_session_alive(store, monkeypatch):
+    token = new_token()
+    store.save_state(token, {"page": "results"})
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 50)
+    store.save_chapter(token, {"index": 0, "text": "chapter"})
+    monkeypatch.setattr(time, "time", lambda: now + 100)
+    assert store.load(token) is not None
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+import telemetry
+from telemetry import SpanLog, Telemetry, read_spans
+
+
+def test_span_log_rotates_and_keeps_the_backup_count(tmp_path):
+    path = str(tmp_path / "spans.jsonl")
+    log = SpanLog(path, max_bytes=100, backups=2)
+    for n in range(20):
+        log.write({"span": "rerun", "n": n, "pad": "x" * 20})
+    assert os.path.exists(path + ".1")
+    assert os.path.exists(path + ".2")
+    assert not os.path.exists(path + ".3")
+    assert all(os.path.getsize(name) <= 100 for name in (path, path + ".1", path + ".2"))
+    numbers = [span["n"] for span in read_spans(path)]
+    # Oldest file first, and the newest spans survive rotation
+    assert numbers == sorted(numbers)
+    assert numbers[-1] == 19
+
+
+def test_span_log_without_backups_starts_over(tmp_path):
+    path = str(tmp_path / "spans.jsonl")
+    log = SpanLog(path, max_bytes=60, backups=0)
+    for n in range(5):
+        log.write({"span": "rerun", "n": n, "pad": "x" * 10})
+    assert not os.path.exists(path + ".1")
+    assert [span["n"] for span in read_spans(path)][-1] == 4
+
+
+def test_spans_are_aggregated_per_name_and_labels(tmp_path):
+    log = SpanLog(str(tmp_path / "spans.jsonl"))
+    recorder = Telemetry(log)
+    for seconds in (0.1, 0.2, 0.3):
+        recorder.record("llm_call", seconds, {"kind": "chapter", "chapter": None}, status="ok",
+                        attempts=2, prompt_tokens=100, output_tokens=10)
+    recorder.record("llm_call", 1.0, {"kind": "followup"}, status="503")
+    summary = recorder.summary("llm_call")
+    assert [(name, labels, stats["count"]) for name, labels, stats in summary] == [
+        ("llm_call", {"kind": "chapter"}, 3), ("llm_call", {"kind": "followup"}, 1)]
+    assert summary[0][2]["p50"] == 0.2
+    text = recorder.prometheus_text()
+    assert 'profiler_span_seconds_count{span="llm_call",kind="chapter"} 3' in text
+    assert 'profiler_span_status_total{span="llm_call",kind="followup",status="503"} 1' in text
+    assert 'profiler_span_attempts_total{span="llm_call",kind="chapter"} 6' in text
+    assert 'profiler_tokens_total{span="llm_call",kind="chapter",type="prompt_tokens"} 300' in text
+    assert len(list(read_spans(log.path))) == 4
+
+
+def test_failed_span_records_the_error_status():
+    recorder = Telemetry()
+
+    class ApiError(Exception):
+        code = 429
+
+    with pytest.raises(ApiError):
+        with recorder.span("llm_call", kind="chapter"):
+            raise ApiError()
+    assert 'status="429"' in recorder.prometheus_text()
+
+
+def test_cli_reports_percentiles(tmp_path, capsys):
+    path = str(tmp_path / "spans.jsonl")
+    recorder = Telemetry(SpanLog(path))
+    recorder.record("export", 0.5, {"format": "pdf"})
+    assert telemetry.main([path]) == 0
+    assert "format=pdf" in capsys.readouterr().out
+    assert telemetry.main([str(tmp_path / "missing.jsonl")]) == 1
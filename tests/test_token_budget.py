@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from token_budget import BudgetExceeded, TokenBudget, TokenLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return TokenLedger(str(tmp_path / "usage.sqlite3"))
+
+
+def test_unlimited_budget_runs_everything(ledger):
+    budget = TokenBudget(ledger)
+    assert budget.remaining("p") is None
+    assert budget.plan("p", {"a": 10_000, "b": 10_000}) == ("full", ["a", "b"])
+
+
+def test_remaining_takes_the_tighter_limit(ledger):
+    ledger.record("p", "chapter", {"prompt_tokens": 300, "output_tokens": 200})
+    ledger.record("other", "chapter", {"prompt_tokens": 1_000, "output_tokens": 0})
+    assert TokenBudget(ledger, per_profile=1_000).remaining("p") == 500
+    assert TokenBudget(ledger, per_profile=1_000, per_day=1_800).remaining("p") == 300
+
+
+def test_plan_prefers_full_then_compact_then_partial(ledger):
+    budget = TokenBudget(ledger, per_profile=1_000)
+    full = {"a": 400, "b": 400, "c": 400}
+    assert budget.plan("p", {"a": 500, "b": 500}) == ("full", ["a", "b"])
+    assert budget.plan("p", full, {"a": 300, "b": 300, "c": 300}) == ("compact", ["a", "b", "c"])
+    assert budget.plan("p", full, {"a": 600, "b": 600, "c": 300}) == ("partial", ["a", "c"])
+    assert budget.plan("p", full) == ("partial", ["a", "b"])
+
+
+def test_plan_reports_exhausted_budget(ledger):
+    ledger.record("p", "chapter", {"prompt_tokens": 1_000})
+    budget = TokenBudget(ledger, per_profile=1_000)
+    assert budget.plan("p", {"a": 1}) == ("exhausted", [])
+    with pytest.raises(BudgetExceeded):
+        budget.check("p", 1)
+
+
+def test_profile_budget_covers_the_whole_assessment(ledger):
+    yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).strftime("%Y-%m-%d")
+    ledger.record("p", "chapter", {"prompt_tokens": 400}, day=yesterday)
+    ledger.record("p", "chapter", {"prompt_tokens": 400})
+    assert TokenBudget(ledger, per_profile=1_000).remaining("p") == 200
+    # The daily limit counts only today's usage
+    assert TokenBudget(ledger, per_day=1_000).remaining("p") == 600
@@ -0,0 +1,201 @@
+"""Token accounting and per-profile / per-day token budgets.
+
+TokenLedger stores the token counts the API reports (usage_metadata) for
+every model call in local SQLite, per UTC day, profile and kind of call,
+plus one row per completed report. TokenBudget compares local estimates
+of planned calls with what is left of the per-profile and per-day budgets,
+so a report can be shortened before it starts instead of running out of
+quota halfway through.
+
+    python token_budget.py .cache/usage.sqlite3    # daily usage and cost per report
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Gemini 2.5 Flash list prices in USD per million tokens (input, cached input, output)
+DEFAULT_PRICES = {"input": 0.30, "cached": 0.075, "output": 2.50}
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when a call would not fit the remaining token budget."""
+
+
+def today():
+    """The current UTC day as YYYY-MM-DD (usage is bucketed by it)."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class TokenLedger:
+    """Reported token usage per day, profile and kind, plus completed reports."""
+
+    def __init__(self, path, retention_days=90):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            " day TEXT NOT NULL, profile TEXT NOT NULL, kind TEXT NOT NULL, calls INTEGER NOT NULL,"
+            " prompt_tokens INTEGER NOT NULL, cached_tokens INTEGER NOT NULL, output_tokens INTEGER NOT NULL,"
+            " updated REAL NOT NULL, PRIMARY KEY (day, profile, kind))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reports ("
+            " day TEXT NOT NULL, profile TEXT NOT NULL, finished REAL NOT NULL, PRIMARY KEY (day, profile))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS usage_profile ON usage (profile)")
+        self.purge()
+
+    def record(self, profile, kind, usage, day=None):
+        """Add one call's usage dict (prompt_tokens, cached_tokens, output_tokens; see llm.record_usage)."""
+        counts = [int(usage.get(key, 0) or 0) for key in ("prompt_tokens", "cached_tokens", "output_tokens")]
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO usage (day, profile, kind, calls, prompt_tokens, cached_tokens, output_tokens, updated)"
+                " VALUES (?, ?, ?, 1, ?, ?, ?, ?)"
+                " ON CONFLICT (day, profile, kind) DO UPDATE SET calls = calls + 1,"
+                " prompt_tokens = prompt_tokens + excluded.prompt_tokens,"
+                " cached_tokens = cached_tokens + excluded.cached_tokens,"
+                " output_tokens = output_tokens + excluded.output_tokens, updated = excluded.updated",
+                (day or today(), profile, kind, *counts, time.time()),
+            )
+
+    def record_report(self, profile, day=None):
+        """Count a completed report for profile (once per day, however often chapters are regenerated)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO reports (day, profile, finished) VALUES (?, ?, ?)",
+                (day or today(), profile, time.time()),
+            )
+
+    def profile_tokens(self, profile):
+        """Prompt plus output tokens used by profile so far."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(prompt_tokens + output_tokens), 0) FROM usage WHERE profile = ?", (profile,)
+            ).fetchone()
+        return row[0]
+
+    def day_tokens(self, day=None):
+        """Prompt plus output tokens used by all profiles on day (default: today)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(prompt_tokens + output_tokens), 0) FROM usage WHERE day = ?", (day or today(),)
+            ).fetchone()
+        return row[0]
+
+    def daily_summary(self, days=7, prices=None):
+        """Usage, cost and cost per completed report for the last days days, newest first."""
+        prices = {**DEFAULT_PRICES, **(prices or {})}
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        with self._lock:
+            usage = self._conn.execute(
+                "SELECT day, SUM(calls), SUM(prompt_tokens), SUM(cached_tokens), SUM(output_tokens),"
+                " COUNT(DISTINCT profile) FROM usage WHERE day >= ? GROUP BY day", (since,)
+            ).fetchall()
+            reports = dict(self._conn.execute(
+                "SELECT day, COUNT(*) FROM reports WHERE day >= ? GROUP BY day", (since,)
+            ).fetchall())
+        summary = []
+        for day, calls, prompt, cached, output, profiles in sorted(usage, reverse=True):
+            cost = ((prompt - cached) * prices["input"] + cached * prices["cached"]
+                    + output * prices["output"]) / 1_000_000
+            completed = reports.get(day, 0)
+            summary.append({
+                "day": day, "calls": calls, "profiles": profiles, "prompt_tokens": prompt,
+                "cached_tokens": cached, "output_tokens": output, "reports": completed,
+                "cost_usd": round(cost, 4),
+                "cost_per_report_usd": round(cost / completed, 4) if completed else None,
+                "tokens_per_report": (prompt + output) // completed if completed else None,
+            })
+        return summary
+
+    def purge(self):
+        """Delete usage older than the retention period."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        with self._lock:
+            self._conn.execute("DELETE FROM usage WHERE day < ?", (cutoff,))
+            self._conn.execute("DELETE FROM reports WHERE day < ?", (cutoff,))
+
+
+class TokenBudget:
+    """Per-profile (whole assessment) and per-day (all profiles) token limits, 0 = unlimited, checked against a ledger."""
+
+    def __init__(self, ledger, per_profile=0, per_day=0):
+        self.ledger = ledger
+        self.per_profile = per_profile
+        self.per_day = per_day
+
+    def remaining(self, profile):
+        """Tokens profile may still use, or None without limits.
+
+        The per-profile limit covers the whole assessment (every day and
+        regeneration); the per-day limit covers all profiles today.
+        """
+        left = []
+        if self.per_profile:
+            left.append(self.per_profile - self.ledger.profile_tokens(profile))
+        if self.per_day:
+            left.append(self.per_day - self.ledger.day_tokens())
+        return max(0, min(left)) if left else None
+
+    def allows(self, profile, estimate):
+        """Whether a call estimated at estimate tokens fits the remaining budget."""
+        left = self.remaining(profile)
+        return left is None or estimate <= left
+
+    def check(self, profile, estimate):
+        """Raise BudgetExceeded unless a call of estimate tokens fits."""
+        if not self.allows(profile, estimate):
+            raise BudgetExceeded(f"token budget reached (~{estimate:,} tokens needed, {self.remaining(profile):,} left)")
+
+    def plan(self, profile, full, compact=None):
+        """Choose how much of a batch of calls to make.
+
+        full and compact map call ids, in priority order, to estimated tokens
+        with the full and with a shortened context. Returns (mode, ids):
+        "full" or "compact" when every call fits that way, "partial" for the
+        highest-priority calls that fit (shortened context if given), and
+        "exhausted" when none does.
+        """
+        left = self.remaining(profile)
+        if left is None or sum(full.values()) <= left:
+            return "full", list(full)
+        if compact and sum(compact.values()) <= left:
+            return "compact", list(compact)
+        chosen, spent = [], 0
+        for call, tokens in (compact or full).items():
+            if spent + tokens <= left:
+                chosen.append(call)
+                spent += tokens
+        return ("partial" if chosen else "exhausted"), chosen
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else ".cache/usage.sqlite3"
+    if not os.path.exists(path):
+        print(f"no usage recorded in {path}", file=sys.stderr)
+        return 1
+    summary = TokenLedger(path).daily_summary(days=int(argv[1]) if len(argv) > 1 else 7)
+    print(f"{'day':<11} {'calls':>6} {'input':>11} {'cached':>11} {'output':>10} {'reports':>8}"
+          f" {'cost $':>8} {'$/report':>9}")
+    for row in summary:
+        per_report = "-" if row["cost_per_report_usd"] is None else f"{row['cost_per_report_usd']:.4f}"
+        print(f"{row['day']:<11} {row['calls']:>6} {row['prompt_tokens']:>11,} {row['cached_tokens']:>11,}"
+              f" {row['output_tokens']:>10,} {row['reports']:>8} {row['cost_usd']:>8.4f} {per_report:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())